@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Position-Bucketed Availability Index
+
+Keeps every lineup-eligible player in a bucket per (lineup position, team),
+sorted once by weighted season points. A week's score is those points times the
+team's conservation bonus, which is the same for every player of a team, so
+the order inside a bucket never changes from week to week. The best k players
+of a position for a week are therefore among the first k available players of
+each team bucket, and a query only looks at those.
+
+Removal is lazy: a used player (the store's used mask) or an eliminated team
+(the bitmask passed to each query) is skipped when reached, and each bucket's
+head pointer moves past used players until the store releases players again
+(PlayerStore.releases), which rewinds every head. A top-k query costs about
+O(teams * k) array work instead of scoring and sorting the whole pool.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+class AvailabilityIndex:
+    """Top-k available players per lineup position"""
+
+    def __init__(self, store, points: np.ndarray, lineup_positions: np.ndarray, n_positions: int):
+        self.store = store
+        self.points = points  # Weighted season points per player id (read-only)
+        n_teams = len(store.teams)
+
+        # Per position: ids sorted by (team, -points, id), with each
+        # team's bucket at flat[start[team]:end[team]]
+        self.flat: List[np.ndarray] = []
+        self.start: List[np.ndarray] = []
+        self.end: List[np.ndarray] = []
+        self.heads: List[np.ndarray] = []
+        self._skipped = 0  # Used players the last query's head pointers moved past
+        self._last_window = None  # (examined, available) masks of the last query
+        self._releases = store.releases  # Store releases the heads have seen
+        for pos in range(n_positions):
+            ids = np.flatnonzero(lineup_positions == pos)
+            teams = store.team[ids]
+            order = np.lexsort((ids, -points[ids], teams))
+            flat = ids[order]
+            counts = np.bincount(teams, minlength=n_teams)
+            end = np.cumsum(counts)
+            start = end - counts
+            self.flat.append(flat)
+            self.start.append(start)
+            self.end.append(end)
+            self.heads.append(start.copy())
+
+    def _advance_heads(self, pos: int) -> np.ndarray:
+        """Move each bucket's head past used players; returns the heads"""
+        if self._releases != self.store.releases:
+            self.heads = [start.copy() for start in self.start]
+            self._releases = self.store.releases
+        heads, end, flat = self.heads[pos], self.end[pos], self.flat[pos]
+        used = self.store.used
+        self._skipped = 0
+        while True:
+            live = np.flatnonzero(heads < end)
+            stuck = live[used[flat[heads[live]]]]
+            if len(stuck) == 0:
+                return heads
+            heads[stuck] += 1
+            self._skipped += len(stuck)
+
+    def last_scan(self) -> Tuple[int, int]:
+        """(entries scanned, entries rejected as used) by the last top() query"""
+        if self._last_window is None:
+            return self._skipped, self._skipped
+        examined, available = self._last_window
+        scanned = int(examined.sum()) + self._skipped
+        return scanned, scanned - int(available.sum())
+
+    def top(self, pos: int, k: int, team_bonus: np.ndarray, eliminated: int = 0) -> List[Tuple[float, int]]:
+        """
+        Best k available players of a lineup position for a week
+
+        team_bonus: week multiplier per team code
+        eliminated: bitmask over team codes
+
+        Returns (week score, player id) pairs, best first; ties go to the lower id.
+        """
+        flat = self.flat[pos]
+        self._skipped, self._last_window = 0, None
+        if k <= 0 or len(flat) == 0:
+            return []
+        heads = self._advance_heads(pos)
+        end = self.end[pos]
+        used = self.store.used
+        alive = ~self.store.team_mask(eliminated)
+
+        # Look at the first `width` entries of every bucket; widen only when
+        # used players in the middle of a bucket leave fewer than k candidates
+        width = k
+        while True:
+            offsets = heads[:, None] + np.arange(width)
+            in_bucket = (offsets < end[:, None]) & alive[:, None]
+            ids = flat[np.minimum(offsets, len(flat) - 1)]
+            valid = in_bucket & ~used[ids]
+            enough = (valid.sum(axis=1) >= k) | (heads + width >= end) | ~alive
+            if enough.all():
+                break
+            width *= 2
+
+        self._last_window = (in_bucket, valid)
+        candidates = ids[valid]
+        teams = np.nonzero(valid)[0]
+        scores = self.points[candidates] * team_bonus[teams]
+        best = np.lexsort((candidates, -scores))[:k]
+        return [(float(scores[i]), int(candidates[i])) for i in best]
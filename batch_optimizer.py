@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Batch Multi-Entry Optimizer
+
+Optimizes many entries in one process instead of one run per entry. Each line
+of the input JSONL file is one entry spec; every field except "id" is optional:
+
+    {"id": "main-league",
+     "solver": "exact",
+     "rules": {"format": "standard", "lineup_size": 9, "position_limits": {"QB": [1, 1], ...},
+               "flex": [{"positions": ["RB", "WR", "TE"], "count": 1}]},
+     "scoring": {"points": {"PASS_TD": 6}, "positions": {"TE": {"REC": 2.0}}},
+     "exclude": ["KC_Some Player"],
+     "locks": {"1": ["JAX_Trevor Lawrence"]}}
+
+- rules: a named format from roster_rules.ROSTER_FORMATS (the playoff format by
+  default), with the lineup size, per-position (min, max) and flex slots
+  optionally overridden; positions missing from position_limits keep the
+  format's limits
+- scoring: changes on top of the league scoring (points per qualified stat,
+  optionally per position)
+- exclude: "TEAM_Name" keys of players the entry cannot use
+- locks: players that must be in a given week's lineup
+
+Players are loaded and scored once. Entries are then solved on a process pool
+whose workers are forked from the loaded process, so they share the player
+store copy-on-write instead of reloading or unpickling it. Each worker keeps the
+valuations of the scoring variants it has seen. Results are written as one
+JSONL line per entry, in input order; an entry that cannot be solved gets an
+"error" instead of weeks. Points in the results are expected points per game
+under the entry's scoring (the WeeklyProjection means of projections.py), so
+"total_points" is the plan's projected total over the four playoff weeks.
+
+    python3 batch_optimizer.py entries.jsonl --output results.jsonl
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from playoff_optimizer import PlayoffOptimizer
+from roster_rules import ROSTER_FORMATS, RosterRules
+from scoring import ScoringRules
+
+
+class EntrySpec:
+    """One entry: roster rules, scoring variant, exclusions and locks"""
+
+    def __init__(self, entry_id: str, solver: str = 'greedy', lineup_size: int = None,
+                 position_limits: Dict[str, Tuple[int, int]] = None, scoring: ScoringRules = None,
+                 exclude: List[str] = None, locks: Dict[int, List[str]] = None,
+                 flex: List[Tuple[Tuple[str, ...], int]] = None):
+        self.entry_id = entry_id
+        self.solver = solver
+        self.lineup_size = lineup_size or PlayoffOptimizer.LINEUP_SIZE
+        self.position_limits = position_limits or dict(PlayoffOptimizer.POSITION_LIMITS)
+        self.flex = flex if flex is not None else list(PlayoffOptimizer.FLEX_SLOTS)
+        self.scoring = scoring or PlayoffOptimizer.SCORING_RULES
+        self.exclude = exclude or []
+        self.locks = locks or {}
+
+    @classmethod
+    def from_dict(cls, data: Dict, default_solver: str = 'greedy') -> 'EntrySpec':
+        """Build a spec from one parsed JSONL line; raises ValueError on bad fields"""
+        if 'id' not in data:
+            raise ValueError("Entry has no id")
+        solver = data.get('solver', default_solver)
+        if solver not in ('greedy', 'exact', 'flow'):
+            raise ValueError(f"Unknown solver {solver!r}")
+
+        rules = data.get('rules', {})
+        roster = ROSTER_FORMATS.get(rules.get('format', 'playoff'))
+        if roster is None:
+            raise ValueError(f"Unknown roster format {rules['format']!r}")
+        lineup_size = int(rules.get('lineup_size', roster['size']))
+        position_limits = dict(roster['slots'])
+        for pos, limits in rules.get('position_limits', {}).items():
+            if pos not in position_limits:
+                raise ValueError(f"Unknown lineup position {pos!r}")
+            low, high = limits
+            position_limits[pos] = (int(low), int(high))
+        flex = roster['flex']
+        if 'flex' in rules:
+            flex = [(tuple(slot['positions']), int(slot.get('count', 1))) for slot in rules['flex']]
+        RosterRules(position_limits, lineup_size, flex)  # Raises ValueError if no lineup fits the rules
+
+        scoring = PlayoffOptimizer.SCORING_RULES
+        variant = data.get('scoring', {})
+        if variant:
+            points = dict(scoring.points)
+            points.update(variant.get('points', {}))
+            scoring = ScoringRules(points, scoring.position_overrides)
+            for pos, overrides in variant.get('positions', {}).items():
+                scoring = scoring.override(pos, **overrides)
+
+        locks = {int(week): list(keys) for week, keys in data.get('locks', {}).items()}
+        for week, keys in locks.items():
+            if keys and week not in range(1, PlayoffOptimizer.PLAYOFF_WEEKS + 1):
+                raise ValueError(f"{keys[0]} cannot be locked into week {week}")
+        return cls(str(data['id']), solver, lineup_size, position_limits, scoring,
+                   list(data.get('exclude', [])), locks, list(flex))
+
+
+class EntrySolver:
+    """Solves entries against one loaded optimizer, reusing valuations per scoring variant"""
+
+    def __init__(self, optimizer: PlayoffOptimizer):
+        self.optimizer = optimizer
+        self._valuations: Dict[str, np.ndarray] = {}  # scoring variant -> weighted points
+        self._loaded = None  # (scoring variant, store version) whose points the store holds
+
+    def _valuation(self, rules: ScoringRules) -> np.ndarray:
+        key = repr(rules)
+        if key not in self._valuations:
+            optimizer = self.optimizer
+            league_rules = optimizer.SCORING_RULES
+            optimizer.SCORING_RULES = rules
+            try:
+                optimizer.apply_te_premium()
+                optimizer.weight_player_value()
+            finally:
+                optimizer.SCORING_RULES = league_rules
+            self._valuations[key] = optimizer.players.adjusted_fpts.copy()
+        return self._valuations[key]
+
+    def _ids(self, keys: List[str]) -> List[int]:
+        ids = []
+        for key in keys:
+            player_id = self.optimizer.players.find(key)
+            if player_id < 0:
+                raise ValueError(f"Player not loaded: {key}")
+            ids.append(player_id)
+        return ids
+
+    def solve(self, spec: EntrySpec) -> Dict:
+        """
+        Plan one entry; returns its JSON-ready result
+
+        An entry whose plan cannot be found, or breaks the entry's roster rules,
+        gets an "error" instead of weeks.
+        """
+        optimizer = self.optimizer
+        store = optimizer.players
+        result = {'id': spec.entry_id, 'solver': spec.solver}
+        try:
+            store.reset_used()
+            optimizer.LINEUP_SIZE = spec.lineup_size
+            optimizer.POSITION_LIMITS = spec.position_limits
+            optimizer.FLEX_SLOTS = spec.flex
+            # Assigning points bumps the store version and so rebuilds the valuation;
+            # only do it when the scoring variant changes
+            if self._loaded != (repr(spec.scoring), store.version):
+                store.adjusted_fpts = self._valuation(spec.scoring)
+                self._loaded = (repr(spec.scoring), store.version)
+            store.mark_used(self._ids(spec.exclude))
+            locks = {week: self._ids(keys) for week, keys in spec.locks.items()}
+            with contextlib.redirect_stdout(io.StringIO()):
+                plan = optimizer.simulate_playoffs(spec.solver, locks=locks)
+        except ValueError as error:
+            result['error'] = str(error)
+            return result
+        invalid = [week for week, lineup in sorted(plan.items()) if not optimizer.is_valid_lineup(lineup)]
+        if invalid:
+            result['error'] = (f"{spec.solver} plan breaks the roster rules in week(s) "
+                               f"{', '.join(map(str, invalid))}: {optimizer.roster_rules().describe()}")
+            return result
+
+        points = optimizer.weekly_projection(spec.scoring).mean
+        result['valid'] = True
+        result['total_points'] = round(float(sum(points[p.id] for lineup in plan.values() for p in lineup)), 2)
+        result['weeks'] = {str(week): lineup_records(lineup, points) for week, lineup in sorted(plan.items())}
+        return result
+
+
+def lineup_records(lineup: List, points: np.ndarray) -> List[Dict]:
+    """JSON-ready rows for a lineup, with each player's weekly points from a per-id array"""
+    return [{'key': p.key, 'name': p.name, 'team': p.team, 'position': p.position,
+             'points': round(float(points[p.id]), 2)} for p in lineup]
+
+
+# Solver inherited by forked workers (or set by the initializer where fork is unavailable)
+_worker_solver = {}
+
+
+def _init_worker(optimizer: PlayoffOptimizer):
+    _worker_solver['solver'] = EntrySolver(optimizer)
+
+
+def _solve_entry(spec: EntrySpec) -> Dict:
+    return _worker_solver['solver'].solve(spec)
+
+
+def solve_entries(optimizer: PlayoffOptimizer, specs: List[EntrySpec], workers: int = None) -> List[Dict]:
+    """Solve every entry, in parallel when there is more than one worker; results keep input order"""
+    workers = min(workers or os.cpu_count() or 1, max(len(specs), 1))
+    if workers == 1:
+        solver = EntrySolver(optimizer)
+        return [solver.solve(spec) for spec in specs]
+
+    chunksize = max(1, len(specs) // (workers * 4))
+    if 'fork' in multiprocessing.get_all_start_methods():
+        # Forked workers see the loaded store copy-on-write; nothing is pickled
+        _init_worker(optimizer)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(optimizer,))
+    with pool:
+        return list(pool.map(_solve_entry, specs, chunksize=chunksize))
+
+
+def read_entries(path: str, default_solver: str) -> List[Union[EntrySpec, Dict]]:
+    """Parse an entries file; unparseable lines become error results in place"""
+    entries = []
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(EntrySpec.from_dict(json.loads(line), default_solver))
+            except (ValueError, TypeError, AttributeError) as error:
+                entries.append({'id': f"line {line_number}", 'error': str(error)})
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimize many entries from a JSONL file in one run")
+    parser.add_argument('entries', help="JSONL file with one entry spec per line")
+    parser.add_argument('--output', default=None, help="results JSONL file (default: stdout)")
+    parser.add_argument('--solver', choices=['greedy', 'exact', 'flow'], default='greedy',
+                        help="solver for entries that don't choose one")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--min-points', type=float, default=PlayoffOptimizer.MIN_PLAYER_POINTS,
+                        help="minimum season fantasy points for a player to be considered")
+    parser.add_argument('--data-dir', default='.', help="directory containing the team CSV files")
+    parser.add_argument('--store', default=None, metavar='DB',
+                        help="also add the results to a SQLite results store (results_store.py)")
+    args = parser.parse_args(argv)
+
+    entries = read_entries(args.entries, args.solver)
+    specs = [entry for entry in entries if isinstance(entry, EntrySpec)]
+    optimizer = PlayoffOptimizer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.load_players(args.data_dir, min_points=args.min_points)
+        optimizer.score_players()  # Build the shared scorer before forking
+
+    start = time.perf_counter()
+    solved = iter(solve_entries(optimizer, specs, workers=args.workers))
+    results = [next(solved) if isinstance(entry, EntrySpec) else entry for entry in entries]
+    elapsed = time.perf_counter() - start
+
+    output = open(args.output, 'w') if args.output else None
+    try:
+        for result in results:
+            print(json.dumps(result), file=output)
+    finally:
+        if output:
+            output.close()
+    if args.store:
+        from results_store import ResultsStore
+        with ResultsStore(args.store) as store:
+            for result in results:
+                store.add_result(result, source=args.entries)
+    failed = sum(1 for result in results if 'error' in result)
+    print(f"Solved {len(results) - failed} of {len(results)} entries in {elapsed:.2f}s "
+          f"({len(specs) / elapsed if elapsed else 0:,.1f} entries/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
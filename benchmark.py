@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Optimizer Benchmark Suite
+
+Generates synthetic team CSVs in the real two-header-row format at several
+league sizes (14, 32 and 320 teams by default) and times each pipeline stage
+separately:
+
+- load_cold: parse every CSV and write the binary snapshot
+- load_warm: load from the snapshot
+- score: apply_te_premium + weight_player_value
+- greedy_week: one optimize_lineup_greedy call on an already built availability index
+- simulate_greedy / simulate_exact / simulate_flow: a full four-week simulate_playoffs
+
+Each stage reports wall time, throughput (players/s or lineups/s) and peak
+traced memory. Results are written to JSON so two runs can be compared:
+
+    python3 benchmark.py --output before.json
+    python3 benchmark.py --output after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from playoff_optimizer import PlayoffOptimizer
+
+
+DEFAULT_SIZES = [14, 32, 320]
+
+# Roster template per team: (position, count, mean season FPTS)
+ROSTER_TEMPLATE = [
+    ('QB', 3, 120), ('RB', 5, 90), ('WR', 8, 70), ('TE', 4, 50), ('K', 1, 110),
+    ('LB', 7, 40), ('CB', 7, 30), ('S', 5, 30), ('DE', 5, 30), ('DT', 5, 20),
+    ('OT', 5, 0), ('G', 5, 0), ('C', 2, 0), ('P', 1, 0), ('LS', 1, 0),
+]
+
+CATEGORY_ROW = ',,,,,Passing,,,Rushing,,Recieving,,,,,,,,'
+HEADER_ROW = 'RK,NAME,TEAM,POS,GP,YDS,TD,INT,YDS,TD,REC,YDS,TD,SCK,INT,FF,FR,FPTS/G,FPTS'
+
+
+def team_codes(n_teams: int) -> List[str]:
+    """Real playoff team codes first, then synthetic ones"""
+    real = list(PlayoffOptimizer.TEAM_FILES)
+    return real[:n_teams] + [f"T{i:03d}" for i in range(len(real), n_teams)]
+
+
+def write_synthetic_team(path: str, team: str, rng: np.random.Generator):
+    """Write one synthetic team CSV with standard-PPR FPTS"""
+    rows = []
+    for position, count, mean in ROSTER_TEMPLATE:
+        for i in range(count):
+            gp = int(rng.integers(1, 18))
+            scale = max(rng.gamma(2.0, 0.5), 0.0)
+            stats = np.zeros(12)
+            if position == 'QB':
+                stats[[0, 1, 2, 3, 4]] = [rng.integers(200, 4500) * scale, rng.integers(0, 35) * scale,
+                                          rng.integers(0, 15), rng.integers(0, 500) * scale, rng.integers(0, 6)]
+            elif position in ('RB', 'WR', 'TE'):
+                rush = rng.integers(0, 1200) if position == 'RB' else rng.integers(0, 60)
+                rec = rng.integers(0, 110)
+                stats[[3, 4, 5, 6, 7]] = [rush * scale, rng.integers(0, 12) * scale, rec * scale,
+                                          rec * rng.uniform(7, 14) * scale, rng.integers(0, 12) * scale]
+            stats = np.round(stats)
+            fpts = (stats[0] * 0.04 + stats[1] * 4 - stats[2] * 2 + stats[3] * 0.1 + stats[4] * 6
+                    + stats[5] + stats[6] * 0.1 + stats[7] * 6)
+            if position not in ('QB', 'RB', 'WR', 'TE'):
+                fpts = max(rng.normal(mean, mean / 2), 0) if mean else 0.0
+            name = f"{team} {position}{i + 1}"
+            rows.append([name, team, position, gp] + stats.astype(int).tolist()
+                        + [round(fpts / gp, 1), round(fpts, 1)])
+    rows.sort(key=lambda row: -row[-1])
+    with open(path, 'w') as f:
+        f.write(CATEGORY_ROW + '\n' + HEADER_ROW + '\n')
+        for rank, row in enumerate(rows, start=1):
+            f.write(','.join(str(value) for value in [rank] + row) + '\n')
+
+
+def generate_league(data_dir: str, n_teams: int, seed: int = 0) -> Dict[str, str]:
+    """Write n_teams synthetic CSVs; returns the TEAM_FILES mapping"""
+    rng = np.random.default_rng(seed)
+    team_files = {}
+    for team in team_codes(n_teams):
+        filename = f"{team}.csv"
+        write_synthetic_team(os.path.join(data_dir, filename), team, rng)
+        team_files[team] = filename
+    return team_files
+
+
+class StageTimer:
+    """Times a stage and measures its peak traced memory in a separate run"""
+
+    def __init__(self, repeats: int):
+        self.repeats = repeats
+        self.results: List[Dict] = []
+
+    def run(self, n_teams: int, stage: str, setup: Callable, action: Callable,
+            work: int, unit: str):
+        """
+        setup() builds fresh state for one repetition (untimed) and action(state)
+        is the timed work; `work` is the number of players or lineups per action.
+        """
+        best = float('inf')
+        for _ in range(self.repeats):
+            state = setup()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                action(state)
+                best = min(best, time.perf_counter() - start)
+
+        state = setup()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            action(state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result = {
+            'teams': n_teams,
+            'stage': stage,
+            'seconds': best,
+            'throughput': work / best if best > 0 else float('inf'),
+            'unit': unit,
+            'peak_mb': peak / 1e6,
+        }
+        self.results.append(result)
+        print(f"  {stage:<16} {best * 1000:10.2f} ms {result['throughput']:14,.0f} {unit:<10} "
+              f"{result['peak_mb']:8.2f} MB")
+
+
+def benchmark_size(timer: StageTimer, n_teams: int, min_points: float, seed: int):
+    """Run every stage for one synthetic league size"""
+    data_dir = tempfile.mkdtemp(prefix=f"bench_{n_teams}_")
+    try:
+        team_files = generate_league(data_dir, n_teams, seed)
+
+        def new_optimizer() -> PlayoffOptimizer:
+            optimizer = PlayoffOptimizer()
+            optimizer.TEAM_FILES = team_files
+            return optimizer
+
+        def loaded() -> PlayoffOptimizer:
+            optimizer = new_optimizer()
+            with contextlib.redirect_stdout(io.StringIO()):
+                optimizer.load_players(data_dir, min_points=min_points)
+            return optimizer
+
+        def scored() -> PlayoffOptimizer:
+            optimizer = loaded()
+            optimizer.apply_te_premium()
+            optimizer.weight_player_value()
+            return optimizer
+
+        def clear_cache() -> PlayoffOptimizer:
+            shutil.rmtree(os.path.join(data_dir, '.player_cache'), ignore_errors=True)
+            return new_optimizer()
+
+        sample = loaded()
+        n_players = len(sample.players)
+        weeks = PlayoffOptimizer.PLAYOFF_WEEKS
+        print(f"\n{n_teams} teams, {n_players:,} players")
+
+        timer.run(n_teams, 'load_cold', clear_cache,
+                  lambda o: o.load_players(data_dir, min_points=min_points), n_players, 'players/s')
+        timer.run(n_teams, 'load_warm', new_optimizer,
+                  lambda o: o.load_players(data_dir, min_points=min_points), n_players, 'players/s')
+        timer.run(n_teams, 'score', loaded,
+                  lambda o: (o.apply_te_premium(), o.weight_player_value()), n_players, 'players/s')
+
+        def indexed() -> PlayoffOptimizer:
+            optimizer = scored()
+            optimizer.availability_index()
+            return optimizer
+
+        timer.run(n_teams, 'greedy_week', indexed,
+                  lambda o: o.optimize_lineup_greedy(1, 0), 1, 'lineups/s')
+        timer.run(n_teams, 'simulate_greedy', scored,
+                  lambda o: o.simulate_playoffs('greedy'), weeks, 'lineups/s')
+        timer.run(n_teams, 'simulate_exact', scored,
+                  lambda o: o.simulate_playoffs('exact'), weeks, 'lineups/s')
+        timer.run(n_teams, 'simulate_flow', scored,
+                  lambda o: o.simulate_playoffs('flow'), weeks, 'lineups/s')
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def compare(results: List[Dict], baseline_path: str):
+    """Print the speedup of each stage against a previous results file"""
+    with open(baseline_path, 'r') as f:
+        baseline = {(r['teams'], r['stage']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path} (>1.00x is faster):")
+    print(f"  {'teams':>5} {'stage':<16} {'before ms':>10} {'after ms':>10} {'speedup':>8} {'peak MB':>16}")
+    for result in results:
+        old = baseline.get((result['teams'], result['stage']))
+        if old is None:
+            continue
+        speedup = old['seconds'] / result['seconds'] if result['seconds'] else float('inf')
+        print(f"  {result['teams']:>5} {result['stage']:<16} {old['seconds'] * 1000:>10.2f} "
+              f"{result['seconds'] * 1000:>10.2f} {speedup:>7.2f}x "
+              f"{old['peak_mb']:>7.2f} -> {result['peak_mb']:<7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the optimizer pipeline on synthetic leagues")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="league sizes in teams")
+    parser.add_argument('--repeats', type=int, default=3, help="timed repetitions per stage (best is kept)")
+    parser.add_argument('--min-points', type=float, default=PlayoffOptimizer.MIN_PLAYER_POINTS,
+                        help="player cutoff passed to load_players")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the synthetic data")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--compare', default=None, help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("OPTIMIZER BENCHMARK")
+    print("=" * 70)
+    timer = StageTimer(args.repeats)
+    for n_teams in args.sizes:
+        benchmark_size(timer, n_teams, args.min_points, args.seed)
+
+    output = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'repeats': args.repeats,
+            'min_points': args.min_points,
+            'seed': args.seed,
+        },
+        'results': timer.results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(timer.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Vectorized Monte Carlo Playoff Bracket Simulator
+
+Simulates many playoff brackets at once from PLAYOFF_SEEDS using the real NFL
+format for 7-team conferences:
+
+- Wild Card (Week 1): #1 seed has a bye; #7 @ #2, #6 @ #3, #5 @ #4
+- Divisional (Week 2): lowest remaining seed @ #1, other two winners play at the higher seed
+- Conference Championship (Week 3): the two winners, at the higher seed
+- Super Bowl (Week 4): AFC champion vs NFC champion on a neutral field
+
+Every game is decided by an Elo-style win probability from team ratings plus
+home-field advantage. Each round is one set of NumPy operations over all
+simulated brackets, so hundreds of thousands of brackets take well under a second.
+"""
+
+import time
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+
+class BracketResult:
+    """Outcome of a batch of simulated brackets"""
+
+    def __init__(self, teams: List[str], byes: np.ndarray, elimination_week: np.ndarray, weeks: int):
+        self.teams = teams
+        self.team_index = {team: i for i, team in enumerate(teams)}
+        self.byes = byes  # team -> has a Week 1 bye
+        self.elimination_week = elimination_week  # (sims, teams): week lost, weeks + 1 for champion
+        self.weeks = weeks
+
+        counts = np.stack([np.bincount(elimination_week[:, t], minlength=weeks + 2)
+                           for t in range(len(teams))])
+        alive_after = 1.0 - np.cumsum(counts, axis=1)[:, 1:weeks + 1] / len(elimination_week)
+        # survival[t, w - 1]: probability the team is still alive after week w
+        self.survival = alive_after
+        # playing[t, w - 1]: probability the team plays a game in week w
+        alive_before = np.hstack([np.ones((len(teams), 1)), alive_after[:, :-1]])
+        self.playing = alive_before.copy()
+        self.playing[byes, 0] = 0.0
+
+    @property
+    def n_sims(self) -> int:
+        return len(self.elimination_week)
+
+    def advancement_probability(self, team: str) -> Dict[int, float]:
+        """Probability of the team surviving each week: {week: probability}"""
+        if team not in self.team_index:
+            return {week: 0 for week in range(1, self.weeks + 1)}
+        row = self.survival[self.team_index[team]]
+        return {week: float(row[week - 1]) for week in range(1, self.weeks + 1)}
+
+    def playing_probability(self, team: str, week: int) -> float:
+        """Probability the team plays a game in the given week"""
+        if team not in self.team_index:
+            return 0.0
+        return float(self.playing[self.team_index[team], week - 1])
+
+    def relative_playing_probability(self, team: str, week: int) -> float:
+        """
+        Team's chance of playing in a week relative to the average playoff team
+
+        Above 1.0 when the team is more likely than average to still be playing,
+        which makes it the data-driven version of the conservation bonus: bye
+        teams are worthless in Week 1, likely Super Bowl teams are worth more late.
+        """
+        average = self.playing[:, week - 1].mean()
+        if average == 0:
+            return 0.0
+        return self.playing_probability(team, week) / average
+
+    def bracket_path(self, sim: int) -> Dict[int, List[str]]:
+        """Teams eliminated at the end of each week in one simulated bracket"""
+        row = self.elimination_week[sim]
+        return {week: [self.teams[t] for t in np.flatnonzero(row == week)]
+                for week in range(1, self.weeks)}
+
+    def sample_paths(self, count: int) -> List[Dict[int, List[str]]]:
+        """Full bracket paths for the first `count` simulations"""
+        return [self.bracket_path(sim) for sim in range(min(count, self.n_sims))]
+
+    def champion_counts(self) -> Dict[str, int]:
+        """How many simulated brackets each team won"""
+        wins = (self.elimination_week == self.weeks + 1).sum(axis=0)
+        return {team: int(wins[i]) for i, team in enumerate(self.teams)}
+
+
+class BracketSimulator:
+    """Simulates playoff brackets from seeds and team ratings"""
+
+    BASE_RATING = 1500.0  # Rating of a #1 seed when no rating is given
+    SEED_RATING_STEP = 25.0  # Default rating drop per seed
+    HOME_FIELD_ADVANTAGE = 48.0  # Elo points (~57% for evenly matched teams)
+    PLAYOFF_WEEKS = 4
+    CONFERENCE_SIZE = 7
+
+    def __init__(self, playoff_seeds: Dict[str, Dict[str, int]], ratings: Dict[str, float] = None):
+        self.playoff_seeds = playoff_seeds
+        self.conferences = list(playoff_seeds)
+        if len(self.conferences) != 2:
+            raise ValueError("Bracket needs exactly two conferences")
+
+        self.teams: List[str] = []
+        # seed_to_team[c][s]: team index of seed s in conference c (index 0 unused)
+        self.seed_to_team = np.zeros((2, self.CONFERENCE_SIZE + 1), dtype=np.int64)
+        for c, conf in enumerate(self.conferences):
+            seeds = playoff_seeds[conf]
+            if sorted(seeds.values()) != list(range(1, self.CONFERENCE_SIZE + 1)):
+                raise ValueError(f"{conf} must have seeds 1-{self.CONFERENCE_SIZE}")
+            for team, seed in seeds.items():
+                self.seed_to_team[c, seed] = len(self.teams)
+                self.teams.append(team)
+
+        self.team_seed = np.array([self._seed(team) for team in self.teams])
+        self.ratings = np.array([
+            self.BASE_RATING - self.SEED_RATING_STEP * (self._seed(team) - 1)
+            for team in self.teams
+        ])
+        if ratings:
+            self.set_ratings(ratings)
+
+    def _seed(self, team: str) -> int:
+        for conf, teams in self.playoff_seeds.items():
+            if team in teams:
+                return teams[team]
+        raise KeyError(team)
+
+    def set_ratings(self, ratings: Dict[str, float]):
+        """Override team ratings (Elo scale)"""
+        for team, rating in ratings.items():
+            self.ratings[self.teams.index(team)] = rating
+
+    def win_probability(self, home: np.ndarray, away: np.ndarray, neutral: bool = False) -> np.ndarray:
+        """Probability that the home team beats the away team (team indices)"""
+        diff = self.ratings[home] - self.ratings[away]
+        if not neutral:
+            diff = diff + self.HOME_FIELD_ADVANTAGE
+        return 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+
+    def round_games(self, week: int, alive: Set[int]) -> List[Tuple[int, int, bool]]:
+        """
+        Games of a week given the teams still alive at its start: (home, away, neutral)
+
+        The bracket is deterministic once the survivors are known, so this is
+        the same schedule the simulation plays. Raises ValueError when the
+        survivors cannot occur in the bracket.
+        """
+        conference_seeds = [[s for s in range(1, self.CONFERENCE_SIZE + 1) if self.seed_to_team[c, s] in alive]
+                            for c in range(2)]
+        expected = {1: self.CONFERENCE_SIZE, 2: 4, 3: 2, 4: 1}.get(week)
+        if expected is None or any(len(seeds) != expected for seeds in conference_seeds):
+            raise ValueError(f"Surviving teams do not fit the week {week} bracket")
+        if week == 4:
+            return [(int(self.seed_to_team[0, conference_seeds[0][0]]),
+                     int(self.seed_to_team[1, conference_seeds[1][0]]), True)]
+
+        games = []
+        for c, seeds in enumerate(conference_seeds):
+            if week == 1:
+                pairs = [(2, 7), (3, 6), (4, 5)]
+            elif week == 2:
+                if seeds[0] != 1:
+                    raise ValueError("The #1 seed cannot lose before the Divisional round")
+                pairs = [(1, seeds[3]), (seeds[1], seeds[2])]
+            else:
+                pairs = [(seeds[0], seeds[1])]
+            games.extend((int(self.seed_to_team[c, home]), int(self.seed_to_team[c, away]), False)
+                         for home, away in pairs)
+        return games
+
+    def _play(self, home: np.ndarray, away: np.ndarray, rng: np.random.Generator,
+              neutral: bool = False):
+        """Play one game per row; returns (winners, losers) as team indices"""
+        home_wins = rng.random(home.shape) < self.win_probability(home, away, neutral)
+        return np.where(home_wins, home, away), np.where(home_wins, away, home)
+
+    def _conference_round(self, c: int, n_sims: int, rng: np.random.Generator, elimination: np.ndarray):
+        """Play Weeks 1-3 of one conference; returns the champion of each simulation"""
+        rows = np.arange(n_sims)
+        team_of = self.seed_to_team[c]
+
+        # Week 1: #7 @ #2, #6 @ #3, #5 @ #4
+        home_seeds = np.array([2, 3, 4])
+        away_seeds = np.array([7, 6, 5])
+        home_wins = rng.random((n_sims, 3)) < self.win_probability(team_of[home_seeds], team_of[away_seeds])
+        winner_seeds = np.where(home_wins, home_seeds, away_seeds)
+        loser_seeds = np.where(home_wins, away_seeds, home_seeds)
+        for g in range(3):
+            elimination[rows, team_of[loser_seeds[:, g]]] = 1
+
+        # Week 2: lowest remaining seed @ #1, the other two at the higher seed
+        winner_seeds.sort(axis=1)
+        top_winner, top_loser = self._play(np.full(n_sims, team_of[1]), team_of[winner_seeds[:, 2]], rng)
+        other_winner, other_loser = self._play(team_of[winner_seeds[:, 0]], team_of[winner_seeds[:, 1]], rng)
+        elimination[rows, top_loser] = 2
+        elimination[rows, other_loser] = 2
+
+        # Week 3: conference championship at the higher seed
+        top_hosts = self.team_seed[top_winner] < self.team_seed[other_winner]
+        champion, loser = self._play(np.where(top_hosts, top_winner, other_winner),
+                                     np.where(top_hosts, other_winner, top_winner), rng)
+        elimination[rows, loser] = 3
+        return champion
+
+    def simulate(self, n_sims: int, seed: int = None) -> BracketResult:
+        """Simulate n_sims full brackets"""
+        rng = np.random.default_rng(seed)
+        weeks = self.PLAYOFF_WEEKS
+        elimination = np.full((n_sims, len(self.teams)), weeks + 1, dtype=np.int8)
+        afc_champion = self._conference_round(0, n_sims, rng, elimination)
+        nfc_champion = self._conference_round(1, n_sims, rng, elimination)
+
+        # Week 4: Super Bowl on a neutral field
+        _, loser = self._play(afc_champion, nfc_champion, rng, neutral=True)
+        elimination[np.arange(n_sims), loser] = weeks
+
+        byes = np.zeros(len(self.teams), dtype=bool)
+        byes[self.seed_to_team[:, 1]] = True
+        return BracketResult(self.teams, byes, elimination, weeks)
+
+
+def print_survival_table(result: BracketResult):
+    """Print per-team survival probabilities by week"""
+    print(f"\n{'Team':<6}" + "".join(f"{'Week ' + str(w):>9}" for w in range(1, result.weeks + 1))
+          + f"{'Champion':>10}")
+    print("-" * 52)
+    champions = result.champion_counts()
+    order = np.argsort(-result.survival.sum(axis=1))
+    for t in order:
+        team = result.teams[t]
+        cells = "".join(f"{p:>9.3f}" for p in result.survival[t])
+        print(f"{team:<6}{cells}{champions[team] / result.n_sims:>10.3f}")
+
+
+if __name__ == "__main__":
+    from playoff_optimizer import PlayoffOptimizer
+
+    simulator = BracketSimulator(PlayoffOptimizer.PLAYOFF_SEEDS)
+    start = time.perf_counter()
+    result = simulator.simulate(500_000, seed=0)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {result.n_sims:,} brackets in {elapsed:.3f}s")
+    print_survival_table(result)
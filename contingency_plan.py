@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Contingency Plan Tree
+
+A single plan assumes one bracket. The contingency tree holds this week's
+lineup and, for every way the week's games can end, the best lineup for the
+next week given the teams that survive and the players already used, down to
+the Super Bowl. After each real round, look up the branch for the actual
+losers and play its lineup.
+
+The Wild Card round alone has 2^6 outcomes, so the full tree has thousands of
+paths, but many of them reach the same subproblem: the same teams alive, the
+same players used on those teams, the same week. Each subproblem is keyed by
+
+    (surviving-team bitmask, used-player bitmask over surviving teams, week)
+
+and solved once, so the tree is stored as a DAG of those nodes. Used players
+on eliminated teams can never be picked again, which is why they are dropped
+from the key. The tree is built a week at a time: the distinct subproblems of a
+week are solved in parallel on a process pool forked from the loaded
+optimizer, then expanded into the next week's subproblems.
+
+Each node's lineup comes from optimize_lineup_greedy, or from the exact / flow
+planner over the remaining weeks with the node's survivors assumed to stay
+alive (falling back to greedy where no full plan exists). Branch probabilities
+come from the bracket simulator's win model, so every node also carries the
+expected planning value of following the tree from there.
+
+    python3 contingency_plan.py --output contingency_tree.json
+    python3 contingency_plan.py --lookup contingency_tree.json --eliminated 1=BUF,GB,HOU,LAC,LAR,SF
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from bracket_simulator import BracketSimulator
+from playoff_optimizer import PlayoffOptimizer, _parse_week_list
+from roster_rules import ROSTER_FORMATS
+
+Key = Tuple[int, int, int]  # (surviving teams, used players on them, week)
+
+
+def _bits(mask: np.ndarray) -> int:
+    """Integer bitmask of a boolean array (bit i set when mask[i])"""
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+def _ids(bits: int, size: int) -> np.ndarray:
+    """Indices of the set bits of a bitmask, below size"""
+    if not bits:
+        return np.zeros(0, dtype=np.int64)
+    packed = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, bitorder='little')[:size])
+
+
+class PlanNode:
+    """One subproblem: the lineup for a week and the branch for each set of losers"""
+
+    def __init__(self, week: int, lineup: List[int], value: float, valid: bool):
+        self.week = week
+        self.lineup = lineup  # Player ids
+        self.value = value  # Planning value of the lineup (points x conservation bonus)
+        self.valid = valid
+        self.expected = value  # Planning value of following the tree from here
+        self.next: Dict[str, Tuple[int, float]] = {}  # "LOSER,LOSER" -> (node id, probability)
+
+
+class PlanTree:
+    """Contingency plan as a DAG of memoized subproblems"""
+
+    def __init__(self, players: List[str], nodes: List[PlanNode], solver: str, start_week: int,
+                 eliminated: List[str] = ()):
+        self.players = players  # "TEAM_Name" keys; node lineups index into this
+        self.nodes = nodes  # nodes[0] is the root
+        self.solver = solver
+        self.start_week = start_week
+        self.eliminated = list(eliminated)  # Teams already out before start_week
+
+    @staticmethod
+    def branch_label(teams: List[str]) -> str:
+        """Canonical label of a set of losers"""
+        return ','.join(sorted(teams))
+
+    def lookup(self, eliminations: Dict[int, List[str]]) -> Tuple[PlanNode, float]:
+        """
+        Node to play after the given real results: (node, probability of reaching it)
+
+        eliminations: teams eliminated at the end of each played week since the
+        tree's start week; the walk stops at the first week without results.
+        Raises KeyError when a week's losers are not a branch of the tree.
+        """
+        node, probability = self.nodes[0], 1.0
+        for week in range(self.start_week, self.start_week + len(self.nodes)):
+            if week not in eliminations or not node.next:
+                break
+            label = self.branch_label(eliminations[week])
+            if label not in node.next:
+                raise KeyError(f"Week {week} losers {label} are not a bracket outcome; "
+                               f"expected e.g. {next(iter(node.next))}")
+            child, branch = node.next[label]
+            node, probability = self.nodes[child], probability * branch
+        return node, probability
+
+    def lineup_keys(self, node: PlanNode) -> List[str]:
+        return [self.players[i] for i in node.lineup]
+
+    def to_dict(self) -> Dict:
+        players = sorted({i for node in self.nodes for i in node.lineup})
+        column = {player_id: c for c, player_id in enumerate(players)}
+        return {
+            'solver': self.solver,
+            'start_week': self.start_week,
+            'eliminated': self.eliminated,
+            'players': [self.players[i] for i in players],
+            'nodes': [{'week': node.week, 'lineup': [column[i] for i in node.lineup],
+                       'value': round(node.value, 2), 'expected': round(node.expected, 2),
+                       'valid': node.valid,
+                       'next': {label: [child, round(p, 6)] for label, (child, p) in node.next.items()}}
+                      for node in self.nodes],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlanTree':
+        nodes = []
+        for record in data['nodes']:
+            node = PlanNode(record['week'], record['lineup'], record['value'], record['valid'])
+            node.expected = record['expected']
+            node.next = {label: (child, p) for label, (child, p) in record['next'].items()}
+            nodes.append(node)
+        return cls(data['players'], nodes, data['solver'], data['start_week'], data.get('eliminated', []))
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str) -> 'PlanTree':
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def check_eliminations(simulator: BracketSimulator, eliminations: Dict[int, List[str]],
+                       start_week: int = 1, eliminated: List[str] = ()):
+    """
+    Raise ValueError unless each week's losers are one team from each of its games
+
+    Weeks are replayed from start_week with round_games, stopping at the
+    first week without results as PlanTree.lookup does.
+    """
+    unknown = sorted({team for teams in eliminations.values() for team in teams} - set(simulator.teams))
+    if unknown:
+        raise ValueError(f"Not playoff teams: {', '.join(unknown)}")
+    alive = set(range(len(simulator.teams))) - {simulator.teams.index(team) for team in eliminated}
+    week = start_week
+    while week in eliminations:
+        games = simulator.round_games(week, alive)
+        losers = {simulator.teams.index(team) for team in eliminations[week]}
+        if len(losers) != len(games) or any(len({home, away} & losers) != 1 for home, away, _ in games):
+            schedule = ', '.join(f"{simulator.teams[away]} @ {simulator.teams[home]}" for home, away, _ in games)
+            raise ValueError(f"Week {week} losers must be one team from each game ({schedule})")
+        alive -= losers
+        week += 1
+
+
+# Loaded optimizer inherited by forked workers (or set by the initializer)
+_worker_state = {}
+
+
+def _init_worker(optimizer: PlayoffOptimizer, solver: str):
+    _worker_state['optimizer'] = optimizer
+    _worker_state['solver'] = solver
+
+
+def solve_subproblem(key: Key) -> Tuple[List[int], float, bool]:
+    """Lineup for one subproblem with the worker's optimizer: (player ids, value, valid)"""
+    optimizer = _worker_state['optimizer']
+    solver = _worker_state['solver']
+    alive, used, week = key
+    store = optimizer.players
+    store.reset_used()
+    store.mark_used(_ids(used, len(store)))
+    eliminated = store.team_bits(store.teams) & ~alive
+
+    lineup = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        if solver in ('exact', 'flow'):
+            plan_weeks = optimizer.optimize_plan_exact if solver == 'exact' else optimizer.optimize_plan_flow
+            names = [team for code, team in enumerate(store.teams) if eliminated >> code & 1]
+            try:
+                lineup = plan_weeks({week - 1: names} if names else {}, week)[week]
+            except ValueError:
+                lineup = None  # No full plan for the remaining weeks; pick the week greedily
+        if lineup is None:
+            lineup = optimizer.optimize_lineup_greedy(week, eliminated)
+    return [p.id for p in lineup], optimizer.lineup_value(week, lineup), optimizer.is_valid_lineup(lineup)
+
+
+def _solve_all(keys: List[Key], pool, workers: int) -> List[Tuple[List[int], float, bool]]:
+    if pool is None:
+        return [solve_subproblem(key) for key in keys]
+    chunksize = max(1, len(keys) // (workers * 4))
+    return list(pool.map(solve_subproblem, keys, chunksize=chunksize))
+
+
+def build_tree(optimizer: PlayoffOptimizer, solver: str = 'greedy', start_week: int = 1,
+               eliminated: List[str] = (), workers: int = None) -> Tuple[PlanTree, Dict[str, int]]:
+    """
+    Contingency tree from start_week to the Super Bowl
+
+    eliminated: teams already out before start_week
+    The optimizer's used players count as already used; they are restored
+    before returning.
+
+    Returns (tree, stats) with the number of paths and of distinct
+    subproblems solved per week.
+    """
+    store = optimizer.players
+    simulator = BracketSimulator(optimizer.PLAYOFF_SEEDS)
+    last_week = optimizer.PLAYOFF_WEEKS
+    team_bit = [store.team_bits([team]) for team in simulator.teams]
+    all_teams = store.team_bits(store.teams)
+    alive_players = {}  # surviving-team bits -> bits of their players
+
+    def players_on(alive: int) -> int:
+        if alive not in alive_players:
+            alive_players[alive] = _bits(~store.team_mask(all_teams & ~alive)[store.team])
+        return alive_players[alive]
+
+    initially_used = store.used.copy()
+    root_alive = store.team_bits(simulator.teams) & ~store.team_bits(eliminated)
+    root = (root_alive, _bits(initially_used) & players_on(root_alive), start_week)
+
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    _init_worker(optimizer, solver)
+    if workers > 1:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(optimizer, solver))
+
+    nodes: List[PlanNode] = []
+    node_of: Dict[Key, int] = {}
+    edges: List[Dict[str, Tuple[Key, float]]] = []
+    stats = {}
+    frontier = [root]
+    try:
+        for week in range(start_week, last_week + 1):
+            # Distinct subproblems of the week, in order of first appearance
+            for key, (lineup, value, valid) in zip(frontier, _solve_all(frontier, pool, workers)):
+                node_of[key] = len(nodes)
+                nodes.append(PlanNode(week, lineup, value, valid))
+            stats[f'week_{week}'] = len(frontier)
+            if week == last_week:
+                break
+
+            next_frontier = {}
+            for key in frontier:
+                alive, used, _ = key
+                node = nodes[node_of[key]]
+                for player_id in node.lineup:
+                    used |= 1 << player_id
+                games = simulator.round_games(week, {t for t, bit in enumerate(team_bit) if alive & bit})
+                home_wins = [float(simulator.win_probability(home, away, neutral)) for home, away, neutral in games]
+                branches = {}
+                for outcome in itertools.product((True, False), repeat=len(games)):
+                    losers = [away if won else home for (home, away, _), won in zip(games, outcome)]
+                    probability = float(np.prod([p if won else 1.0 - p for p, won in zip(home_wins, outcome)]))
+                    child_alive = alive & ~sum(team_bit[t] for t in losers)
+                    child = (child_alive, used & players_on(child_alive), week + 1)
+                    next_frontier.setdefault(child, None)
+                    branches[PlanTree.branch_label([simulator.teams[t] for t in losers])] = (child, probability)
+                edges.append(branches)
+            frontier = list(next_frontier)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        store.reset_used()
+        store.mark_used(np.flatnonzero(initially_used))
+
+    for node, branches in zip(nodes, edges):
+        node.next = {label: (node_of[child], p) for label, (child, p) in branches.items()}
+    paths = [1] * len(nodes)
+    for index in range(len(nodes) - 1, -1, -1):  # Children always come after their parents
+        node = nodes[index]
+        node.expected = node.value + sum(p * nodes[child].expected for child, p in node.next.values())
+        if node.next:
+            paths[index] = sum(paths[child] for child, _ in node.next.values())
+    stats['paths'] = paths[0]
+    tree = PlanTree([p.key for p in store.players(range(len(store)))], nodes, solver, start_week, eliminated)
+    return tree, stats
+
+
+def print_node(tree: PlanTree, node: PlanNode, probability: float):
+    print(f"\nWeek {node.week} lineup (branch probability {probability:.3f}, "
+          f"planning value {node.value:.1f}, expected from here {node.expected:.1f}):")
+    print("-" * 70)
+    for key in tree.lineup_keys(node):
+        print(f"  {key}")
+    if not node.valid:
+        print("  (not enough players left for a valid lineup)")
+    if node.next:
+        print(f"\n{len(node.next)} possible outcomes of week {node.week}; likeliest:")
+        for label, (child, p) in sorted(node.next.items(), key=lambda item: -item[1][1])[:5]:
+            print(f"  {p:6.3f}  {label}  -> expected {tree.nodes[child].expected:.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a contingency plan tree over bracket outcomes")
+    parser.add_argument('--output', default='contingency_tree.json', help="tree file to write")
+    parser.add_argument('--lookup', default=None, metavar='TREE',
+                        help="look up the lineup to play in a built tree instead of building one")
+    parser.add_argument('--eliminated', action='append', default=[], metavar='WEEK=TEAM,TEAM',
+                        help="teams actually eliminated at the end of a week (for --lookup)")
+    parser.add_argument('--solver', choices=['greedy', 'exact', 'flow'], default='greedy',
+                        help="greedy picks each week on its own; exact and flow plan the remaining weeks")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--min-points', type=float, default=PlayoffOptimizer.MIN_PLAYER_POINTS,
+                        help="minimum season fantasy points for a player to be considered")
+    parser.add_argument('--data-dir', default='.', help="directory containing the team CSV files")
+    parser.add_argument('--roster-format', choices=list(ROSTER_FORMATS), default='playoff',
+                        help="league lineup format (see roster_rules.py)")
+    args = parser.parse_args(argv)
+    try:
+        eliminations = dict(_parse_week_list(value) for value in args.eliminated)
+    except ValueError:
+        parser.error("expected WEEK=TEAM,TEAM")
+    if eliminations and not args.lookup:
+        parser.error("--eliminated needs --lookup")
+
+    if args.lookup:
+        tree = PlanTree.load(args.lookup)
+        try:
+            check_eliminations(BracketSimulator(PlayoffOptimizer.PLAYOFF_SEEDS), eliminations,
+                               tree.start_week, tree.eliminated)
+            node, probability = tree.lookup(eliminations)
+        except (KeyError, ValueError) as error:
+            parser.error(error.args[0])
+        print_node(tree, node, probability)
+        return
+
+    optimizer = PlayoffOptimizer()
+    optimizer.use_roster_format(args.roster_format)
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.load_players(args.data_dir, min_points=args.min_points)
+        optimizer.apply_te_premium()
+        optimizer.weight_player_value()
+
+    start = time.perf_counter()
+    tree, stats = build_tree(optimizer, args.solver, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    tree.save(args.output)
+    solved = ', '.join(f"week {key[5:]}: {count}" for key, count in stats.items() if key.startswith('week_'))
+    print(f"Built a {args.solver} contingency tree in {elapsed:.2f}s: {stats['paths']:,} bracket paths, "
+          f"{len(tree.nodes):,} distinct subproblems ({solved})")
+    print(f"Wrote {args.output}")
+    print_node(tree, tree.nodes[0], 1.0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Cached Team CSV Loader
+
+Parses the team stat CSVs (two header rows: categories, then field names) into
+per-team tables of names, positions and a numeric stat matrix, and keeps a
+binary snapshot of every table in a cache directory:
+
+- <cache>/manifest.json: per-team source signature (mtime, size, SHA-1), names,
+  positions and header rows
+- <cache>/<TEAM>.npy: the team's stat matrix, memory-mapped on load
+
+On the next run a team is only re-parsed when its CSV's mtime or size changed
+and its content hash no longer matches. Changed files are parsed in parallel.
+"""
+
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+CACHE_DIR_NAME = '.player_cache'
+MANIFEST_NAME = 'manifest.json'
+CACHE_VERSION = 1
+TEXT_COLUMNS = ('RK', 'NAME', 'TEAM', 'POS')
+
+# Stat schema: the category header only marks where a section starts, so each
+# category lists the fields it owns. SCK/INT/FF/FR after the receiving section
+# are defensive stats.
+CATEGORY_PREFIXES = {'passing': 'PASS', 'rushing': 'RUSH', 'receiving': 'REC', 'recieving': 'REC'}
+CATEGORY_FIELDS = {
+    'PASS': ('YDS', 'TD', 'INT'),
+    'RUSH': ('YDS', 'TD'),
+    'REC': ('REC', 'YDS', 'TD'),
+}
+DEFENSIVE_FIELDS = ('SCK', 'INT', 'FF', 'FR')
+
+
+def qualify_fields(categories: List[str], fields: List[str]) -> List[str]:
+    """
+    Category-qualified name for every column
+    
+    e.g. the three YDS columns become PASS_YDS, RUSH_YDS and REC_YDS, and the
+    second INT becomes DEF_INT. Receptions are REC; unqualified fields such as
+    GP and FPTS keep their names.
+    """
+    qualified = []
+    prefix = None
+    for category, field in zip(categories, fields):
+        if category:
+            prefix = CATEGORY_PREFIXES.get(category.lower())
+        if prefix and field in CATEGORY_FIELDS[prefix]:
+            qualified.append(field if field == prefix else f"{prefix}_{field}")
+            continue
+        prefix = None
+        qualified.append(f"DEF_{field}" if field in DEFENSIVE_FIELDS else field)
+    return qualified
+
+
+class TeamTable:
+    """Parsed rows of one team file"""
+
+    def __init__(self, names: List[str], positions: List[str], categories: List[str],
+                 fields: List[str], stats: np.ndarray):
+        self.names = names
+        self.positions = positions
+        self.categories = categories  # First header row (category per column)
+        self.fields = fields  # Second header row (field name per column)
+        self.stats = stats  # (rows, numeric columns) in the order of numeric_fields
+
+    @property
+    def numeric_columns(self) -> List[int]:
+        """Indices of the header columns stored in the stat matrix"""
+        return [i for i, field in enumerate(self.fields) if field not in TEXT_COLUMNS]
+
+    @property
+    def numeric_fields(self) -> List[str]:
+        return [self.fields[i] for i in self.numeric_columns]
+
+    @property
+    def stat_names(self) -> List[str]:
+        """Category-qualified name of every stat matrix column"""
+        qualified = qualify_fields(self.categories, self.fields)
+        return [qualified[i] for i in self.numeric_columns]
+
+    def column(self, name: str) -> np.ndarray:
+        """Stat column by qualified name (or raw field name, last one when it repeats)"""
+        names = self.stat_names
+        if name not in names:
+            names = self.numeric_fields
+        index = len(names) - 1 - names[::-1].index(name)
+        return self.stats[:, index]
+
+
+def parse_team_file(filepath: str) -> Optional[TeamTable]:
+    """
+    Parse one team CSV; returns None if it has no header rows
+    
+    Every numeric column is kept (repeated field names included); use
+    TeamTable.stat_names for their category-qualified names.
+    """
+    with open(filepath, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+    # Skip first line (category headers), use second line as field names
+    if len(rows) < 2:
+        return None
+    categories = [cell.strip() for cell in rows[0]]
+    fields = [cell.strip() for cell in rows[1]]
+    categories += [''] * (len(fields) - len(categories))
+
+    name_col = fields.index('NAME')
+    pos_col = fields.index('POS')
+    fpts_col = len(fields) - 1 - fields[::-1].index('FPTS')
+    numeric = [i for i, field in enumerate(fields) if field not in TEXT_COLUMNS]
+
+    names, positions, values = [], [], []
+    for parts in rows[2:]:
+        if len(parts) < len(fields):
+            continue
+        name = parts[name_col].strip()
+        # Skip blank and repeated header rows
+        if not name or name == 'NAME':
+            continue
+        try:
+            float(parts[fpts_col])
+        except ValueError:
+            continue
+        row = []
+        for i in numeric:
+            try:
+                row.append(float(parts[i]) if parts[i].strip() else 0.0)
+            except ValueError:
+                row.append(np.nan)
+        names.append(name)
+        positions.append(parts[pos_col].strip())
+        values.append(row)
+
+    stats = np.array(values, dtype=np.float64).reshape(len(values), len(numeric))
+    return TeamTable(names, positions, categories[:len(fields)], fields, stats)
+
+
+def file_hash(filepath: str) -> str:
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_signature(filepath: str) -> Tuple[int, int]:
+    stat = os.stat(filepath)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TeamDataCache:
+    """Loads team tables, reusing the binary snapshot for unchanged files"""
+
+    def __init__(self, cache_dir: str, workers: int = None):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self.parsed: List[str] = []  # Teams re-parsed by the last load
+        self.reused: List[str] = []  # Teams loaded from the snapshot by the last load
+        self._dirty = False  # Manifest needs rewriting
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {'version': CACHE_VERSION, 'teams': {}}
+        if manifest.get('version') != CACHE_VERSION:
+            return {'version': CACHE_VERSION, 'teams': {}}
+        return manifest
+
+    def _stats_path(self, team: str) -> str:
+        return os.path.join(self.cache_dir, f"{team}.npy")
+
+    def _cached_table(self, team: str, entry: Dict, filepath: str) -> Optional[TeamTable]:
+        """Snapshot table for a team if its source is unchanged, else None"""
+        stats_path = self._stats_path(team)
+        if not os.path.exists(stats_path):
+            return None
+        mtime_ns, size = file_signature(filepath)
+        if [mtime_ns, size] != entry.get('signature'):
+            # Touched or rewritten: only trust the snapshot if the content is identical
+            if size != entry.get('signature', [0, -1])[1] or file_hash(filepath) != entry.get('sha1'):
+                return None
+            entry['signature'] = [mtime_ns, size]
+            self._dirty = True
+        try:
+            stats = np.load(stats_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return TeamTable(entry['names'], entry['positions'], entry['categories'], entry['fields'], stats)
+
+    def load(self, team_files: Dict[str, str]) -> Dict[str, TeamTable]:
+        """
+        Load every team file (team code -> path)
+
+        Missing files are reported and skipped.
+        """
+        manifest = self._read_manifest()
+        tables: Dict[str, TeamTable] = {}
+        stale = []
+        self.parsed, self.reused = [], []
+        self._dirty = False
+        for team, filepath in team_files.items():
+            if not os.path.exists(filepath):
+                print(f"Warning: File not found: {filepath}")
+                continue
+            entry = manifest['teams'].get(team)
+            table = self._cached_table(team, entry, filepath) if entry else None
+            if table is None:
+                stale.append(team)
+            else:
+                tables[team] = table
+                self.reused.append(team)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                parsed = list(pool.map(lambda team: parse_team_file(team_files[team]), stale))
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for team, table in zip(stale, parsed):
+                if table is None:
+                    manifest['teams'].pop(team, None)
+                    continue
+                np.save(self._stats_path(team), table.stats)
+                mtime_ns, size = file_signature(team_files[team])
+                manifest['teams'][team] = {
+                    'signature': [mtime_ns, size],
+                    'sha1': file_hash(team_files[team]),
+                    'names': table.names,
+                    'positions': table.positions,
+                    'categories': table.categories,
+                    'fields': table.fields,
+                }
+                tables[team] = table
+                self.parsed.append(team)
+
+        if stale or self._dirty:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self.manifest_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, self.manifest_path)
+
+        # Keep the configured team order regardless of which path loaded each team
+        return {team: tables[team] for team in team_files if team in tables}
+
+
+def load_team_tables(data_dir: str, team_files: Dict[str, str], use_cache: bool = True,
+                     cache_dir: str = None, workers: int = None) -> Dict[str, TeamTable]:
+    """Load all team tables from data_dir, through the snapshot cache unless disabled"""
+    paths = {team: os.path.join(data_dir, filename) for team, filename in team_files.items()}
+    if not use_cache:
+        tables = {}
+        existing = []
+        for team, path in paths.items():
+            if os.path.exists(path):
+                existing.append(team)
+            else:
+                print(f"Warning: File not found: {path}")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for team, table in zip(existing, pool.map(lambda t: parse_team_file(paths[t]), existing)):
+                if table is not None:
+                    tables[team] = table
+        return tables
+    cache = TeamDataCache(cache_dir or os.path.join(data_dir, CACHE_DIR_NAME), workers)
+    return cache.load(paths)
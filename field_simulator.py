@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Opponent Field Simulation
+
+The league pays only 1st, 2nd and 3rd, so a plan's value depends on what the
+other entries do. FieldSimulator builds a field of opponent entries from the
+same player pool and scores a plan and the whole field together over sampled
+weekly points and brackets (projections.PlanSampler):
+
+- Opponents are noisy greedy planners. Each one rates every player as the
+  optimizer's planning value times a lognormal opinion of its own (the same in
+  every week), then fills each week best-rated first under the roster rules
+  (RosterRules.can_add, the same tables as is_valid_lineup), never reusing a
+  player and skipping teams the assumed bracket has eliminated. Noise 0 gives a
+  field of copies of the greedy plan; more noise spreads the field out.
+- Scoring streams through the samples in chunks. A chunk draws the points of
+  every (player, week) pair the field or the plan uses (same-team players
+  share the sampler's team game states), zeroes the weeks a team does not
+  play, and turns them into every entry's total with one matrix product
+  against the (pair, entry) incidence matrix. Only per-sample results
+  are kept, so memory stays at about chunk size x (pairs + entries) floats for
+  any number of samples or entries.
+
+The result is the plan's finish-position distribution, expected dollars under
+the payout table, and each sample's paid lines (the field's top totals), which
+drive the payout objective in projections.py. A tie with opponents shares the
+tied places evenly.
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from projections import PlanSampler
+
+
+class FieldResult:
+    """A plan's finish against a simulated field"""
+
+    def __init__(self, finish: np.ndarray, paid_lines: np.ndarray, payouts: Sequence[float], n_opponents: int):
+        self.finish = finish  # finish[k]: probability of finishing (k + 1)th; None without a plan
+        self.paid_lines = paid_lines  # (samples, places) field's best totals, best first
+        self.payouts = np.asarray(payouts, dtype=float)
+        self.n_opponents = n_opponents
+
+    @property
+    def n_entries(self) -> int:
+        """Entries scored: the field, plus the plan if there was one"""
+        return self.n_opponents + (self.finish is not None)
+
+    def _plan_finish(self) -> np.ndarray:
+        if self.finish is None:
+            raise ValueError("No plan was scored against the field, so it has no finish distribution")
+        return self.finish
+
+    def paid_probabilities(self) -> np.ndarray:
+        """Probability of each paid place"""
+        return self._plan_finish()[:len(self.payouts)]
+
+    def expected_dollars(self) -> float:
+        return float(self.paid_probabilities() @ self.payouts[:self.n_entries])
+
+    def median_finish(self) -> int:
+        return int(np.searchsorted(np.cumsum(self._plan_finish()), 0.5) + 1)
+
+
+class FieldSimulator:
+    """Noisy-greedy opponent field scored together with a plan, chunk by chunk"""
+
+    NOISE = 0.3  # Standard deviation of an opponent's log opinion of a player
+    CHUNK_SIZE = 8192  # Samples scored at a time
+    PAYOUTS = (400.0, 200.0, 50.0)  # Dollars for 1st, 2nd, 3rd
+
+    def __init__(self, optimizer, sampler: PlanSampler, n_opponents: int, noise: float = None,
+                 seed: int = None, payouts: Sequence[float] = None):
+        self.optimizer = optimizer
+        self.sampler = sampler
+        self.noise = self.NOISE if noise is None else noise
+        self.payouts = tuple(payouts) if payouts else self.PAYOUTS
+        self.seed = sampler.seed if seed is None else seed
+        self.entries = self.build_field(n_opponents)
+
+    def build_field(self, n_opponents: int) -> List[Dict[int, List[int]]]:
+        """Opponent plans as week -> player ids"""
+        optimizer = self.optimizer
+        store = optimizer.players
+        rules = optimizer.roster_rules()
+        codes = optimizer.lineup_positions()
+        values = np.array(optimizer.valuation().values)
+        values[codes < 0] = -np.inf
+        eliminated = 0
+        for week in range(1, optimizer.PLAYOFF_WEEKS + 1):
+            values[store.team_mask(eliminated)[store.team], week - 1] = -np.inf
+            eliminated |= store.team_bits(optimizer.ASSUMED_ELIMINATIONS.get(week, []))
+
+        rng = np.random.default_rng([self.seed, n_opponents])
+        opinions = np.exp(self.noise * rng.standard_normal((n_opponents, len(store))))
+        entries = []
+        for opinion in opinions:
+            used = np.zeros(len(store), dtype=bool)
+            plan = {}
+            for week in range(1, optimizer.PLAYOFF_WEEKS + 1):
+                rating = np.where(used, -np.inf, values[:, week - 1] * opinion)
+                state, lineup = rules.EMPTY, []
+                for player_id in np.argsort(-rating, kind='stable').tolist():
+                    if len(lineup) == rules.size or rating[player_id] == -np.inf:
+                        break
+                    if rules.can_add(state, codes[player_id]):
+                        state = rules.add(state, codes[player_id])
+                        lineup.append(player_id)
+                used[lineup] = True
+                plan[week] = lineup
+            entries.append(plan)
+        return entries
+
+    def simulate(self, plan: Dict[int, Sequence[int]] = None) -> FieldResult:
+        """
+        Score the plan (week -> player ids) and the field over every sample
+
+        Without a plan, only the field's paid lines are computed.
+        """
+        sampler = self.sampler
+        entries = ([plan] if plan is not None else []) + self.entries
+        pairs = sorted({(int(player_id), week) for entry in entries
+                        for week, ids in entry.items() for player_id in ids})
+        column = {pair: j for j, pair in enumerate(pairs)}
+        incidence = np.zeros((len(pairs), len(entries)), dtype=np.float32)
+        for e, entry in enumerate(entries):
+            for week, ids in entry.items():
+                incidence[[column[(int(player_id), week)] for player_id in ids], e] = 1.0
+
+        n_field = len(self.entries)
+        places = len(self.payouts)
+        steps = np.zeros(n_field + 2)  # Differences of the finish counts
+        paid_lines = np.full((sampler.n_samples, places), -np.inf)
+        for start in range(0, sampler.n_samples, self.CHUNK_SIZE):
+            stop = min(start + self.CHUNK_SIZE, sampler.n_samples)
+            points = sampler.points(pairs, start, stop)
+            plays = sampler.plays(pairs, start, stop)
+            if plays is not None:
+                points *= plays
+            totals = points @ incidence  # (chunk, entries)
+            field = totals[:, 1:] if plan is not None else totals
+
+            best = min(places, n_field)
+            if best:
+                top = np.partition(field, n_field - best, axis=1)[:, n_field - best:]
+                paid_lines[start:stop, :best] = -np.sort(-top, axis=1)
+            if plan is not None:
+                mine = totals[:, :1]
+                ahead = (field > mine).sum(axis=1)
+                tied = (field == mine).sum(axis=1)
+                # Spread each sample evenly over places ahead + 1 .. ahead + tied + 1
+                share = 1.0 / (tied + 1)
+                np.add.at(steps, ahead, share)
+                np.add.at(steps, ahead + tied + 1, -share)
+
+        finish = np.cumsum(steps)[:-1] / sampler.n_samples if plan is not None else None
+        return FieldResult(finish, paid_lines, self.payouts, n_field)
+
+
+def print_field_result(result: FieldResult):
+    """Print a plan's finish distribution and expected dollars against the field"""
+    print(f"\nFinish against a field of {result.n_opponents} simulated opponents:")
+    print("-" * 70)
+    places = ' / '.join(f"{p:.3f}" for p in result.paid_probabilities())
+    print(f"  Paid places (1st / 2nd / ...): {places}")
+    print(f"  Median finish: {result.median_finish()} of {result.n_entries}")
+    payouts = ' / '.join(f"${amount:.0f}" for amount in result.payouts)
+    print(f"  Expected dollars ({payouts}): ${result.expected_dollars():.2f}")
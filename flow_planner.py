@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Min-Cost-Flow Planning
+
+A fast planning mode for very large player pools. Giving every player at most
+one week is close to a transportation problem, so the plan is solved as a flow
+network:
+
+    source -> player (capacity 1: each player plays at most once)
+           -> (week, lineup position) slot (cost: minus the player's value that week)
+           -> that week's flex groups -> week (capacity: lineup size) -> sink
+
+Position caps and flex-group maximums are capacities on the slot and group
+edges (flex slots are nested, so a week's groups form a tree). Sending lineup
+size x weeks units at minimum cost, by successive shortest paths with Dijkstra
+on reduced costs, takes polynomial time. The network drops the per-position
+minimums, so its value is an upper bound on the best valid plan.
+
+The flow's plan is then repaired week by week: each week takes the valid count
+vector (RosterRules.valid_counts) whose best players, kept from the flow's
+lineup or not needed by a later week, are worth the most, provided the later
+weeks can still be filled; otherwise it backtracks. Should the repair run out
+of attempts, the plan falls back to the exact solver on the pruned pool. The
+plan meets every roster rule, and its distance to the flow bound is the
+reported gap.
+
+Only a position's top (cap x weeks) players in a week can carry flow in an
+optimal solution, so the network stays a few hundred edges however large the
+pool is; the pruning and the repair are array operations over the pool.
+"""
+
+import heapq
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from lineup_solver import PlanSolution, solve_plan
+from roster_rules import RosterRules
+
+
+REPAIR_ATTEMPTS = 64  # Lineups the repair may try before falling back to the exact solver
+
+
+class FlowNetwork:
+    """Directed graph with integer capacities and float costs for min-cost flow"""
+
+    def __init__(self, n_nodes: int):
+        self.edges: List[List[list]] = [[] for _ in range(n_nodes)]  # node -> [to, capacity, cost, reverse]
+
+    def add_edge(self, u: int, v: int, capacity: int, cost: float = 0.0) -> Tuple[int, int]:
+        """Add u -> v and its residual reverse edge; returns a handle for flow_on"""
+        self.edges[u].append([v, capacity, cost, len(self.edges[v])])
+        self.edges[v].append([u, 0, -cost, len(self.edges[u]) - 1])
+        return u, len(self.edges[u]) - 1
+
+    def flow_on(self, handle: Tuple[int, int]) -> int:
+        """Units of flow on an edge added by add_edge"""
+        u, index = handle
+        v, _, _, reverse = self.edges[u][index]
+        return self.edges[v][reverse][1]
+
+    def min_cost_flow(self, source: int, sink: int, amount: int) -> Tuple[int, float]:
+        """
+        Send up to `amount` units from source to sink at minimum total cost
+
+        Nodes must be numbered in a topological order of the initial graph
+        (every edge from a lower to a higher node), which gives the first
+        potentials without Bellman-Ford. Returns (units sent, total cost).
+        """
+        n = len(self.edges)
+        potential = [np.inf] * n
+        potential[source] = 0.0
+        for u in range(n):
+            if potential[u] < np.inf:
+                for v, capacity, cost, _ in self.edges[u]:
+                    if capacity > 0 and potential[u] + cost < potential[v]:
+                        potential[v] = potential[u] + cost
+        potential = [p if p < np.inf else 0.0 for p in potential]
+
+        flow, total = 0, 0.0
+        while flow < amount:
+            dist = [np.inf] * n
+            previous = [None] * n
+            dist[source] = 0.0
+            heap = [(0.0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if u == sink:
+                    break
+                base = d + potential[u]
+                for index, (v, capacity, cost, _) in enumerate(self.edges[u]):
+                    if capacity > 0:
+                        nd = base + cost - potential[v]
+                        # Rounding on tied values leaves reduced costs a hair below zero;
+                        # the margin keeps zero-cost cycles from being relaxed forever
+                        if nd < dist[v] - 1e-9:
+                            dist[v] = nd
+                            previous[v] = (u, index)
+                            heapq.heappush(heap, (nd, v))
+            if dist[sink] == np.inf:
+                break
+            # Capping at the sink's distance keeps every reduced cost non-negative
+            reach = dist[sink]
+            potential = [p + min(d, reach) for p, d in zip(potential, dist)]
+
+            push, v = amount - flow, sink
+            while v != source:
+                u, index = previous[v]
+                push = min(push, self.edges[u][index][1])
+                v = u
+            v = sink
+            while v != source:
+                u, index = previous[v]
+                edge = self.edges[u][index]
+                edge[1] -= push
+                self.edges[v][edge[3]][1] += push
+                total += push * edge[2]
+                v = u
+            flow += push
+        return flow, total
+
+
+def candidate_mask(values: np.ndarray, positions: np.ndarray, rules: RosterRules) -> np.ndarray:
+    """
+    (players, weeks) mask of the pairs that can carry flow in an optimal plan
+
+    A position never fills more than cap x weeks slots, so a player ranked
+    below that in a week can always be swapped for an idle better one.
+    """
+    n_weeks = values.shape[1]
+    keep = np.zeros(values.shape, dtype=bool)
+    for code in range(len(rules.positions)):
+        rows = np.flatnonzero(positions == code)
+        limit = int(rules.caps[code]) * n_weeks
+        for week in range(n_weeks):
+            available = rows[np.isfinite(values[rows, week])]
+            if len(available) > limit:
+                top = np.argpartition(-values[available, week], limit - 1)[:limit] if limit else []
+                available = available[top]
+            keep[available, week] = True
+    return keep
+
+
+def flow_relaxation(values: np.ndarray, positions: np.ndarray,
+                    rules: RosterRules) -> Tuple[List[List[int]], float]:
+    """
+    Min-cost flow over the network in the module docstring
+
+    Returns (per-week player rows, flow value). The value is an upper bound on
+    any plan meeting the roster rules. Raises ValueError when the pool cannot
+    fill every lineup even without position minimums.
+    """
+    n_weeks = values.shape[1]
+    n_positions = len(rules.positions)
+    pairs = np.argwhere(candidate_mask(values, positions, rules))  # (row, week), row-major
+    rows = np.unique(pairs[:, 0])
+
+    # Flex groups innermost first, each pointing at the smallest group around it;
+    # the last group is the whole lineup, which is the week node itself
+    flex_groups = sorted(rules.groups[:-1], key=lambda group: len(group[0]))
+    parents = []
+    for index, (members, _, _) in enumerate(flex_groups):
+        outer = [other for other in range(index + 1, len(flex_groups))
+                 if set(members) < set(flex_groups[other][0])]
+        parents.append(outer[0] if outer else None)
+    innermost = [next((index for index, (members, _, _) in enumerate(flex_groups) if code in members), None)
+                 for code in range(n_positions)]
+
+    # Nodes in topological order: source, players, slots, groups, weeks, sink
+    source = 0
+    player_node = {row: 1 + i for i, row in enumerate(rows.tolist())}
+    slot_base = 1 + len(rows)
+    group_base = slot_base + n_weeks * n_positions
+    week_base = group_base + n_weeks * len(flex_groups)
+    sink = week_base + n_weeks
+    network = FlowNetwork(sink + 1)
+
+    def group_node(week, index):
+        return week_base + week if index is None else group_base + week * len(flex_groups) + index
+
+    for row, node in player_node.items():
+        network.add_edge(source, node, 1)
+    assignments = []
+    for row, week in pairs.tolist():
+        handle = network.add_edge(player_node[row], slot_base + week * n_positions + positions[row], 1,
+                                  -values[row, week])
+        assignments.append((row, week, handle))
+    for week in range(n_weeks):
+        for code in range(n_positions):
+            network.add_edge(slot_base + week * n_positions + code, group_node(week, innermost[code]),
+                             int(rules.caps[code]))
+        for index, (_, _, high) in enumerate(flex_groups):
+            network.add_edge(group_node(week, index), group_node(week, parents[index]), high)
+        network.add_edge(week_base + week, sink, rules.size)
+
+    flow, cost = network.min_cost_flow(source, sink, rules.size * n_weeks)
+    if flow < rules.size * n_weeks:
+        raise ValueError("No combination of position counts fills every lineup")
+    weeks = [[] for _ in range(n_weeks)]
+    for row, week, handle in assignments:
+        if network.flow_on(handle):
+            weeks[week].append(row)
+    return weeks, -cost
+
+
+def week_lineups(values: np.ndarray, positions: np.ndarray, rules: RosterRules, week: int,
+                 open_rows: np.ndarray) -> Iterator[List[int]]:
+    """
+    Best lineup of each valid count vector from the open players, best first
+
+    Count vectors the open players cannot fill are skipped.
+    """
+    n_positions = len(rules.positions)
+    column = values[:, week]
+    open_rows = open_rows & np.isfinite(column)
+    width = int(rules.caps.max()) + 1
+    best_sums = np.full((n_positions, width), -np.inf)  # position, players taken -> best total
+    best_rows = []
+    for code in range(n_positions):
+        candidates = np.flatnonzero(open_rows & (positions == code))
+        take = min(int(rules.caps[code]), len(candidates))
+        if take < len(candidates):
+            top = np.argpartition(-column[candidates], take - 1)[:take] if take else []
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-column[candidates], kind='stable')]
+        best_sums[code, :take + 1] = np.concatenate([[0.0], np.cumsum(column[candidates])])
+        best_rows.append(candidates)
+    totals = best_sums[np.arange(n_positions), rules.valid_counts].sum(axis=1)
+    for choice in np.argsort(-totals, kind='stable'):
+        if not np.isfinite(totals[choice]):
+            break
+        yield [int(row) for code, count in enumerate(rules.valid_counts[choice])
+               for row in best_rows[code][:count]]
+
+
+def repair_plan(values: np.ndarray, positions: np.ndarray, rules: RosterRules,
+                weeks: Sequence[Sequence[int]]) -> List[List[int]]:
+    """
+    Make every week meet the roster rules, week by week
+
+    Each week tries week_lineups best first: first from players the flow gives
+    no later week, then from any player left. A lineup is kept only if the
+    later weeks can still be filled, so no week uses up players a later week
+    needs. Raises ValueError when no plan is found within REPAIR_ATTEMPTS
+    lineups.
+    """
+    flow_week = np.full(len(values), -1)
+    for week, rows in enumerate(weeks):
+        flow_week[list(rows)] = week
+    taken = np.zeros(len(values), dtype=bool)
+    attempts = 0
+
+    def search(week):
+        nonlocal attempts
+        if week == len(weeks):
+            return []
+        tried = set()
+        for open_rows in (~taken & (flow_week <= week), ~taken):
+            for lineup in week_lineups(values, positions, rules, week, open_rows):
+                if frozenset(lineup) in tried:
+                    continue
+                tried.add(frozenset(lineup))
+                attempts += 1
+                if attempts > REPAIR_ATTEMPTS:
+                    return None
+                taken[lineup] = True
+                rest = search(week + 1)
+                if rest is not None:
+                    return [lineup] + rest
+                taken[lineup] = False
+        return None
+
+    repaired = search(0)
+    if repaired is None:
+        raise ValueError(f"No valid plan found within {REPAIR_ATTEMPTS} repair attempts")
+    return repaired
+
+
+def solve_plan_flow(values: np.ndarray, positions: Sequence[int], rules: RosterRules) -> PlanSolution:
+    """
+    Multi-week plan from the flow relaxation plus repair
+
+    Arguments are the same as lineup_solver.solve_plan. The solution's
+    upper_bound is the flow value, so its gap bounds how far the plan can be
+    from optimal.
+    """
+    values = np.asarray(values, dtype=float)
+    positions = np.asarray(positions, dtype=np.int64)
+    weeks, bound = flow_relaxation(values, positions, rules)
+    try:
+        weeks = repair_plan(values, positions, rules, weeks)
+    except ValueError:
+        # The pruned pool still holds an optimal plan, and it is small enough to solve exactly
+        pool = np.flatnonzero(candidate_mask(values, positions, rules).any(axis=1))
+        exact = solve_plan(values[pool], positions[pool], rules)
+        weeks = [pool[rows].tolist() for rows in exact.weeks]
+    objective = float(sum(values[rows, week].sum() for week, rows in enumerate(weeks)))
+    return PlanSolution(weeks, objective, bound)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Opt-in Pipeline Instrumentation
+
+Records wall time and call counts for the optimizer's stages, plus named
+counters (candidates scanned and rejected per position, gap-filling fallbacks,
+players loaded). Results come out as a summary table or as a JSON trace in the
+Chrome trace-event format, which chrome://tracing and Perfetto can open.
+
+Instrumentation is off unless an Instrumentation object is attached
+(PlayoffOptimizer.instruments). The default NULL_INSTRUMENTATION does nothing:
+instrumented methods check one flag and call straight through, and counters
+are only computed behind `if instruments.enabled`.
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+
+class Instrumentation:
+    """Collects timed spans and counters"""
+
+    enabled = True
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Dict] = []  # Completed spans in completion order
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args):
+        """Time the enclosed block as one call of `name`; args go into the trace"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({'name': name, 'start': start - self.origin,
+                               'duration': time.perf_counter() - start, 'args': args})
+
+    def count(self, name: str, n: int = 1):
+        """Add n to a named counter"""
+        self.counters[name] += n
+
+    def summary(self) -> List[Dict]:
+        """Calls, total, mean and max seconds per span name, slowest total first"""
+        stages = defaultdict(list)
+        for span in self.spans:
+            stages[span['name']].append(span['duration'])
+        rows = [{'name': name, 'calls': len(durations), 'total': sum(durations),
+                 'mean': sum(durations) / len(durations), 'max': max(durations)}
+                for name, durations in stages.items()]
+        return sorted(rows, key=lambda row: -row['total'])
+
+    def trace(self) -> Dict:
+        """Chrome trace-event JSON (complete events in microseconds) plus the counters"""
+        pid = os.getpid()
+        events = [{'name': span['name'], 'ph': 'X', 'ts': span['start'] * 1e6,
+                   'dur': span['duration'] * 1e6, 'pid': pid, 'tid': 0, 'args': span['args']}
+                  for span in sorted(self.spans, key=lambda span: span['start'])]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'counters': dict(self.counters)}
+
+    def write_trace(self, path: str):
+        """Write the JSON trace to a file"""
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f, indent=1)
+
+    def print_summary(self):
+        """Print stage timings and counters"""
+        print("\nStage timings (inclusive of nested stages):")
+        print("-" * 70)
+        print(f"  {'stage':<32s} {'calls':>6s} {'total ms':>10s} {'mean ms':>9s} {'max ms':>9s}")
+        for row in self.summary():
+            print(f"  {row['name']:<32s} {row['calls']:>6d} {row['total'] * 1000:>10.2f} "
+                  f"{row['mean'] * 1000:>9.3f} {row['max'] * 1000:>9.3f}")
+        if self.counters:
+            print("\nCounters:")
+            print("-" * 70)
+            for name in sorted(self.counters):
+                print(f"  {name:<48s} {self.counters[name]:>12,d}")
+
+
+class NullInstrumentation(Instrumentation):
+    """Instrumentation that records nothing"""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+        self._null_span = contextlib.nullcontext()
+
+    def span(self, name: str, **args):
+        return self._null_span
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+def instrumented(name: str, *record: str):
+    """
+    Time every call of a method as a span of `name`
+
+    The method's object must have an `instruments` attribute. Parameters listed
+    in `record` (e.g. 'week') are added to the span's trace arguments.
+    """
+    def decorate(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instruments = self.instruments
+            if not instruments.enabled:
+                return method(self, *args, **kwargs)
+            span_args = {}
+            if record:
+                bound = signature.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                span_args = {param: bound.arguments[param] for param in record}
+            with instruments.span(name, **span_args):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Checkpointed, Reproducible Simulation Jobs
+
+Sweeps and large simulations can run for hours. run_job splits such a job into
+numbered chunks and guarantees:
+
+- Deterministic randomness: chunk i draws from SeedSequence(seed,
+  spawn_key=(i,)), the i-th child SeedSequence(seed).spawn() would give, so
+  its stream depends only on the seed and the chunk, never on which worker
+  runs it or when.
+- Ordered aggregation: chunk results are merged into the aggregate in chunk
+  order, however the pool finishes them, so floating-point sums add up the
+  same way every time.
+- Checkpoints: every checkpoint_every seconds, on Ctrl-C and at the end, the
+  aggregate and the number of merged chunks are written to a JSON file
+  atomically (temporary file + os.replace).
+- Resume: a job started with an existing checkpoint continues after its last
+  merged chunk.
+
+Together these make a resumed run bit-identical to an uninterrupted one with
+the same seed, for any number of workers and any number of interruptions. A
+checkpoint records a hash of the job's inputs, and resuming a different job
+from it raises ValueError. Aggregates must therefore be JSON values (JSON
+floats round-trip exactly).
+
+Tasks follow the repo's pool convention: the caller's worker initializer runs
+in the parent first and pool workers are forked from it (or run the
+initializer where fork is unavailable), so only chunk numbers travel per task.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from league_state import inputs_hash
+
+
+CHECKPOINT_VERSION = 1
+IN_FLIGHT_PER_WORKER = 2  # Chunks queued per worker; bounds memory held by out-of-order results
+
+
+def chunk_seed(seed: int, chunk: int) -> np.random.SeedSequence:
+    """Independent seed sequence of one chunk"""
+    return np.random.SeedSequence(seed, spawn_key=(chunk,))
+
+
+def read_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """Checkpoint contents, or None when there is no checkpoint yet"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def resolve_seed(seed: Optional[int], checkpoint: str = None) -> int:
+    """
+    The seed to run with
+
+    An explicit seed wins; otherwise a checkpoint's seed is reused so the job
+    resumes, and a fresh job gets a random seed that its checkpoints record.
+    """
+    if seed is not None:
+        return seed
+    saved = read_checkpoint(checkpoint)
+    if saved is not None:
+        return saved['seed']
+    return int(np.random.SeedSequence().entropy % (1 << 63))
+
+
+def write_checkpoint(path: str, state: Dict[str, Any]):
+    """Write a checkpoint atomically"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _job(seed: int, n_chunks: int, inputs: Any) -> Dict[str, Any]:
+    """What identifies a job in its checkpoints"""
+    return {'version': CHECKPOINT_VERSION, 'seed': seed, 'chunks': n_chunks, 'inputs': inputs_hash(inputs)}
+
+
+def load_checkpoint(path: str, seed: int, n_chunks: int, inputs: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    A job's checkpoint, or None when there is none yet
+
+    Raises ValueError when the checkpoint was written by a job with another
+    seed, chunk count or inputs. Call it before touching side outputs that a
+    resume would reuse.
+    """
+    saved = read_checkpoint(path)
+    job = _job(seed, n_chunks, inputs)
+    if saved is not None and {key: saved.get(key) for key in job} != job:
+        raise ValueError(f"Checkpoint {path} belongs to a different job "
+                         f"(other seed, chunk count or inputs); remove it to start over")
+    return saved
+
+
+def run_job(task: Callable[[int, np.random.SeedSequence], Any], n_chunks: int, seed: int,
+            merge: Callable[[Any, Any], Any], initial: Any, inputs: Any = None,
+            workers: int = None, checkpoint: str = None, checkpoint_every: float = 60.0,
+            initializer: Callable = None, initargs: Sequence = (),
+            on_checkpoint: Callable[[Any], None] = None) -> Any:
+    """
+    Run chunks 0..n_chunks-1 and fold their results into one aggregate
+
+    task(chunk, seed_sequence): picklable module-level function run on the
+    pool; merge(aggregate, result): returns the new aggregate, run in chunk
+    order in this process. inputs: anything that defines the job besides the
+    seed (parameters, data identity); its hash guards resumption.
+    on_checkpoint(aggregate): called before each checkpoint is written, so
+    callers can flush side outputs the aggregate refers to.
+    Returns the final aggregate.
+    """
+    job = _job(seed, n_chunks, inputs)
+    aggregate, done = initial, 0
+    saved = load_checkpoint(checkpoint, seed, n_chunks, inputs)
+    if saved is not None:
+        aggregate, done = saved['aggregate'], saved['done']
+
+    def save():
+        if checkpoint:
+            if on_checkpoint is not None:
+                on_checkpoint(aggregate)
+            write_checkpoint(checkpoint, dict(job, done=done, aggregate=aggregate))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, n_chunks - done))
+    if initializer is not None:
+        initializer(*initargs)
+    pool = None
+    if workers > 1:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=tuple(initargs))
+
+    last_saved = time.monotonic()
+    pending = {}
+    try:
+        submitted = done
+        while done < n_chunks:
+            if pool is None:
+                result = task(done, chunk_seed(seed, done))
+            else:
+                while submitted < n_chunks and len(pending) < workers * IN_FLIGHT_PER_WORKER:
+                    pending[submitted] = pool.submit(task, submitted, chunk_seed(seed, submitted))
+                    submitted += 1
+                result = pending.pop(done).result()
+            aggregate = merge(aggregate, result)
+            done += 1
+            if checkpoint and time.monotonic() - last_saved >= checkpoint_every:
+                save()
+                last_saved = time.monotonic()
+    except KeyboardInterrupt:
+        save()
+        raise
+    finally:
+        if pool is not None:
+            for future in pending.values():
+                future.cancel()
+            pool.shutdown()
+    save()
+    return aggregate
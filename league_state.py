@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Persisted League State
+
+Keeps what actually happened so far in a JSON file, so each real playoff week
+only needs the new results instead of hand-editing the optimizer:
+
+- current_week: first week that has not been locked yet
+- locked_lineups: lineups actually played, by week ("TEAM_Name" keys)
+- excluded_players: players used outside any locked lineup (manual additions)
+- used_players: every player already used, rebuilt from the locked lineups
+  and excluded_players whenever a week is locked
+- eliminations: teams actually eliminated at the end of each played week
+- plan / plan_inputs: the last plan and a hash of the inputs that produced it,
+  used to warm-start the next run
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List
+
+
+class LeagueState:
+    """Real results and the latest plan, persisted between runs"""
+
+    def __init__(self):
+        self.current_week = 1
+        self.locked_lineups: Dict[int, List[str]] = {}
+        self.excluded_players: List[str] = []
+        self.used_players: List[str] = []
+        self.eliminations: Dict[int, List[str]] = {}
+        self.plan: Dict[int, List[str]] = {}
+        self.plan_inputs: str = None
+
+    @classmethod
+    def load(cls, path: str) -> 'LeagueState':
+        """Load a state file; a missing file gives a fresh state"""
+        state = cls()
+        if not os.path.exists(path):
+            return state
+        with open(path, 'r') as f:
+            data = json.load(f)
+        state.current_week = data.get('current_week', 1)
+        state.locked_lineups = {int(week): keys for week, keys in data.get('locked_lineups', {}).items()}
+        # Used players outside the locked lineups were added by hand; keep them as exclusions
+        locked = {key for keys in state.locked_lineups.values() for key in keys}
+        state.excluded_players = sorted(set(data.get('excluded_players', []))
+                                        | (set(data.get('used_players', [])) - locked))
+        state.used_players = sorted(locked | set(state.excluded_players))
+        state.eliminations = {int(week): teams for week, teams in data.get('eliminations', {}).items()}
+        state.plan = {int(week): keys for week, keys in data.get('plan', {}).items()}
+        state.plan_inputs = data.get('plan_inputs')
+        return state
+
+    def save(self, path: str):
+        """Write the state file atomically"""
+        data = {
+            'current_week': self.current_week,
+            'locked_lineups': {str(week): keys for week, keys in sorted(self.locked_lineups.items())},
+            'excluded_players': sorted(self.excluded_players),
+            'used_players': sorted(self.used_players),
+            'eliminations': {str(week): teams for week, teams in sorted(self.eliminations.items())},
+            'plan': {str(week): keys for week, keys in sorted(self.plan.items())},
+            'plan_inputs': self.plan_inputs,
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def lock_week(self, week: int, keys: List[str] = None):
+        """
+        Record the lineup actually played in a week
+
+        Without keys, the saved plan's lineup for that week is locked. A week
+        recorded again replaces its earlier lineup, and those players are
+        free again unless another week or an exclusion uses them.
+        """
+        if keys is None:
+            if week in self.locked_lineups:
+                return
+            if week not in self.plan:
+                raise ValueError(f"No lineup recorded or planned for week {week}")
+            keys = self.plan[week]
+        self.locked_lineups[week] = list(keys)
+        used = set(self.excluded_players)
+        for locked_keys in self.locked_lineups.values():
+            used.update(locked_keys)
+        self.used_players = sorted(used)
+
+    def record_eliminations(self, week: int, teams: List[str]):
+        """Record the teams actually eliminated at the end of a week"""
+        self.eliminations[week] = list(teams)
+
+    def advance_to(self, week: int):
+        """Lock every earlier week and make `week` the current one"""
+        for past_week in range(1, week):
+            self.lock_week(past_week)
+        self.current_week = week
+
+
+def inputs_hash(*parts) -> str:
+    """Stable hash of the inputs a plan depends on (bytes or JSON-serializable parts)"""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, bytes):
+            digest.update(part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
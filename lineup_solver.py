@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Exact multi-week lineup solver
+
+Plans every playoff week at once instead of committing greedily one week at a
+time. The problem decomposes cleanly:
+
+1. Each player fills exactly one lineup position, so once the number of
+   players per position per week (the "composition") is fixed, every position
+   is an independent assignment problem: give each week its slots from the
+   position's players, using each player at most once.
+2. Those assignment problems are solved exactly with the Hungarian algorithm
+   for every allowed capacity vector of the position (at most 2^weeks of them).
+3. A small dynamic program over positions then picks the capacity vectors whose
+   per-week counts satisfy the roster rules' group bounds (the lineup size and
+   any flex slots, see roster_rules.py).
+
+Because both stages are exact, the returned plan is provably optimal and the
+reported gap is zero.
+
+rank_plans enumerates plans best first on the same decomposition. Each
+(position, capacity vector) pair gets a lazily extended list of its assignments
+in score order (Murty's partitioning: a solved assignment splits the rest of
+the space by forcing its first pairs in and the next one out, one Hungarian
+solve per split). A plan is one capacity vector per position plus a rank into
+each of their lists, and a heap walks those rank vectors in score order, so
+the k-th plan costs a handful of small per-position solves rather than full
+re-solves.
+"""
+
+import heapq
+import itertools
+import operator
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from roster_rules import RosterRules
+
+
+# Cost used for unavailable (player, week) pairs inside the assignment solver.
+# Finite so the potentials stay well defined; any assignment that needs it is infeasible.
+UNAVAILABLE_COST = 1e12
+
+
+class PlanSolution:
+    """Result of an exact multi-week solve"""
+
+    def __init__(self, weeks: List[List[int]], objective: float, upper_bound: float):
+        self.weeks = weeks  # week index -> player indices in the lineup
+        self.objective = objective
+        self.upper_bound = upper_bound
+
+    @property
+    def gap(self) -> float:
+        """Distance between the plan's objective and the proven upper bound"""
+        return self.upper_bound - self.objective
+
+    def __repr__(self):
+        return f"PlanSolution(objective={self.objective:.1f}, gap={self.gap:.1f})"
+
+
+def solve_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Minimum-cost assignment of every row to a distinct column (rows <= columns)
+
+    Shortest augmenting path Hungarian algorithm with the inner loops over the
+    columns vectorized. Returns the column assigned to each row.
+    """
+    n_rows, n_cols = cost.shape
+    u = np.zeros(n_rows + 1)
+    v = np.zeros(n_cols + 1)
+    owner = np.zeros(n_cols + 1, dtype=np.int64)  # column -> row (1-based, 0 = free)
+    way = np.zeros(n_cols + 1, dtype=np.int64)
+    padded = np.zeros((n_rows + 1, n_cols + 1))
+    padded[1:, 1:] = cost
+
+    for row in range(1, n_rows + 1):
+        owner[0] = row
+        col0 = 0
+        min_slack = np.full(n_cols + 1, np.inf)
+        used = np.zeros(n_cols + 1, dtype=bool)
+        while True:
+            used[col0] = True
+            row0 = owner[col0]
+            free = ~used
+            free[0] = False
+            slack = padded[row0] - u[row0] - v
+            better = free & (slack < min_slack)
+            min_slack[better] = slack[better]
+            way[better] = col0
+            candidates = np.where(free, min_slack, np.inf)
+            col1 = int(np.argmin(candidates))
+            delta = candidates[col1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_slack[free] -= delta
+            col0 = col1
+            if owner[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            owner[col0] = owner[col1]
+            col0 = col1
+
+    assignment = np.empty(n_rows, dtype=np.int64)
+    for col in range(1, n_cols + 1):
+        if owner[col]:
+            assignment[owner[col] - 1] = col - 1
+    return assignment
+
+
+def solve_position(values: np.ndarray, capacities: Sequence[int]) -> Tuple[float, List[List[int]]]:
+    """
+    Best assignment of one position's players to weeks with exact slot counts
+
+    values: (players, weeks) array of week scores, -inf where unavailable
+    capacities: number of slots to fill in each week
+
+    Returns (total score, per-week player row indices). The score is -inf when
+    the slots cannot all be filled.
+    """
+    total_slots = sum(capacities)
+    if total_slots == 0:
+        return 0.0, [[] for _ in capacities]
+
+    # Position-bucket pruning: a player ranked below the top `total_slots` in a
+    # week can always be swapped for a better unassigned one, so only the top
+    # candidates of each week can appear in an optimal assignment.
+    candidates = set()
+    for week, slots in enumerate(capacities):
+        if slots == 0:
+            continue
+        column = values[:, week]
+        available = np.flatnonzero(np.isfinite(column))
+        if len(available) < slots:
+            return float('-inf'), []
+        if len(available) > total_slots:
+            top = np.argpartition(-column[available], total_slots - 1)[:total_slots]
+            available = available[top]
+        candidates.update(available.tolist())
+    candidates = sorted(candidates)
+    if len(candidates) < total_slots:
+        return float('-inf'), []
+
+    slot_weeks = [week for week, slots in enumerate(capacities) for _ in range(slots)]
+    sub = values[np.ix_(candidates, slot_weeks)].T  # rows = slots, columns = candidates
+    cost = np.where(np.isfinite(sub), -sub, UNAVAILABLE_COST)
+    assignment = solve_assignment(cost)
+    if np.any(cost[np.arange(len(slot_weeks)), assignment] >= UNAVAILABLE_COST):
+        return float('-inf'), []
+
+    weeks = [[] for _ in capacities]
+    total = 0.0
+    for slot, col in enumerate(assignment):
+        week = slot_weeks[slot]
+        weeks[week].append(candidates[col])
+        total += values[candidates[col], week]
+    return total, weeks
+
+
+def _group_counts(rules: RosterRules, n_weeks: int) -> Tuple[tuple, Callable, Callable, Callable]:
+    """
+    State space of the dynamic programs over positions
+
+    A state holds, for every week, the players placed so far in each of the
+    rules' groups (flex sets and the whole lineup). Returns (empty state,
+    delta(position code, capacities) -> what a capacity vector adds to a state,
+    add(state, delta) -> state or None past a group maximum,
+    complete(state) -> every group minimum met).
+    """
+    n_groups = len(rules.groups)
+    members = [[group for group, (codes, _, _) in enumerate(rules.groups) if code in codes]
+               for code in range(len(rules.positions))]
+    lows = [low for _, low, _ in rules.groups] * n_weeks
+    highs = [high for _, _, high in rules.groups] * n_weeks
+
+    def delta(code, capacities):
+        counts = [0] * (n_groups * n_weeks)
+        for week, count in enumerate(capacities):
+            for group in members[code]:
+                counts[week * n_groups + group] = count
+        return tuple(counts)
+
+    def add(state, step):
+        new_state = tuple(map(operator.add, state, step))
+        return new_state if all(map(operator.le, new_state, highs)) else None
+
+    def complete(state):
+        return all(map(operator.ge, state, lows))
+
+    return (0,) * (n_groups * n_weeks), delta, add, complete
+
+
+def _capacity_vectors(rules: RosterRules, code: int, n_weeks: int) -> Iterator[Tuple[int, ...]]:
+    """Every per-week player count a position can take under its minimum and cap"""
+    return itertools.product(range(int(rules.minimums[code]), int(rules.caps[code]) + 1), repeat=n_weeks)
+
+
+def solve_plan(values: np.ndarray, positions: Sequence[int], rules: RosterRules) -> PlanSolution:
+    """
+    Provably optimal multi-week plan
+
+    values: (players, weeks) array of each player's score in each week, -inf
+        where the player cannot be used that week (team eliminated)
+    positions: lineup position code of each player (RosterRules.code); players
+        with code -1 are ignored
+    rules: compiled roster rules every lineup must satisfy
+
+    Raises ValueError when no valid plan exists.
+    """
+    values = np.asarray(values, dtype=float)
+    n_weeks = values.shape[1]
+    positions = np.asarray(positions)
+
+    # Stage 1: exact per-position assignments for every allowed capacity vector
+    options = []  # per position: list of (capacities, score, per-week rows)
+    for code, pos in enumerate(rules.positions):
+        rows = np.flatnonzero(positions == code)
+        pos_values = values[rows]
+        pos_options = []
+        for capacities in _capacity_vectors(rules, code, n_weeks):
+            score, weeks = solve_position(pos_values, capacities)
+            if np.isfinite(score):
+                pos_options.append((capacities, score, [rows[w].tolist() for w in weeks]))
+        if not pos_options:
+            raise ValueError(f"No feasible assignment for position {pos}")
+        options.append(pos_options)
+
+    # Stage 2: dynamic program over positions, state = players placed per week and group
+    start, delta, add, complete = _group_counts(rules, n_weeks)
+    states: Dict[Tuple[int, ...], Tuple[float, Optional[tuple], int]] = {start: (0.0, None, -1)}
+    layers = [states]
+    for code, pos_options in enumerate(options):
+        steps = [(delta(code, capacities), pos_score) for capacities, pos_score, _ in pos_options]
+        next_states = {}
+        for state, (score, _, _) in states.items():
+            for option_index, (step, pos_score) in enumerate(steps):
+                new_state = add(state, step)
+                if new_state is None:
+                    continue
+                new_score = score + pos_score
+                if new_state not in next_states or new_score > next_states[new_state][0]:
+                    next_states[new_state] = (new_score, state, option_index)
+        states = next_states
+        layers.append(states)
+
+    finals = [state for state in states if complete(state)]
+    if not finals:
+        raise ValueError("No combination of position counts fills every lineup")
+    final_state = max(finals, key=lambda state: states[state][0])
+
+    # Walk the back-pointers to recover the chosen capacity vector per position
+    weeks = [[] for _ in range(n_weeks)]
+    state = final_state
+    for depth in range(len(options), 0, -1):
+        _, previous, option_index = layers[depth][state]
+        _, _, pos_weeks = options[depth - 1][option_index]
+        for week, rows in enumerate(pos_weeks):
+            weeks[week].extend(rows)
+        state = previous
+
+    objective = states[final_state][0]
+    return PlanSolution(weeks, objective, objective)
+
+
+class AssignmentStream:
+    """
+    Assignments of one position's players to weeks with fixed slot counts, best first
+
+    values: (players, weeks) array of week scores, -inf where unavailable
+    capacities: number of slots to fill in each week
+
+    Assignments are generated on demand with Murty's partitioning and kept, so
+    several plans can share one stream.
+    """
+
+    def __init__(self, values: np.ndarray, capacities: Sequence[int]):
+        self.values = values
+        self.capacities = tuple(capacities)
+        self.found: List[Tuple[float, List[List[int]]]] = []
+        self._subspaces = []  # (rows, include, exclude) of each found assignment
+        self._heap = []
+        self._counter = itertools.count()
+        self._push(frozenset(), frozenset())
+
+    def _push(self, include: FrozenSet[Tuple[int, int]], exclude: FrozenSet[Tuple[int, int]]):
+        """Solve the subspace forcing `include` pairs in and `exclude` pairs out"""
+        values = self.values.copy()
+        capacities = list(self.capacities)
+        forced_score = 0.0
+        for row, week in exclude:
+            values[row, week] = -np.inf
+        for row, week in include:
+            forced_score += self.values[row, week]
+            values[row, :] = -np.inf
+            capacities[week] -= 1
+        score, weeks = solve_position(values, capacities)
+        if not np.isfinite(score):
+            return
+        for row, week in include:
+            weeks[week].append(row)
+        heapq.heappush(self._heap, (-(score + forced_score), next(self._counter), weeks, include, exclude))
+
+    def get(self, rank: int) -> Optional[Tuple[float, List[List[int]]]]:
+        """The rank-th best (score, per-week rows), or None if there are fewer"""
+        while len(self.found) <= rank:
+            if self.found:
+                self._split(*self._subspaces[-1])
+            if not self._heap:
+                return None
+            neg_score, _, weeks, include, exclude = heapq.heappop(self._heap)
+            self.found.append((-neg_score, weeks))
+            self._subspaces.append((weeks, include, exclude))
+        return self.found[rank]
+
+    def _split(self, weeks: List[List[int]], include: FrozenSet[Tuple[int, int]],
+               exclude: FrozenSet[Tuple[int, int]]):
+        """Partition what is left of a solved subspace: child i keeps the first i free pairs and drops pair i"""
+        forced = set(include)
+        free = sorted((row, week) for week, rows in enumerate(weeks) for row in rows
+                      if (row, week) not in include)
+        for pair in free:
+            self._push(frozenset(forced), exclude | {pair})
+            forced.add(pair)
+
+
+def rank_plans(values: np.ndarray, positions: Sequence[int], rules: RosterRules) -> Iterator[PlanSolution]:
+    """
+    Multi-week plans in decreasing objective order, generated lazily
+
+    Arguments are the same as solve_plan; the first plan yielded is its
+    optimum. Each solution's upper_bound is the optimum's objective, so its gap
+    is how far it falls short of the best plan. Plans are distinct sets of
+    (player, week) pairs.
+
+    Raises ValueError when no valid plan exists.
+    """
+    values = np.asarray(values, dtype=float)
+    n_weeks = values.shape[1]
+    positions = np.asarray(positions)
+
+    position_rows = []
+    options = []  # per position: capacities -> stream of its assignments
+    for code, pos in enumerate(rules.positions):
+        rows = np.flatnonzero(positions == code)
+        pos_options = {}
+        for capacities in _capacity_vectors(rules, code, n_weeks):
+            stream = AssignmentStream(values[rows], capacities)
+            if stream.get(0) is not None:
+                pos_options[capacities] = stream
+        if not pos_options:
+            raise ValueError(f"No feasible assignment for position {pos}")
+        position_rows.append(rows)
+        options.append(pos_options)
+
+    # Best score that can still be added from each reachable state (players
+    # placed per week and group) after each position; an exact bound for the search
+    start, delta, add, complete = _group_counts(rules, n_weeks)
+    steps = [{capacities: delta(code, capacities) for capacities in pos_options}
+             for code, pos_options in enumerate(options)]
+    reachable = [{start}]
+    for pos_steps in steps:
+        reachable.append({add(state, step) for state in reachable[-1] for step in pos_steps.values()} - {None})
+    completion = [{} for _ in reachable]
+    completion[-1] = {state: 0.0 for state in reachable[-1] if complete(state)}
+    for depth in range(len(options) - 1, -1, -1):
+        for state in reachable[depth]:
+            scores = [stream.get(0)[0] + completion[depth + 1][new_state]
+                      for capacities, stream in options[depth].items()
+                      for new_state in [add(state, steps[depth][capacities])]
+                      if new_state in completion[depth + 1]]
+            if scores:
+                completion[depth][state] = max(scores)
+    if start not in completion[0]:
+        raise ValueError("No combination of position counts fills every lineup")
+
+    # Best-first search over partial plans: one (capacities, rank) choice per
+    # position so far, keyed by prefix score plus the exact completion bound, so
+    # complete plans come off the heap in objective order. A node's next-rank
+    # sibling is only pushed once the node itself is popped.
+    counter = itertools.count()
+    heap = [(-completion[0][start], next(counter), 0, start, 0.0, ())]
+    best = None
+    while heap:
+        neg_priority, _, depth, state, prefix, chosen = heapq.heappop(heap)
+
+        if chosen:
+            capacities, rank = chosen[-1]
+            stream = options[depth - 1][capacities]
+            current, successor = stream.get(rank), stream.get(rank + 1)
+            if successor is not None:
+                sibling_prefix = prefix - current[0] + successor[0]
+                heapq.heappush(heap, (-(sibling_prefix + completion[depth][state]), next(counter), depth,
+                                      state, sibling_prefix, chosen[:-1] + ((capacities, rank + 1),)))
+
+        if depth == len(options):
+            weeks = [[] for _ in range(n_weeks)]
+            for rows, pos_options, (capacities, rank) in zip(position_rows, options, chosen):
+                for week, pos_rows in enumerate(pos_options[capacities].get(rank)[1]):
+                    weeks[week].extend(rows[pos_rows].tolist())
+            if best is None:
+                best = prefix
+            yield PlanSolution(weeks, prefix, best)
+            continue
+
+        for capacities, stream in options[depth].items():
+            new_state = add(state, steps[depth][capacities])
+            if new_state not in completion[depth + 1]:
+                continue
+            new_prefix = prefix + stream.get(0)[0]
+            heapq.heappush(heap, (-(new_prefix + completion[depth + 1][new_state]), next(counter), depth + 1,
+                                  new_state, new_prefix, chosen + ((capacities, 0),)))
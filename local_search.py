@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Local Search Plan Improvement
+
+The greedy planner commits each week's lineup before looking at the next, and
+nothing revisits those choices afterwards. improve_plan takes any full plan and
+raises its planning value (the objective the exact solvers maximize) by
+simulated annealing over all weeks at once. A move picks a week, a lineup slot
+and a candidate player for that week:
+
+- an unused candidate replaces the slot's player; a different position changes
+  the week's RB/WR/TE flex mix
+- a candidate already playing another week swaps weeks with the slot's player
+
+A move's change in value is a few lookups in the (players, weeks) value matrix,
+and its validity is a few lookups on the compiled roster-rule states
+(RosterRules.remove / can_add), so both are O(1) and no lineup is rebuilt.
+Worse moves are accepted with probability exp(delta / T), with T cooling
+geometrically from START_TEMPERATURE to END_TEMPERATURE mean slot values over
+the time budget, and the best plan seen is kept.
+
+Independent restarts (separate random streams from one SeedSequence) run on a
+process pool and the best plan wins. How many moves fit in the budget depends
+on the machine, so timed runs are not bit-reproducible; pass max_moves for a
+fixed number of moves per restart. A plan with short lineups (the greedy
+planner can run out of a position) starts with placeholders that cost
+PLACEHOLDER_PENALTY, so filling them comes first.
+"""
+
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from roster_rules import RosterRules
+
+
+START_TEMPERATURE = 0.02  # Mean slot values
+END_TEMPERATURE = 0.0002
+PLACEHOLDER_PENALTY = 1e6  # Value of a placeholder filling a slot the starting plan left empty
+BATCH_SIZE = 1024  # Moves drawn at a time; the temperature and clock are updated between batches
+
+
+class LocalSearchResult:
+    """Best plan found by improve_plan"""
+
+    def __init__(self, weeks: List[List[int]], objective: float, start_objective: float,
+                 moves: int, restarts: int):
+        self.weeks = weeks  # week index -> player indices in the lineup
+        self.objective = objective
+        self.start_objective = start_objective
+        self.moves = moves  # Moves tried over all restarts
+        self.restarts = restarts
+
+    @property
+    def improvement(self) -> float:
+        return self.objective - self.start_objective
+
+
+def anneal(values: np.ndarray, positions: np.ndarray, rules: RosterRules, weeks: Sequence[Sequence[int]],
+           seconds: float, seed=None, max_moves: int = None,
+           selectable: np.ndarray = None) -> Tuple[float, List[List[int]], int]:
+    """
+    One simulated-annealing run from a valid plan
+
+    values: (players, weeks) planning values, -inf where a player cannot play
+    positions: lineup position code per player
+    weeks: week index -> player indices of the starting plan
+    selectable: players moves may bring in (default: all)
+    Returns (best value, its lineups, moves tried).
+    """
+    rng = np.random.default_rng(seed)
+    n_players, n_weeks = values.shape
+    lineups = [list(map(int, rows)) for rows in weeks]
+    states = [rules.state_of(positions[rows]) for rows in lineups]
+    if not all(rules.is_valid_state(state) for state in states):
+        raise ValueError("Local search needs a valid starting plan")
+
+    week_of = [-1] * n_players
+    for w, rows in enumerate(lineups):
+        for player in rows:
+            week_of[player] = w
+    value_of = values.tolist()
+    code_of = positions.tolist()
+    if selectable is None:
+        selectable = np.ones(n_players, dtype=bool)
+    candidates = [np.flatnonzero(np.isfinite(values[:, w]) & (positions >= 0) & selectable).tolist()
+                  for w in range(n_weeks)]
+    movable = [w for w in range(n_weeks) if candidates[w]]  # Weeks with a player to bring in
+    can_add, remove, add = rules.can_add, rules.remove, rules.add
+
+    value = _plan_value(values, lineups)
+    best_value, best_lineups = value, [lineup[:] for lineup in lineups]
+    chosen = [values[player, w] for w, rows in enumerate(lineups) for player in rows if selectable[player]]
+    slot_value = float(np.mean(np.abs(chosen))) if chosen else 1.0
+    t_start, t_end = START_TEMPERATURE * slot_value, END_TEMPERATURE * slot_value
+    temperature = t_start
+
+    started = time.perf_counter()
+    moves = 0
+    while movable and moves < (max_moves if max_moves is not None else math.inf):
+        if max_moves is None:
+            progress = (time.perf_counter() - started) / seconds if seconds > 0 else 1.0
+        else:
+            progress = moves / max_moves
+        if progress >= 1.0:
+            break
+        temperature = t_start * (t_end / t_start) ** progress
+
+        picks_week = [movable[i] for i in rng.integers(0, len(movable), BATCH_SIZE).tolist()]
+        picks_slot = rng.random(BATCH_SIZE).tolist()
+        picks_player = rng.random(BATCH_SIZE).tolist()
+        thresholds = (temperature * np.log(rng.random(BATCH_SIZE))).tolist()  # Accept if delta > threshold
+        for w, u_slot, u_player, threshold in zip(picks_week, picks_slot, picks_player, thresholds):
+            rows = lineups[w]
+            k = int(u_slot * len(rows))
+            a = rows[k]
+            pool = candidates[w]
+            b = pool[int(u_player * len(pool))]
+            other = week_of[b]
+            if other == w:
+                continue
+            code_a, code_b = code_of[a], code_of[b]
+            if other < 0:
+                delta = value_of[b][w] - value_of[a][w]
+                if delta <= threshold:
+                    continue
+                if code_a != code_b:
+                    state = remove(states[w], code_a)
+                    if not can_add(state, code_b):
+                        continue
+                    states[w] = add(state, code_b)
+                week_of[a] = -1
+            else:
+                delta = value_of[b][w] + value_of[a][other] - value_of[a][w] - value_of[b][other]
+                if delta <= threshold:  # Also rejects -inf: a cannot play the other week
+                    continue
+                if code_a != code_b:
+                    state = remove(states[w], code_a)
+                    state_other = remove(states[other], code_b)
+                    if not (can_add(state, code_b) and can_add(state_other, code_a)):
+                        continue
+                    states[w] = add(state, code_b)
+                    states[other] = add(state_other, code_a)
+                other_rows = lineups[other]
+                other_rows[other_rows.index(b)] = a
+                week_of[a] = other
+            rows[k] = b
+            week_of[b] = w
+            value += delta
+            if value > best_value + 1e-9:
+                best_value, best_lineups = value, [lineup[:] for lineup in lineups]
+        moves += BATCH_SIZE
+
+    # Recompute from the matrix so accumulated rounding never leaks into the result
+    best_value = _plan_value(values, best_lineups)
+    return best_value, best_lineups, moves
+
+
+_worker_state = {}
+
+
+def _init_worker(values: np.ndarray, positions: np.ndarray, rules: RosterRules):
+    _worker_state['values'] = values
+    _worker_state['positions'] = positions
+    _worker_state['rules'] = rules
+
+
+def _run_restart(task) -> Tuple[float, List[List[int]], int]:
+    weeks, seconds, seed, max_moves, selectable = task
+    return anneal(_worker_state['values'], _worker_state['positions'], _worker_state['rules'],
+                  weeks, seconds, seed, max_moves, selectable)
+
+
+def _pad_short_lineups(values: np.ndarray, positions: np.ndarray, rules: RosterRules,
+                       weeks: Sequence[Sequence[int]]) -> Tuple[np.ndarray, np.ndarray, List[List[int]]]:
+    """
+    Fill lineups the starting plan left short with placeholder players
+
+    A placeholder plays one position in one week at -PLACEHOLDER_PENALTY, so
+    every lineup starts valid and the search replaces placeholders first.
+    """
+    n_players = len(values)
+    padded, codes = [], []
+    for w, rows in enumerate(weeks):
+        rows = list(map(int, rows))
+        state = rules.state_of(positions[rows])
+        while not rules.is_valid_state(state):
+            code = next((c for c in range(len(rules.positions)) if rules.can_add(state, c)), None)
+            if code is None:
+                raise ValueError(f"Starting lineup {w + 1} cannot be completed under the roster rules")
+            state = rules.add(state, code)
+            rows.append(n_players + len(codes))
+            codes.append((w, code))
+        padded.append(rows)
+    if not codes:
+        return values, positions, padded
+    extra = np.full((len(codes), values.shape[1]), -np.inf)
+    for i, (w, _) in enumerate(codes):
+        extra[i, w] = -PLACEHOLDER_PENALTY
+    return (np.vstack([values, extra]), np.concatenate([positions, [code for _, code in codes]]), padded)
+
+
+def _plan_value(values: np.ndarray, weeks: Sequence[Sequence[int]]) -> float:
+    return float(sum(values[list(rows), w].sum() for w, rows in enumerate(weeks)))
+
+
+def improve_plan(values: np.ndarray, positions: np.ndarray, rules: RosterRules, weeks: Sequence[Sequence[int]],
+                 seconds: float = 2.0, restarts: int = None, workers: int = None, seed: int = None,
+                 max_moves: int = None) -> LocalSearchResult:
+    """
+    Best plan over independent annealing restarts from the same starting plan
+
+    The time budget covers all restarts: with more restarts than workers they
+    run in waves, each with an equal share. Defaults to one restart per worker.
+    Lineups the starting plan left short are filled where the pool allows.
+    """
+    workers = workers or os.cpu_count() or 1
+    restarts = restarts or workers
+    workers = min(workers, restarts)
+    waves = -(-restarts // workers)
+    n_players = len(values)
+    start_objective = _plan_value(values, weeks)
+    values, positions, padded = _pad_short_lineups(values, positions, rules, weeks)
+    selectable = np.arange(len(values)) < n_players
+    seeds = np.random.SeedSequence(seed).spawn(restarts)
+    tasks = [(padded, seconds / waves, seeds[i], max_moves, selectable) for i in range(restarts)]
+
+    _init_worker(values, positions, rules)
+    if workers > 1:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(values, positions, rules))
+        with pool:
+            results = list(pool.map(_run_restart, tasks))
+    else:
+        results = [_run_restart(task) for task in tasks]
+
+    best = max(range(restarts), key=lambda i: (results[i][0], -i))
+    best_weeks = [[player for player in rows if player < n_players] for rows in results[best][1]]
+    return LocalSearchResult(best_weeks, _plan_value(values, best_weeks), start_objective,
+                             sum(moves for _, _, moves in results), restarts)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Local Optimization Service
+
+Keeps the parsed players and their valuations warm in memory and answers
+lineup queries over HTTP on a TCP port or a Unix socket, so game-day tools don't
+pay process startup and CSV parsing on every query.
+
+Endpoints (JSON in, JSON out):
+
+- POST /week: best lineup for one week
+      {"week": 2, "used": ["JAX_Trevor Lawrence"], "eliminated": ["LAC", "GB"],
+       "solver": "greedy"}
+- POST /plan: lineups for every week from start_week on
+      {"start_week": 1, "used": [], "eliminations": {"1": ["LAC", "GB", "SF", "CAR"]},
+       "locks": {"4": ["SEA_Jaxon Smith-Njigba"]}, "solver": "exact"}
+- GET /health: cache and pool statistics
+
+Points in the responses are each player's expected league points per game
+(the WeeklyProjection means of projections.py); a plan's total_points sums them
+over the weeks it covers.
+
+Successful results are kept in an LRU cache keyed by a canonical hash of the
+normalized request; errors are not cached, so a retry solves again. Identical
+requests that arrive while one is being solved wait for that solve instead of
+starting their own. Solves run on a process pool forked from the warm process,
+so the event loop stays responsive.
+
+    python3 optimizer_service.py --port 8765
+    curl -s localhost:8765/week -d '{"week": 1}'
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Tuple
+
+from batch_optimizer import lineup_records
+from league_state import inputs_hash
+from playoff_optimizer import PlayoffOptimizer
+
+
+class RequestError(ValueError):
+    """Invalid request; reported to the client as 400"""
+
+
+# Warm optimizer inherited by forked workers (or set by the initializer)
+_worker_state = {}
+
+
+def _init_worker(optimizer: PlayoffOptimizer):
+    _worker_state['optimizer'] = optimizer
+    _worker_state['points'] = optimizer.weekly_projection().mean  # Expected league points per game
+
+
+def _player_ids(optimizer: PlayoffOptimizer, keys) -> list:
+    ids = []
+    for key in keys:
+        player_id = optimizer.players.find(key)
+        if player_id < 0:
+            raise RequestError(f"Player not loaded: {key}")
+        ids.append(player_id)
+    return ids
+
+
+def solve_request(endpoint: str, request: Dict) -> Dict:
+    """Solve one normalized request against the worker's warm optimizer"""
+    optimizer = _worker_state['optimizer']
+    points = _worker_state['points']
+    store = optimizer.players
+    store.reset_used()
+    store.mark_used(_player_ids(optimizer, request['used']))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if endpoint == 'week':
+            eliminated = store.team_bits(request['eliminated'])
+            if request['solver'] in ('exact', 'flow'):  # One week is a single small assignment
+                lineup = next(optimizer.ranked_lineups(request['week'], eliminated), None)
+                if lineup is None:
+                    raise RequestError("No valid lineup from the available players")
+            else:
+                lineup = optimizer.optimize_lineup_greedy(request['week'], eliminated)
+            return {
+                'week': request['week'],
+                'valid': optimizer.is_valid_lineup(lineup),
+                'total_points': round(float(sum(points[p.id] for p in lineup)), 2),
+                'lineup': lineup_records(lineup, points),
+            }
+
+        locks = {week: _player_ids(optimizer, keys) for week, keys in request['locks'].items()}
+        plan = optimizer.simulate_playoffs(request['solver'], request['start_week'],
+                                           request['eliminations'], locks=locks)
+    return {
+        'start_week': request['start_week'],
+        'valid': all(optimizer.is_valid_lineup(lineup) for lineup in plan.values()),
+        'total_points': round(float(sum(points[p.id] for lineup in plan.values() for p in lineup)), 2),
+        'weeks': {str(week): lineup_records(lineup, points) for week, lineup in sorted(plan.items())},
+    }
+
+
+def _solve_in_worker(endpoint: str, request: Dict) -> Tuple[bool, Dict]:
+    """Pool task: (ok, result) so request errors come back as data"""
+    try:
+        return True, solve_request(endpoint, request)
+    except ValueError as error:
+        return False, {'error': str(error)}
+
+
+def normalize_request(endpoint: str, payload: Dict) -> Dict:
+    """Canonical form of a request: defaults filled in, lists sorted"""
+    if not isinstance(payload, dict):
+        raise RequestError("Request body must be a JSON object")
+    solver = payload.get('solver', 'greedy')
+    if solver not in ('greedy', 'exact', 'flow'):
+        raise RequestError(f"Unknown solver {solver!r}")
+    weeks = PlayoffOptimizer.PLAYOFF_WEEKS
+    try:
+        used = sorted(set(payload.get('used', [])))
+        if endpoint == 'week':
+            week = int(payload.get('week', 1))
+            if not 1 <= week <= weeks:
+                raise RequestError(f"week must be between 1 and {weeks}")
+            return {'week': week, 'used': used, 'eliminated': sorted(set(payload.get('eliminated', []))),
+                    'solver': solver}
+        start_week = int(payload.get('start_week', 1))
+        if not 1 <= start_week <= weeks:
+            raise RequestError(f"start_week must be between 1 and {weeks}")
+        eliminations = payload.get('eliminations')
+        if eliminations is None:
+            eliminations = PlayoffOptimizer.ASSUMED_ELIMINATIONS
+        locks = {int(w): sorted(keys) for w, keys in payload.get('locks', {}).items()}
+        for week, keys in locks.items():
+            if keys and not start_week <= week <= weeks:
+                raise RequestError(f"locks must be for weeks {start_week} to {weeks}, not week {week}")
+        return {
+            'start_week': start_week,
+            'used': used,
+            'eliminations': {int(w): sorted(teams) for w, teams in eliminations.items()},
+            'locks': locks,
+            'solver': solver,
+        }
+    except (TypeError, AttributeError) as error:
+        raise RequestError(f"Malformed request: {error}")
+
+
+class OptimizerService:
+    """LRU-cached, coalescing front end to a pool of warm optimizer workers"""
+
+    def __init__(self, executor: Executor, cache_size: int = 1024):
+        self.executor = executor
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[str, Tuple[bool, Dict]]' = OrderedDict()
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'solves': 0}
+
+    async def query(self, endpoint: str, payload: Dict) -> Tuple[bool, Dict]:
+        """(ok, result) for a request, from the cache, an in-flight solve or a new solve"""
+        self.stats['requests'] += 1
+        request = normalize_request(endpoint, payload)
+        key = inputs_hash(endpoint, request)
+
+        if key in self.cache:
+            self.stats['cache_hits'] += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        if key in self.inflight:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self.inflight[key])
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, _solve_in_worker, endpoint, request)
+        self.inflight[key] = future
+        self.stats['solves'] += 1
+        try:
+            outcome = await asyncio.shield(future)
+        finally:
+            del self.inflight[key]
+        ok, _ = outcome
+        if ok:
+            self.cache[key] = outcome
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return outcome
+
+    def health(self) -> Dict:
+        return dict(self.stats, cached=len(self.cache), inflight=len(self.inflight))
+
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error'}
+MAX_BODY = 1 << 20
+
+
+async def handle_connection(service: OptimizerService, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter):
+    """Minimal HTTP/1.1 with keep-alive: one JSON response per request"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+            except ValueError:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0) or 0)
+            if length > MAX_BODY:
+                break
+            body = await reader.readexactly(length) if length else b''
+
+            status, result = await _route(service, method, path.split('?', 1)[0], body)
+            data = json.dumps(result).encode()
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                         f"Content-Type: application/json\r\n"
+                         f"Content-Length: {len(data)}\r\n"
+                         f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _route(service: OptimizerService, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+    if path == '/health':
+        return 200, service.health()
+    if path not in ('/week', '/plan'):
+        return 404, {'error': f"Unknown endpoint {path}"}
+    if method != 'POST':
+        return 405, {'error': "Use POST"}
+    try:
+        payload = json.loads(body or b'{}')
+        ok, result = await service.query(path[1:], payload)
+    except (ValueError, RequestError) as error:
+        return 400, {'error': str(error)}
+    except Exception as error:  # Keep serving after an unexpected solver failure
+        return 500, {'error': f"{type(error).__name__}: {error}"}
+    return (200 if ok else 400), result
+
+
+def warm_optimizer(data_dir: str, min_points: float) -> PlayoffOptimizer:
+    """Load, rescore and weight the players once"""
+    optimizer = PlayoffOptimizer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.load_players(data_dir, min_points=min_points)
+        optimizer.apply_te_premium()
+        optimizer.weight_player_value()
+    return optimizer
+
+
+def make_executor(optimizer: PlayoffOptimizer, workers: int = None) -> Executor:
+    """Process pool whose workers start with the warm optimizer"""
+    workers = workers or os.cpu_count() or 1
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _init_worker(optimizer)
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(optimizer,))
+
+
+async def serve(service: OptimizerService, host: str, port: int, unix_path: str = None):
+    def handler(reader, writer):
+        return handle_connection(service, reader, writer)
+
+    if unix_path:
+        server = await asyncio.start_unix_server(handler, path=unix_path)
+        print(f"Serving on unix socket {unix_path}")
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        print(f"Serving on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve lineup queries from warm in-memory player data")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument('--unix', default=None, metavar='PATH', help="listen on a Unix socket instead")
+    parser.add_argument('--workers', type=int, default=None, help="solver processes (default: all cores)")
+    parser.add_argument('--cache-size', type=int, default=1024, help="cached results kept (LRU)")
+    parser.add_argument('--min-points', type=float, default=PlayoffOptimizer.MIN_PLAYER_POINTS,
+                        help="minimum season fantasy points for a player to be considered")
+    parser.add_argument('--data-dir', default='.', help="directory containing the team CSV files")
+    args = parser.parse_args(argv)
+
+    optimizer = warm_optimizer(args.data_dir, args.min_points)
+    print(f"Loaded {len(optimizer.players)} players")
+    with make_executor(optimizer, args.workers) as executor:
+        service = OptimizerService(executor, args.cache_size)
+        try:
+            asyncio.run(serve(service, args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if args.unix and os.path.exists(args.unix):
+                os.remove(args.unix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Parallel Strategy Parameter Sweep
+
+Tunes the hard-coded strategy knobs instead of guessing them:
+
+- base_weight / advancement_weight: PlayoffOptimizer.BASE_WEIGHT and ADVANCEMENT_WEIGHT
+- te_rec: points per reception for tight ends in the valuation (the TE premium)
+- top_w1..top_w4: conservation multipliers for seeds 1-2 in weeks 1-4
+- mid_w1, mid_w2: conservation multipliers for seeds 3-4 in weeks 1-2
+
+Each configuration is applied to a copy of the optimizer, planned with the
+greedy, exact or flow solver along the assumed bracket, and then scored against
+simulated brackets: the plan's expected league points per game (the
+WeeklyProjection means of projections.py) over the weeks each player's team
+actually plays. Players are loaded and the scenarios simulated once; every
+pool worker receives them once through its initializer and only configurations
+travel per task. With --checkpoint, finished configurations are saved as the
+sweep runs and an interrupted sweep resumes where it stopped (job_runner.py).
+
+    python3 parameter_sweep.py --samples 2000
+    python3 parameter_sweep.py --grid --param te_rec=1.0,1.5,2.0 --param top_w4=1.3,1.5,1.7
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from bracket_simulator import BracketResult, BracketSimulator
+from job_runner import resolve_seed, run_job
+from playoff_optimizer import PlayoffOptimizer
+from projections import WeeklyProjection
+from scenario_optimizer import score_plan, summarize_totals
+from scoring import STANDARD_PPR
+
+
+# Knob -> values searched by default (the current settings are the middle values)
+DEFAULT_SPACE = {
+    'base_weight': [0.5, 0.7, 0.9],
+    'advancement_weight': [0.1, 0.3, 0.5],
+    'te_rec': [1.0, 1.5, 2.0],
+    'top_w1': [0.4, 0.6, 0.8],
+    'top_w2': [0.6, 0.8, 1.0],
+    'top_w3': [1.1, 1.3, 1.5],
+    'top_w4': [1.3, 1.5, 1.7],
+    'mid_w1': [1.0, 1.1, 1.2],
+    'mid_w2': [1.0, 1.05, 1.1],
+}
+RANK_KEYS = ['mean', 'median', 'p25', 'p75', 'p95']
+CHUNK_SIZE = 25  # Configurations per pool task
+
+
+def current_config() -> Dict[str, float]:
+    """The knob values PlayoffOptimizer uses today"""
+    optimizer = PlayoffOptimizer
+    config = {
+        'base_weight': optimizer.BASE_WEIGHT,
+        'advancement_weight': optimizer.ADVANCEMENT_WEIGHT,
+        'te_rec': optimizer.SCORING_RULES.weights('TE')['REC'],
+    }
+    for week in range(1, optimizer.PLAYOFF_WEEKS + 1):
+        config[f'top_w{week}'] = optimizer.TOP_SEED_BONUS.get(week, 1.0)
+    config['mid_w1'] = optimizer.MID_SEED_BONUS.get(1, 1.0)
+    config['mid_w2'] = optimizer.MID_SEED_BONUS.get(2, 1.0)
+    return config
+
+
+def apply_config(optimizer: PlayoffOptimizer, config: Dict[str, float]):
+    """Override the optimizer's strategy constants on the instance"""
+    optimizer.BASE_WEIGHT = config['base_weight']
+    optimizer.ADVANCEMENT_WEIGHT = config['advancement_weight']
+    optimizer.SCORING_RULES = STANDARD_PPR.override('TE', REC=config['te_rec'])
+    optimizer.TOP_SEED_BONUS = {week: config[f'top_w{week}'] for week in range(1, optimizer.PLAYOFF_WEEKS + 1)}
+    optimizer.MID_SEED_BONUS = {1: config['mid_w1'], 2: config['mid_w2']}
+
+
+def grid_configs(space: Dict[str, List[float]]) -> List[Dict[str, float]]:
+    """Every combination of the listed values"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def sample_configs(space: Dict[str, List[float]], n: int, seed: int = None) -> List[Dict[str, float]]:
+    """n configurations drawn uniformly between each knob's smallest and largest value"""
+    rng = np.random.default_rng(seed)
+    draws = {name: np.round(rng.uniform(min(values), max(values), n), 3) for name, values in space.items()}
+    return [{name: float(draws[name][i]) for name in space} for i in range(n)]
+
+
+class SweepEvaluator:
+    """Plans and scores configurations against a shared player pool and shared scenarios"""
+
+    def __init__(self, optimizer: PlayoffOptimizer, scenarios: BracketResult, solver: str = 'greedy'):
+        self.optimizer = optimizer
+        self.scenarios = scenarios
+        self.solver = solver
+        store = optimizer.players
+        # What a plan actually earns per game: league scoring, whatever the valuation knobs say
+        season_points = optimizer.score_players(PlayoffOptimizer.SCORING_RULES)
+        self.points = WeeklyProjection.from_store(store, season_points, optimizer.lineup_positions(),
+                                                  optimizer.roster_rules().positions).mean
+        self.bracket_rows = np.array([scenarios.team_index.get(team, -1) for team in store.teams], dtype=np.int64)
+
+    def evaluate(self, config: Dict[str, float]) -> Dict[str, float]:
+        """Plan one configuration and summarize its totals across the scenarios"""
+        optimizer = self.optimizer
+        store = optimizer.players
+        store.reset_used()
+        apply_config(optimizer, config)
+        with contextlib.redirect_stdout(io.StringIO()):
+            optimizer.apply_te_premium()
+            optimizer.weight_player_value()
+            plan = optimizer.simulate_playoffs(self.solver)
+
+        ids = np.array([p.id for lineup in plan.values() for p in lineup], dtype=np.int64)
+        weeks = np.array([week for week, lineup in plan.items() for _ in lineup])
+        totals = score_plan(self.scenarios.elimination_week, self.bracket_rows[store.team[ids]], weeks,
+                            self.points[ids], self.scenarios.byes)
+        result = dict(config)
+        result.update(summarize_totals(totals))
+        return result
+
+
+# Evaluator and configurations shared with pool workers (forked, or set by the initializer)
+_worker_evaluator = {}
+
+
+def _init_worker(evaluator: SweepEvaluator, configs: List[Dict[str, float]]):
+    _worker_evaluator['evaluator'] = evaluator
+    _worker_evaluator['configs'] = configs
+
+
+def _evaluate_chunk(chunk: int, seed_sequence) -> List[Dict[str, float]]:
+    evaluator = _worker_evaluator['evaluator']
+    configs = _worker_evaluator['configs'][chunk * CHUNK_SIZE:(chunk + 1) * CHUNK_SIZE]
+    return [evaluator.evaluate(config) for config in configs]
+
+
+def _extend(results: List[Dict[str, float]], chunk: List[Dict[str, float]]) -> List[Dict[str, float]]:
+    results.extend(chunk)
+    return results
+
+
+def run_sweep(evaluator: SweepEvaluator, configs: List[Dict[str, float]], workers: int = None,
+              rank_by: str = 'mean', seed: int = 0, checkpoint: str = None,
+              checkpoint_every: float = 60.0) -> List[Dict[str, float]]:
+    """
+    Evaluate every configuration on a process pool; returns results best first
+
+    With a checkpoint file, finished chunks of configurations are saved as the
+    sweep goes and a rerun with the same seed and settings picks up after them.
+    """
+    n_chunks = -(-len(configs) // CHUNK_SIZE)
+    inputs = {'configs': configs, 'solver': evaluator.solver, 'scenarios': evaluator.scenarios.n_sims,
+              'points': 'weekly'}
+    results = run_job(_evaluate_chunk, n_chunks, seed, _extend, [], inputs, workers=workers,
+                      checkpoint=checkpoint, checkpoint_every=checkpoint_every,
+                      initializer=_init_worker, initargs=(evaluator, configs))
+    return sorted(results, key=lambda result: -result[rank_by])
+
+
+def print_results(results: List[Dict[str, float]], baseline: Dict[str, float], rank_by: str, top: int):
+    """Print the best configurations and where the current settings rank"""
+    knobs = list(DEFAULT_SPACE)
+    header = ' '.join(f"{name:>8s}" for name in ['base', 'adv', 'te_rec', 'top_w1', 'top_w2', 'top_w3',
+                                                   'top_w4', 'mid_w1', 'mid_w2'])
+    print(f"\nTop {min(top, len(results))} of {len(results):,} configurations by {rank_by} "
+          f"(* = current settings):")
+    print("-" * 128)
+    print(f"  {'rank':>5s} {header} {'mean':>8s} {'std':>6s} {'p5':>7s} {'median':>7s} {'p95':>7s}")
+    baseline_rank = None
+    for rank, result in enumerate(results, start=1):
+        is_baseline = all(np.isclose(result[name], baseline[name]) for name in knobs)
+        if is_baseline and baseline_rank is None:
+            baseline_rank = rank
+        if rank > top and not is_baseline:
+            continue
+        values = ' '.join(f"{result[name]:8.3f}" for name in knobs)
+        marker = '*' if is_baseline else ' '
+        print(f" {marker}{rank:>5d} {values} {result['mean']:8.1f} {result['std']:6.1f} "
+              f"{result['p5']:7.1f} {result['median']:7.1f} {result['p95']:7.1f}")
+    print("-" * 128)
+    if baseline_rank is not None:
+        print(f"Current settings rank {baseline_rank:,} of {len(results):,}")
+
+
+def parse_space(params: List[str]) -> Dict[str, List[float]]:
+    """Default search space with NAME=V1,V2,... overrides"""
+    space = {name: list(values) for name, values in DEFAULT_SPACE.items()}
+    for param in params:
+        name, values = param.split('=', 1)
+        if name not in space:
+            raise ValueError(f"Unknown parameter {name}; expected one of {', '.join(space)}")
+        space[name] = [float(value) for value in values.split(',') if value.strip()]
+    return space
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters against simulated brackets")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=V1,V2,...',
+                        help=f"values for one knob ({', '.join(DEFAULT_SPACE)}); "
+                             f"random samples use the range they span")
+    parser.add_argument('--grid', action='store_true', help="evaluate every combination instead of sampling")
+    parser.add_argument('--samples', type=int, default=1000, help="random configurations to evaluate")
+    parser.add_argument('--solver', choices=['greedy', 'exact', 'flow'], default='greedy',
+                        help="solver used to plan each configuration")
+    parser.add_argument('--scenarios', type=int, default=10000, help="simulated brackets to score against")
+    parser.add_argument('--rank-by', choices=RANK_KEYS, default='mean', help="statistic to rank by")
+    parser.add_argument('--top', type=int, default=20, help="configurations to print")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for brackets and samples")
+    parser.add_argument('--min-points', type=float, default=PlayoffOptimizer.MIN_PLAYER_POINTS,
+                        help="minimum season fantasy points for a player to be considered")
+    parser.add_argument('--data-dir', default='.', help="directory containing the team CSV files")
+    parser.add_argument('--output', default=None, help="write every result to this JSON file")
+    parser.add_argument('--store', default=None, metavar='DB',
+                        help="add every configuration and its outcomes to a SQLite results store")
+    parser.add_argument('--checkpoint', default=None, metavar='FILE',
+                        help="save progress to this file and resume from it when it exists")
+    parser.add_argument('--checkpoint-every', type=float, default=60.0, metavar='SECONDS',
+                        help="seconds between checkpoints")
+    args = parser.parse_args(argv)
+    try:
+        space = parse_space(args.param)
+    except ValueError as error:
+        parser.error(str(error))
+
+    print("=" * 70)
+    print("STRATEGY PARAMETER SWEEP")
+    print("=" * 70)
+
+    seed = resolve_seed(args.seed, args.checkpoint)
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(args.data_dir, min_points=args.min_points)
+    print(f"Simulating {args.scenarios:,} playoff brackets (seed {seed})...")
+    scenarios = BracketSimulator(optimizer.PLAYOFF_SEEDS).simulate(args.scenarios, seed=seed)
+    evaluator = SweepEvaluator(optimizer, scenarios, args.solver)
+
+    configs = grid_configs(space) if args.grid else sample_configs(space, args.samples, seed)
+    baseline = current_config()
+    configs.append(baseline)
+    print(f"Evaluating {len(configs):,} configurations with the {args.solver} solver...")
+    start = time.perf_counter()
+    try:
+        results = run_sweep(evaluator, configs, workers=args.workers, rank_by=args.rank_by, seed=seed,
+                            checkpoint=args.checkpoint, checkpoint_every=args.checkpoint_every)
+    except ValueError as error:
+        sys.exit(str(error))
+    except KeyboardInterrupt:
+        if args.checkpoint:
+            sys.exit(f"Interrupted; rerun with --checkpoint {args.checkpoint} to resume")
+        raise
+    elapsed = time.perf_counter() - start
+    print(f"Done in {elapsed:.1f}s ({len(configs) / elapsed:,.0f} configurations/s)")
+
+    print_results(results, baseline, args.rank_by, args.top)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'solver': args.solver, 'scenarios': args.scenarios, 'seed': seed,
+                       'rank_by': args.rank_by, 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.store:
+        from results_store import ResultsStore
+        settings = {'solver': args.solver, 'scenarios': args.scenarios, 'seed': seed}
+        with ResultsStore(args.store) as store:
+            for result in results:
+                config = {name: result[name] for name in DEFAULT_SPACE}
+                store.add_result({'solver': args.solver}, dict(settings, **config),
+                                 {name: value for name, value in result.items() if name not in config},
+                                 source='parameter_sweep')
+        print(f"Results added to {args.store}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Columnar Player Store
+
+Players live in NumPy columns indexed by integer player id instead of a dict of
+objects keyed by "TEAM_Name" strings. Team and position are small integer codes,
+used players are a boolean mask and eliminated teams are an integer bitmask over
+team codes, so availability filtering and scoring are array operations.
+
+Player objects are thin __slots__ views over a row of the store.
+"""
+
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+
+class Player:
+    """Represents a fantasy football player (a view over one store row)"""
+
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store: 'PlayerStore', player_id: int):
+        self.store = store
+        self.id = player_id
+
+    @property
+    def name(self) -> str:
+        return self.store.names[self.id]
+
+    @property
+    def team(self) -> str:
+        return self.store.teams[self.store.team[self.id]]
+
+    @property
+    def position(self) -> str:
+        return self.store.position_names[self.store.position[self.id]]
+
+    @property
+    def base_fpts(self) -> float:
+        return float(self.store.base_fpts[self.id])
+
+    @property
+    def adjusted_fpts(self) -> float:
+        return float(self.store.adjusted_fpts[self.id])
+
+    @adjusted_fpts.setter
+    def adjusted_fpts(self, value: float):
+        self.store.adjusted_fpts[self.id] = value
+        self.store.version += 1
+
+    @property
+    def key(self) -> str:
+        """Stable "TEAM_Name" identifier, independent of load order"""
+        return f"{self.team}_{self.name}"
+
+    def __eq__(self, other):
+        return isinstance(other, Player) and other.store is self.store and other.id == self.id
+
+    def __hash__(self):
+        return hash((id(self.store), self.id))
+
+    def __repr__(self):
+        return f"{self.name} ({self.team}, {self.position}): {self.adjusted_fpts:.1f} pts"
+
+
+class PlayerStore:
+    """Array-backed storage for all players"""
+
+    def __init__(self, capacity: int = 1024):
+        self.teams: List[str] = []
+        self.team_codes: Dict[str, int] = {}
+        self.position_names: List[str] = []
+        self.position_codes: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._size = 0
+        self._team = np.zeros(capacity, dtype=np.int16)
+        self._position = np.zeros(capacity, dtype=np.int16)
+        self._base_fpts = np.zeros(capacity)
+        self._adjusted_fpts = np.zeros(capacity)
+        self._used = np.zeros(capacity, dtype=bool)
+        self.stat_fields: List[str] = []  # Qualified stat names, one per stats column
+        self._stats = np.zeros((capacity, 0))
+        self._keys: Dict[str, int] = None
+        self.version = 0  # Bumped whenever players or points change
+        self.releases = 0  # Bumped whenever used players become available again
+
+    # Columns (views over the filled part of each array)
+
+    @property
+    def team(self) -> np.ndarray:
+        return self._team[:self._size]
+
+    @property
+    def position(self) -> np.ndarray:
+        return self._position[:self._size]
+
+    @property
+    def base_fpts(self) -> np.ndarray:
+        return self._base_fpts[:self._size]
+
+    @property
+    def adjusted_fpts(self) -> np.ndarray:
+        return self._adjusted_fpts[:self._size]
+
+    @adjusted_fpts.setter
+    def adjusted_fpts(self, values: np.ndarray):
+        self._adjusted_fpts[:self._size] = values
+        self.version += 1
+
+    @property
+    def used(self) -> np.ndarray:
+        return self._used[:self._size]
+
+    @property
+    def stats(self) -> np.ndarray:
+        """(players, stat_fields) matrix of raw stats"""
+        return self._stats[:self._size]
+
+    def team_code(self, team: str) -> int:
+        """Integer code for a team, registering it if new"""
+        if team not in self.team_codes:
+            self.team_codes[team] = len(self.teams)
+            self.teams.append(team)
+        return self.team_codes[team]
+
+    def position_code(self, position: str) -> int:
+        """Integer code for a position, registering it if new"""
+        if position not in self.position_codes:
+            self.position_codes[position] = len(self.position_names)
+            self.position_names.append(position)
+        return self.position_codes[position]
+
+    def add(self, name: str, team: str, position: str, fpts: float) -> int:
+        """Append a player and return its id"""
+        if self._size == len(self._team):
+            self._grow()
+        player_id = self._size
+        self._team[player_id] = self.team_code(team)
+        self._position[player_id] = self.position_code(position)
+        self._base_fpts[player_id] = fpts
+        self._adjusted_fpts[player_id] = fpts
+        self.names.append(name)
+        self._size += 1
+        self._keys = None
+        self.version += 1
+        return player_id
+
+    def extend(self, names: List[str], team: str, positions: List[str], fpts: np.ndarray,
+               stats: np.ndarray = None, stat_fields: List[str] = None) -> np.ndarray:
+        """
+        Append many players of one team and return their ids
+
+        stats columns are matched to the store's stat_fields by name; the first
+        call with stats defines the store's fields.
+        """
+        count = len(names)
+        if stat_fields and not self.stat_fields and self._size == 0:
+            self.stat_fields = list(stat_fields)
+            self._stats = np.zeros((len(self._team), len(stat_fields)))
+        while self._size + count > len(self._team):
+            self._grow()
+        ids = np.arange(self._size, self._size + count)
+        if stats is not None and stat_fields:
+            columns = {field: i for i, field in enumerate(stat_fields)}
+            for j, field in enumerate(self.stat_fields):
+                if field in columns:
+                    self._stats[ids, j] = stats[:, columns[field]]
+        self._team[ids] = self.team_code(team)
+        self._position[ids] = [self.position_code(pos) for pos in positions]
+        self._base_fpts[ids] = fpts
+        self._adjusted_fpts[ids] = fpts
+        self.names.extend(names)
+        self._size += count
+        self._keys = None
+        self.version += 1
+        return ids
+
+    def _grow(self):
+        capacity = max(2 * len(self._team), 1)
+        for attr in ('_team', '_position', '_base_fpts', '_adjusted_fpts', '_used', '_stats'):
+            old = getattr(self, attr)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, attr, new)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, player_id: int) -> Player:
+        if not 0 <= player_id < self._size:
+            raise IndexError(player_id)
+        return Player(self, int(player_id))
+
+    def __iter__(self) -> Iterator[Player]:
+        for player_id in range(self._size):
+            yield Player(self, player_id)
+
+    def players(self, ids: Iterable[int]) -> List[Player]:
+        """Player views for an array of ids"""
+        return [Player(self, int(i)) for i in ids]
+
+    def find(self, key: str) -> int:
+        """Player id for a "TEAM_Name" key (-1 if unknown)"""
+        if self._keys is None:
+            self._keys = {f"{self.teams[t]}_{name}": i
+                          for i, (t, name) in enumerate(zip(self.team, self.names))}
+        return self._keys.get(key, -1)
+
+    def team_bits(self, teams: Iterable[str]) -> int:
+        """Bitmask over team codes for a set of team names"""
+        bits = 0
+        for team in teams:
+            if team in self.team_codes:
+                bits |= 1 << self.team_codes[team]
+        return bits
+
+    def team_mask(self, bits: int) -> np.ndarray:
+        """Boolean array over team codes for a team bitmask"""
+        n_teams = len(self.teams)
+        if not bits:
+            return np.zeros(n_teams, dtype=bool)
+        packed = np.frombuffer(bits.to_bytes((n_teams + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(packed, bitorder='little')[:n_teams].astype(bool)
+
+    def available(self, eliminated_bits: int = 0) -> np.ndarray:
+        """Ids of players that are unused and whose team is not eliminated"""
+        mask = ~self.used
+        if eliminated_bits and self.teams:
+            mask &= ~self.team_mask(eliminated_bits)[self.team]
+        return np.flatnonzero(mask)
+
+    def mark_used(self, ids: Iterable[int]):
+        """Mark players as used"""
+        self._used[np.asarray(list(ids), dtype=np.int64)] = True
+
+    def release(self, ids: Iterable[int]):
+        """Make players available again"""
+        self._used[np.asarray(list(ids), dtype=np.int64)] = False
+        self.releases += 1
+
+    def reset_used(self):
+        """Make every player available again"""
+        self._used[:] = False
+        self.releases += 1
+
+    def nbytes(self) -> int:
+        """Memory held by the numeric columns"""
+        return sum(getattr(self, attr).nbytes
+                   for attr in ('_team', '_position', '_base_fpts', '_adjusted_fpts', '_used', '_stats'))
@@ -7,28 +7,35 @@ This script optimizes fantasy football lineups across playoff weeks by:
 2. Accounting for team elimination as the playoffs progress
 3. Maximizing total fantasy points with PPR scoring (1.5x for TEs)
 4. Conserving elite players from top seeds for later playoff rounds
-5. Following lineup requirements: 1 QB, 2-3 RB, 2-3 WR, 1-2 TE, 0-1 K, 0-1 DEF (9 total)
+5. Following the league's lineup rules (default: 1 QB, 2-3 RB, 2-3 WR, 1-2 TE,
+   0-1 K, 0-1 DEF, 9 total; other formats in roster_rules.py)
 """
 
-import csv
-import os
+import argparse
+import json
+import sys
 from collections import defaultdict
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterator, List, Tuple
 import itertools
 
+import numpy as np
 
-class Player:
-    """Represents a fantasy football player"""
-    
-    def __init__(self, name: str, team: str, position: str, fpts: float):
-        self.name = name
-        self.team = team
-        self.position = position
-        self.base_fpts = fpts
-        self.adjusted_fpts = fpts
-        
-    def __repr__(self):
-        return f"{self.name} ({self.team}, {self.position}): {self.adjusted_fpts:.1f} pts"
+from availability_index import AvailabilityIndex
+from data_loader import load_team_tables
+from flow_planner import solve_plan_flow
+from field_simulator import FieldSimulator, print_field_result
+from instrumentation import NULL_INSTRUMENTATION, Instrumentation, instrumented
+from bracket_simulator import BracketResult, BracketSimulator, print_survival_table
+from league_state import LeagueState, inputs_hash
+from lineup_solver import rank_plans, solve_plan
+from local_search import LocalSearchResult, improve_plan
+from player_store import Player, PlayerStore
+from projections import PlanSampler, WeeklyProjection, best_plan_for_payout, finish_distribution, print_payout
+from roster_rules import DEFENSIVE_POSITIONS, ROSTER_FORMATS, RosterRules, compile_rules
+from scenario_optimizer import ScenarioOptimizer, print_distribution, summarize_totals
+from scoring import LEAGUE_SCORING, PlayerScorer, ScoringRules
+from team_outcomes import TeamOutcomeModel
+from valuation import ValuationMatrix, seed_table, team_seed_index
 
 
 class PlayoffOptimizer:
@@ -38,6 +45,15 @@ class PlayoffOptimizer:
     MIN_PLAYER_POINTS = 20  # Minimum fantasy points to consider a player
     BASE_WEIGHT = 0.7  # Base weight for player value calculation
     ADVANCEMENT_WEIGHT = 0.3  # Weight multiplier for advancement probability
+    SCORING_RULES = LEAGUE_SCORING  # PPR with 1.5 PPR for tight ends
+    PLAYOFF_WEEKS = 4  # Wild Card, Divisional, Conference, Super Bowl
+    
+    # Lineup rules as data, compiled once by roster_rules() for every path
+    LINEUP_SIZE = ROSTER_FORMATS['playoff']['size']
+    POSITION_LIMITS = ROSTER_FORMATS['playoff']['slots']  # position -> (min, max)
+    FLEX_SLOTS = ROSTER_FORMATS['playoff']['flex']  # (eligible positions, count)
+    DEFENSIVE_POSITIONS = DEFENSIVE_POSITIONS  # Counted as DEF
+    LOCK_VALUE = 1e6  # Exact-solver bonus that forces a locked player into their week
     
     # Playoff bracket structure
     # Wild Card Round (Week 1): #7 @ #2, #6 @ #3, #5 @ #4 (per conference)
@@ -66,6 +82,29 @@ class PlayoffOptimizer:
         }
     }
     
+    # Advancement probability by seed for weeks 1-4 (educated estimates based on
+    # historical data). Seeds 1-2 get a bye, so 100% for week 1 (no game).
+    SEED_ADVANCEMENT = {
+        1: (1.0, 0.75, 0.50, 0.30),   # Bye, divisional favored at home, conference, Super Bowl
+        2: (1.0, 0.75, 0.50, 0.30),
+        3: (0.65, 0.40, 0.25, 0.12),  # Wild card at home, divisional likely at #1 or #2
+        4: (0.60, 0.35, 0.20, 0.10),  # Wild card at home
+        5: (0.55, 0.30, 0.15, 0.08),  # Wild card on road
+        6: (0.45, 0.25, 0.12, 0.06),  # Wild card on road
+        7: (0.35, 0.15, 0.08, 0.04),  # Wild card on road vs #2 seed
+    }
+    
+    # Conservation multipliers by week with the fixed seed tables
+    TOP_SEED_BONUS = {1: 0.60, 2: 0.80, 3: 1.30, 4: 1.50}  # Seeds 1-2: save for later rounds
+    MID_SEED_BONUS = {1: 1.10, 2: 1.05}  # Seeds 3-4: slight preference for earlier rounds
+    
+    # Assumed bracket: teams eliminated at the end of each week
+    ASSUMED_ELIMINATIONS = {
+        1: ['LAC', 'GB', 'SF', 'CAR'],   # #7 LAC, #7 GB, #6 SF, #4 CAR
+        2: ['HOU', 'BUF', 'PHI', 'LAR'],  # #5 HOU, #6 BUF, #3 PHI, #5 LAR
+        3: ['NE', 'PIT', 'CHI'],          # #2 NE, #4 PIT, #2 CHI
+    }
+    
     TEAM_FILES = {
         'BUF': 'BuffaloBillsStats - Sheet1.csv',
         'CAR': 'CarolinaPanthersStats - Sheet1 (1).csv',
@@ -84,65 +123,87 @@ class PlayoffOptimizer:
     }
     
     def __init__(self):
-        self.players: Dict[str, Player] = {}  # player_id -> Player
-        self.used_players: Set[str] = set()  # Track used players
-        
-    def load_players(self, data_dir: str = '.'):
-        """Load all players from CSV files"""
-        for team_code, filename in self.TEAM_FILES.items():
-            filepath = os.path.join(data_dir, filename)
-            if not os.path.exists(filepath):
-                print(f"Warning: File not found: {filepath}")
-                continue
-                
-            with open(filepath, 'r') as f:
-                lines = f.readlines()
-                # Skip first line (category headers), use second line as field names
-                if len(lines) < 2:
-                    continue
-                
-                # Parse header from line 2
-                headers = lines[1].strip().split(',')
-                
-                # Parse data rows starting from line 3
-                for line in lines[2:]:
-                    parts = line.strip().split(',')
-                    if len(parts) < len(headers):
-                        continue
-                    
-                    # Create row dict
-                    row = dict(zip(headers, parts))
-                    
-                    # Skip header rows
-                    if not row.get('NAME') or row['NAME'] == 'NAME' or not row['NAME']:
-                        continue
-                    
-                    try:
-                        name = row['NAME'].strip()
-                        position = row['POS'].strip()
-                        fpts = float(row['FPTS'])
-                        
-                        # Skip very low scoring players to improve performance
-                        # Only include players with at least MIN_PLAYER_POINTS fantasy points
-                        if fpts < self.MIN_PLAYER_POINTS:
-                            continue
-                        
-                        player_id = f"{team_code}_{name}"
-                        player = Player(name, team_code, position, fpts)
-                        self.players[player_id] = player
-                        
-                    except (ValueError, KeyError) as e:
-                        continue
+        self.players = PlayerStore()  # Columnar store; used players are a mask in the store
+        self.last_solution = None  # PlanSolution from the most recent exact solve
+        self.bracket: BracketResult = None  # Simulated bracket probabilities, if attached
+        self._scorer: PlayerScorer = None
+        self._index: AvailabilityIndex = None
+        self._index_rules: RosterRules = None  # Rules the index's buckets were built for
+        self._valuation: ValuationMatrix = None
+        self._season_points: np.ndarray = None  # Rescored season points from apply_te_premium
+        self._seed_index = None  # (PLAYOFF_SEEDS it was built from, team -> (conference, seed))
+        self.instruments: Instrumentation = NULL_INSTRUMENTATION  # Attach an Instrumentation to profile
         
+    @instrumented('load_players')
+    def load_players(self, data_dir: str = '.', min_points: float = None, use_cache: bool = True):
+        """
+        Load all players from CSV files
+        
+        Parsed tables are cached in a binary snapshot (see data_loader.py), so
+        later runs only re-parse team files that changed.
+        """
+        if min_points is None:
+            min_points = self.MIN_PLAYER_POINTS
+        tables = load_team_tables(data_dir, self.TEAM_FILES, use_cache=use_cache)
+        
+        for team_code, table in tables.items():
+            # Skip very low scoring players to improve greedy performance
+            # Only include players with at least min_points fantasy points
+            fpts = table.column('FPTS')
+            keep = np.flatnonzero(fpts >= min_points)
+            self.players.extend([table.names[i] for i in keep], team_code,
+                                [table.positions[i] for i in keep], fpts[keep],
+                                stats=table.stats[keep], stat_fields=table.stat_names)
+        
+        self.instruments.count('players.loaded', len(self.players))
         print(f"Loaded {len(self.players)} players from {len(self.TEAM_FILES)} teams")
     
+    def use_roster_format(self, name: str):
+        """Play another league's lineup format (see roster_rules.ROSTER_FORMATS)"""
+        if name not in ROSTER_FORMATS:
+            raise ValueError(f"Unknown roster format {name!r}; expected one of {', '.join(ROSTER_FORMATS)}")
+        spec = ROSTER_FORMATS[name]
+        self.LINEUP_SIZE = spec['size']
+        self.POSITION_LIMITS = dict(spec['slots'])
+        self.FLEX_SLOTS = list(spec['flex'])
+    
+    def roster_rules(self) -> RosterRules:
+        """
+        Lineup rules compiled from LINEUP_SIZE, POSITION_LIMITS, FLEX_SLOTS and
+        DEFENSIVE_POSITIONS; each distinct declaration is compiled once
+        """
+        return compile_rules(self.LINEUP_SIZE, tuple(self.POSITION_LIMITS.items()),
+                             tuple((tuple(eligible), count) for eligible, count in self.FLEX_SLOTS),
+                             (('DEF', tuple(self.DEFENSIVE_POSITIONS)),))
+    
+    def use_bracket_simulation(self, result: BracketResult):
+        """
+        Use simulated bracket probabilities instead of the fixed seed tables
+        
+        Feeds calculate_advancement_probability (and so weight_player_value) and
+        get_elite_conservation_bonus.
+        """
+        self.bracket = result
+    
+    def score_players(self, rules: ScoringRules = None) -> np.ndarray:
+        """Season points of every player under a scoring rule set (league rules by default)"""
+        if self._scorer is None or len(self._scorer.untracked) != len(self.players):
+            self._scorer = PlayerScorer(self.players)
+        return self._scorer.score(rules or self.SCORING_RULES)
+    
+    @instrumented('valuation.te_premium')
     def apply_te_premium(self):
         """Apply 1.5x PPR scoring for tight ends"""
-        for player in self.players.values():
-            if player.position == 'TE':
-                # Approximate TE premium: TEs get 1.5x PPR vs 1.0x for others
-                # Estimate that ~30% of their points come from receptions
-                player.adjusted_fpts = player.base_fpts * 1.15  # Approximate 15% boost
+        # Exact rescoring from the stat columns: TEs get 1.5 points per reception
+        # instead of 1.0 (see scoring.py)
+        self._season_points = self.score_players()
+        self.players.adjusted_fpts = self._season_points
+    
+    def team_seeds(self) -> Dict[str, Tuple[str, int]]:
+        """team -> (conference, seed) index over PLAYOFF_SEEDS, built once"""
+        if self._seed_index is None or self._seed_index[0] is not self.PLAYOFF_SEEDS:
+            self._seed_index = (self.PLAYOFF_SEEDS, team_seed_index(self.PLAYOFF_SEEDS))
+        return self._seed_index[1]
     
     def calculate_advancement_probability(self, team: str) -> Dict[int, float]:
         """
@@ -151,433 +212,836 @@ class PlayoffOptimizer:
         Returns dict: {week: probability}
         Week 1 = Wild Card, Week 2 = Divisional, Week 3 = Conference, Week 4 = Super Bowl
         """
-        # Find which conference and seed
-        conference = None
-        seed = None
-        
-        for conf, teams in self.PLAYOFF_SEEDS.items():
-            if team in teams:
-                conference = conf
-                seed = teams[team]
-                break
+        if self.bracket is not None:
+            return self.bracket.advancement_probability(team)
         
-        if not seed:
-            return {1: 0, 2: 0, 3: 0, 4: 0}
-        
-        # Base probabilities by seed (educated estimates based on historical data)
-        # Seeds 1-2 get bye, so 100% for week 1 (no game)
-        if seed in [1, 2]:
-            return {
-                1: 1.0,   # Bye week - guaranteed advancement
-                2: 0.75,  # Divisional round - favored at home
-                3: 0.50,  # Conference championship
-                4: 0.30,  # Super Bowl
-            }
-        elif seed == 3:
-            return {
-                1: 0.65,  # Wild card at home
-                2: 0.40,  # Divisional (likely at #1 or #2)
-                3: 0.25,  # Conference championship
-                4: 0.12,  # Super Bowl
-            }
-        elif seed == 4:
-            return {
-                1: 0.60,  # Wild card at home
-                2: 0.35,  # Divisional
-                3: 0.20,  # Conference championship
-                4: 0.10,  # Super Bowl
-            }
-        elif seed == 5:
-            return {
-                1: 0.55,  # Wild card on road
-                2: 0.30,  # Divisional
-                3: 0.15,  # Conference championship
-                4: 0.08,  # Super Bowl
-            }
-        elif seed == 6:
-            return {
-                1: 0.45,  # Wild card on road
-                2: 0.25,  # Divisional
-                3: 0.12,  # Conference championship
-                4: 0.06,  # Super Bowl
-            }
-        else:  # seed 7
-            return {
-                1: 0.35,  # Wild card on road vs #2 seed
-                2: 0.15,  # Divisional
-                3: 0.08,  # Conference championship
-                4: 0.04,  # Super Bowl
-            }
+        row = seed_table([team], self.team_seeds(), self.SEED_ADVANCEMENT, self.PLAYOFF_WEEKS, 0.0)[0]
+        return {week: float(row[week - 1]) for week in range(1, self.PLAYOFF_WEEKS + 1)}
+    
+    def advancement_table(self) -> np.ndarray:
+        """(teams, weeks) advancement probabilities for every team code"""
+        teams = self.players.teams
+        if self.bracket is None:
+            return seed_table(teams, self.team_seeds(), self.SEED_ADVANCEMENT, self.PLAYOFF_WEEKS, 0.0)
+        table = np.zeros((len(teams), self.PLAYOFF_WEEKS))
+        for code, team in enumerate(teams):
+            if team in self.bracket.team_index:
+                table[code] = self.bracket.survival[self.bracket.team_index[team]]
+        return table
     
+    @instrumented('valuation.advancement_weight')
     def weight_player_value(self):
-        """Weight player fantasy points by team advancement probability"""
-        for player_id, player in self.players.items():
-            team = player.team
-            probs = self.calculate_advancement_probability(team)
-            
-            # Calculate expected value across all potential weeks
-            # Higher seeds have higher expected value since they play more weeks
-            expected_weeks = sum(probs.values())
-            
-            # Weight the player's value by their team's expected playoff longevity
-            # Formula: base_weight + advancement_weight * expected_weeks
-            # This gives players from teams with higher advancement probability more value
-            player.adjusted_fpts = player.adjusted_fpts * (self.BASE_WEIGHT + self.ADVANCEMENT_WEIGHT * expected_weeks)
+        """
+        Weight player fantasy points by team advancement probability
+        
+        Always starts from the rescored season points (or the CSV points before
+        apply_te_premium), so running it again does not compound the weights.
+        """
+        store = self.players
+        season = self._season_points if self._season_points is not None else store.base_fpts
+        
+        # Calculate expected value across all potential weeks
+        # Higher seeds have higher expected value since they play more weeks
+        expected_weeks = self.advancement_table().sum(axis=1)
+        
+        # Weight the player's value by their team's expected playoff longevity
+        # Formula: base_weight + advancement_weight * expected_weeks
+        # This gives players from teams with higher advancement probability more value
+        multipliers = self.BASE_WEIGHT + self.ADVANCEMENT_WEIGHT * expected_weeks
+        store.adjusted_fpts = season * multipliers[store.team]
     
     def get_elite_conservation_bonus(self, team: str, week: int) -> float:
         """
         Apply bonus for conserving elite players from top seeds for later rounds
         
         Returns a multiplier (>1.0 for later weeks if from top seed)
+        
+        With a simulated bracket attached, the multiplier is the team's chance of
+        playing that week relative to the average playoff team.
         """
-        seed = None
-        for conf, teams in self.PLAYOFF_SEEDS.items():
-            if team in teams:
-                seed = teams[team]
-                break
+        if self.bracket is not None:
+            return self.bracket.relative_playing_probability(team, week)
+        return float(seed_table([team], self.team_seeds(), self.conservation_by_seed(),
+                                self.PLAYOFF_WEEKS, 1.0)[0, week - 1])
+    
+    def conservation_by_seed(self) -> Dict[int, List[float]]:
+        """Conservation multiplier per seed and week (seeds not listed get 1.0)"""
+        weeks = range(1, self.PLAYOFF_WEEKS + 1)
+        # Top 2 seeds should be conserved for later rounds: strong reduction in
+        # Week 1 (bye anyway) and Week 2, strong bonus in the Conference
+        # Championship and Super Bowl. Seeds 3-4 get slight preference for
+        # earlier rounds.
+        top = [self.TOP_SEED_BONUS.get(week, 1.0) for week in weeks]
+        mid = [self.MID_SEED_BONUS.get(week, 1.0) for week in weeks]
+        return {1: top, 2: top, 3: mid, 4: mid}
+    
+    def bonus_table(self) -> np.ndarray:
+        """(teams, weeks) conservation multipliers for every team code"""
+        teams = self.players.teams
+        if self.bracket is None:
+            return seed_table(teams, self.team_seeds(), self.conservation_by_seed(), self.PLAYOFF_WEEKS, 1.0)
+        average = self.bracket.playing.mean(axis=0)
+        table = np.zeros((len(teams), self.PLAYOFF_WEEKS))
+        for code, team in enumerate(teams):
+            if team in self.bracket.team_index:
+                table[code] = self.bracket.playing[self.bracket.team_index[team]]
+        return np.divide(table, average, out=np.zeros_like(table), where=average > 0)
+    
+    def valuation(self) -> ValuationMatrix:
+        """
+        Player-by-week values every solver path reads (see valuation.py)
         
-        if not seed:
-            return 1.0
-        
-        # Top 2 seeds should be conserved for later rounds
-        # Make the penalty/bonus more aggressive
-        if seed in [1, 2]:
-            if week == 1:
-                return 0.60  # Strong reduction in Week 1 (bye anyway)
-            elif week == 2:
-                return 0.80  # Moderate reduction in Week 2
-            elif week == 3:
-                return 1.30  # Strong bonus in Conference Championship
-            elif week == 4:
-                return 1.50  # Very strong bonus in Super Bowl
-        elif seed in [3, 4]:
-            # Seeds 3-4 get slight preference for earlier rounds
-            if week == 1:
-                return 1.10
-            elif week == 2:
-                return 1.05
-        
-        return 1.0
+        Rebuilt in one vectorized pass when player values or any bonus input change.
+        """
+        key = (self.players.version, len(self.players), id(self.bracket), id(self.PLAYOFF_SEEDS),
+               tuple(sorted(self.TOP_SEED_BONUS.items())), tuple(sorted(self.MID_SEED_BONUS.items())))
+        if self._valuation is None or self._valuation.key != key:
+            with self.instruments.span('valuation.matrix'):
+                self._valuation = ValuationMatrix(self.players.adjusted_fpts, self.players.team,
+                                                  self.bonus_table(), key)
+        return self._valuation
     
-    def is_valid_lineup(self, lineup: List[Player]) -> bool:
-        """Check if a lineup meets position requirements"""
-        if len(lineup) != 9:
-            return False
+    def week_bonus(self, week: int) -> np.ndarray:
+        """Conservation bonus for every team code in the given week"""
+        return self.valuation().team_bonus(week)
+    
+    def lineup_positions(self) -> np.ndarray:
+        """Lineup position code of every player (index into roster_rules().positions, -1 if none)"""
+        return self.roster_rules().position_codes(self.players.position_names)[self.players.position]
+    
+    def _select_by_position(self, order: np.ndarray, allowance: np.ndarray, limit: int) -> np.ndarray:
+        """
+        Walk players in order, taking each one whose position code still has allowance
         
+        Returns the ids taken (at most `limit`), in walk order.
+        """
+        slots = self.lineup_positions()[order]
+        eligible = np.zeros(len(order), dtype=bool)
+        for code, count in enumerate(allowance):
+            if count > 0:
+                eligible[np.flatnonzero(slots == code)[:count]] = True
+        return order[eligible][:limit]
+    
+    def _count_positions(self, ids: np.ndarray) -> Dict[str, int]:
+        """Lineup position counts for a set of player ids"""
+        rules = self.roster_rules()
         positions = defaultdict(int)
-        for player in lineup:
-            pos = player.position
-            # Map defensive positions to DEF
-            if pos in ['S', 'CB', 'LB', 'DE', 'DT', 'OLB', 'ILB', 'FS', 'NT', 'DL']:
-                pos = 'DEF'
-            positions[pos] += 1
-        
-        # Check requirements: 1 QB, 2-3 RB, 2-3 WR, 1-2 TE, 0-1 K, 0-1 DEF
-        if positions['QB'] != 1:
-            return False
-        if not (2 <= positions['RB'] <= 3):
-            return False
-        if not (2 <= positions['WR'] <= 3):
-            return False
-        if not (1 <= positions['TE'] <= 2):
-            return False
-        if positions['K'] > 1:
-            return False
-        if positions['DEF'] > 1:
-            return False
-        
-        return True
-    
-    def get_available_players(self, week: int, eliminated_teams: Set[str]) -> List[Player]:
-        """Get players available for a given week"""
-        available = []
-        for player_id, player in self.players.items():
-            # Skip if already used
-            if player_id in self.used_players:
-                continue
-            # Skip if team eliminated
-            if player.team in eliminated_teams:
-                continue
-            
-            available.append(player)
+        counts = np.bincount(self.lineup_positions()[ids] + 1, minlength=len(rules.positions) + 1)
+        for code, pos in enumerate(rules.positions):
+            positions[pos] = int(counts[code + 1])
+        return positions
+    
+    def is_valid_lineup(self, lineup: List[Player]) -> bool:
+        """Check if a lineup meets the roster rules"""
+        rules = self.roster_rules()
+        return rules.is_valid([rules.code(player.position) for player in lineup])
+    
+    def check_played_lineup(self, week: int, keys: List[str]):
+        """
+        Validate a lineup recorded as played ("TEAM_Name" keys)
         
-        return available
+        Raises ValueError for a week outside the playoffs, unknown or repeated
+        players, or a lineup that breaks the roster rules.
+        """
+        if not 1 <= week <= self.PLAYOFF_WEEKS:
+            raise ValueError(f"week {week} is not a playoff week (1-{self.PLAYOFF_WEEKS})")
+        unknown = [key for key in keys if self.players.find(key) < 0]
+        if unknown:
+            raise ValueError(f"unknown players: {', '.join(unknown)}")
+        if len(set(keys)) < len(keys):
+            raise ValueError("a player is listed twice")
+        if not self.is_valid_lineup(self._lookup_players(keys)):
+            raise ValueError(f"{len(keys)} players do not make a lineup of {self.roster_rules().describe()}")
     
-    def optimize_lineup_greedy(self, week: int, eliminated_teams: Set[str]) -> List[Player]:
+    def get_available_players(self, week: int, eliminated: int) -> np.ndarray:
+        """Ids of players available for a given week (eliminated is a team bitmask)"""
+        return self.players.available(eliminated)
+    
+    def availability_index(self) -> AvailabilityIndex:
+        """Position-bucketed index over the valuation's points (rebuilt with the valuation)"""
+        valuation = self.valuation()
+        rules = self.roster_rules()
+        if self._index is None or self._index.points is not valuation.points or self._index_rules is not rules:
+            with self.instruments.span('availability_index.build'):
+                self._index = AvailabilityIndex(self.players, valuation.points, self.lineup_positions(),
+                                                len(rules.positions))
+            self._index_rules = rules
+        return self._index
+    
+    @instrumented('optimize_lineup_greedy', 'week')
+    def optimize_lineup_greedy(self, week: int, eliminated: int) -> List[Player]:
         """
         Optimize lineup for a specific week using greedy approach with conservation strategy
         """
-        available = self.get_available_players(week, eliminated_teams)
-        
-        # Adjust scores for this specific week with conservation bonus
-        week_adjusted_players = []
-        for player in available:
-            bonus = self.get_elite_conservation_bonus(player.team, week)
-            adjusted_score = player.adjusted_fpts * bonus
-            week_adjusted_players.append((adjusted_score, player))
+        index = self.availability_index()
+        rules = self.roster_rules()
+        bonus = self.week_bonus(week)
+        instruments = self.instruments
         
-        # Sort by adjusted score
-        week_adjusted_players.sort(reverse=True, key=lambda x: x[0])
+        # Best candidates of each position for this week (scored with the
+        # conservation bonus); no position can take more than its cap
+        candidates = []
+        for code, pos in enumerate(rules.positions):
+            candidates.append(index.top(code, int(rules.caps[code]), bonus, eliminated))
+            if instruments.enabled:
+                scanned, rejected = index.last_scan()
+                instruments.count(f'greedy.{pos}.scanned', scanned)
+                instruments.count(f'greedy.{pos}.rejected', rejected)
         
-        # First pass: ensure minimums are met (1 QB, 2 RB, 2 WR, 1 TE)
-        lineup = []
-        positions = defaultdict(int)
-        used_indices = set()
-        
-        # Get 1 QB
-        for i, (score, player) in enumerate(week_adjusted_players):
-            if player.position == 'QB' and positions['QB'] < 1:
-                lineup.append(player)
-                positions['QB'] += 1
-                used_indices.add(i)
-                break
-        
-        # Get 2 RBs
-        for i, (score, player) in enumerate(week_adjusted_players):
-            if i in used_indices:
-                continue
-            if player.position == 'RB' and positions['RB'] < 2:
-                lineup.append(player)
-                positions['RB'] += 1
-                used_indices.add(i)
-        
-        # Get 2 WRs
-        for i, (score, player) in enumerate(week_adjusted_players):
-            if i in used_indices:
-                continue
-            if player.position == 'WR' and positions['WR'] < 2:
-                lineup.append(player)
-                positions['WR'] += 1
-                used_indices.add(i)
-        
-        # Get 1 TE
-        for i, (score, player) in enumerate(week_adjusted_players):
-            if i in used_indices:
-                continue
-            if player.position == 'TE' and positions['TE'] < 1:
-                lineup.append(player)
-                positions['TE'] += 1
-                used_indices.add(i)
-                break
+        # First pass: ensure minimums are met (1 QB, 2 RB, 2 WR, 1 TE by default)
+        lineup_ids = []
+        counts = []
+        for code, low in enumerate(rules.minimums):
+            picked = candidates[code][:low]
+            lineup_ids.extend(player_id for score, player_id in picked)
+            counts.append(len(picked))
+        state = rules.encode(counts)
         
-        # Now fill remaining spots (up to 9 total) with best available
-        for i, (score, player) in enumerate(week_adjusted_players):
-            if i in used_indices:
-                continue
-            if len(lineup) >= 9:
+        # Now fill remaining spots with the best available players the rules
+        # still have room for (position caps, flex slots, lineup size)
+        extras = sorted(
+            (-score, player_id, code) for code in range(len(rules.positions))
+            for score, player_id in candidates[code][counts[code]:]
+        )
+        for _, player_id, code in extras:
+            if len(lineup_ids) == rules.size:
                 break
-            
-            pos = player.position
-            # Map defensive positions
-            if pos in ['S', 'CB', 'LB', 'DE', 'DT', 'OLB', 'ILB', 'FS', 'NT', 'DL']:
-                pos = 'DEF'
-            
-            # Check position constraints (max limits)
-            can_add = False
-            if pos == 'RB' and positions['RB'] < 3:
-                can_add = True
-            elif pos == 'WR' and positions['WR'] < 3:
-                can_add = True
-            elif pos == 'TE' and positions['TE'] < 2:
-                can_add = True
-            elif pos == 'K' and positions['K'] < 1:
-                can_add = True
-            elif pos == 'DEF' and positions['DEF'] < 1:
-                can_add = True
-            
-            if can_add:
-                lineup.append(player)
-                positions[pos] += 1
-                used_indices.add(i)
+            if rules.can_add(state, code):
+                state = rules.add(state, code)
+                lineup_ids.append(player_id)
+        lineup = self.players.players(lineup_ids)
         
         # Ensure minimum requirements are met
-        if self.is_valid_lineup(lineup):
+        valid = rules.is_valid_state(state)
+        instruments.count('greedy.gap_fill_fallbacks', 0 if valid else 1)
+        if valid:
             return lineup
         
         # If greedy didn't work, try to fill gaps
-        return self.fill_lineup_gaps(available, lineup, positions, week)
+        available = self.get_available_players(week, eliminated)
+        lineup = self.fill_lineup_gaps(available, lineup, self._count_positions(np.array(lineup_ids, dtype=np.int64)),
+                                       week)
+        if not self.is_valid_lineup(lineup):
+            print(f"Warning: No valid week {week} lineup left: unused players fill {len(lineup)} of "
+                  f"{rules.size} spots ({rules.describe()})")
+        return lineup
     
-    def fill_lineup_gaps(self, available: List[Player], 
+    @instrumented('fill_lineup_gaps', 'week')
+    def fill_lineup_gaps(self, available: np.ndarray, 
                         current_lineup: List[Player], 
                         positions: Dict[str, int],
                         week: int) -> List[Player]:
         """Fill gaps in lineup to meet minimum requirements"""
-        lineup = current_lineup[:]
-        used_ids = {f"{p.team}_{p.name}" for p in lineup}
+        store = self.players
+        rules = self.roster_rules()
+        lineup_ids = np.array([p.id for p in current_lineup], dtype=np.int64)
         
         # Sort remaining available by score
-        remaining = []
-        for player in available:
-            player_id = f"{player.team}_{player.name}"
-            if player_id not in used_ids:
-                bonus = self.get_elite_conservation_bonus(player.team, week)
-                score = player.adjusted_fpts * bonus
-                remaining.append((score, player))
-        remaining.sort(reverse=True, key=lambda x: x[0])
+        remaining = available[~np.isin(available, lineup_ids)]
+        scores = self.valuation().week(week)[remaining]
+        remaining = remaining[np.argsort(-scores, kind='stable')]
+        self.instruments.count('gap_fill.scanned', len(remaining))
         
         # Fill minimum requirements first
-        for score, player in remaining:
-            if len(lineup) >= 9:
-                break
-            
-            pos = player.position
-            if pos in ['S', 'CB', 'LB', 'DE', 'DT', 'OLB', 'ILB', 'FS', 'NT', 'DL']:
-                pos = 'DEF'
-            
-            # Add to meet minimums
-            if pos == 'QB' and positions['QB'] < 1:
-                lineup.append(player)
-                positions['QB'] += 1
-                used_ids.add(f"{player.team}_{player.name}")
-            elif pos == 'RB' and positions['RB'] < 2:
-                lineup.append(player)
-                positions['RB'] += 1
-                used_ids.add(f"{player.team}_{player.name}")
-            elif pos == 'WR' and positions['WR'] < 2:
-                lineup.append(player)
-                positions['WR'] += 1
-                used_ids.add(f"{player.team}_{player.name}")
-            elif pos == 'TE' and positions['TE'] < 1:
-                lineup.append(player)
-                positions['TE'] += 1
-                used_ids.add(f"{player.team}_{player.name}")
-        
-        # Fill remaining spots up to 9
-        for score, player in remaining:
-            if len(lineup) >= 9:
+        shortfall = rules.shortfall([positions[pos] for pos in rules.positions])
+        added = self._select_by_position(remaining, shortfall, rules.size - len(lineup_ids))
+        lineup_ids = np.concatenate([lineup_ids, added])
+        
+        # Fill remaining spots with the best players the rules still have room for
+        remaining = remaining[~np.isin(remaining, added)]
+        codes = self.lineup_positions()
+        state = rules.state_of(codes[lineup_ids])
+        added = []
+        for player_id, code in zip(remaining.tolist(), codes[remaining].tolist()):
+            if len(lineup_ids) + len(added) >= rules.size:
                 break
-            
-            player_id = f"{player.team}_{player.name}"
-            if player_id in used_ids:
-                continue
-            
-            pos = player.position
-            if pos in ['S', 'CB', 'LB', 'DE', 'DT', 'OLB', 'ILB', 'FS', 'NT', 'DL']:
-                pos = 'DEF'
-            
-            # Check if we can still add this position
-            can_add = False
-            if pos == 'RB' and positions['RB'] < 3:
-                can_add = True
-            elif pos == 'WR' and positions['WR'] < 3:
-                can_add = True
-            elif pos == 'TE' and positions['TE'] < 2:
-                can_add = True
-            elif pos == 'K' and positions['K'] < 1:
-                can_add = True
-            elif pos == 'DEF' and positions['DEF'] < 1:
-                can_add = True
-            
-            if can_add:
-                lineup.append(player)
-                positions[pos] += 1
-                used_ids.add(player_id)
+            if rules.can_add(state, code):
+                state = rules.add(state, code)
+                added.append(player_id)
+        return store.players(np.concatenate([lineup_ids, np.array(added, dtype=np.int64)]))
+    
+    @instrumented('optimize_plan_exact', 'start_week')
+    def optimize_plan_exact(self, eliminations: Dict[int, List[str]] = None,
+                            start_week: int = 1, locks: Dict[int, List[int]] = None) -> Dict[int, List[Player]]:
+        """
+        Optimize all playoff weeks together with the exact solver
         
-        return lineup
+        Uses the same weekly scores as the greedy path (adjusted points times
+        conservation bonus) but plans every week at once, so an early week never
+        burns a player who is worth more later. The plan is provably optimal for
+        the given eliminations. Weeks before start_week are treated as played:
+        their eliminations apply and used players are skipped.
+        
+        locks: player ids that must be in a week's lineup, by week
+        
+        Returns: dict mapping week number to lineup
+        """
+        return self._plan_all_weeks(solve_plan, eliminations, start_week, locks)
     
-    def simulate_playoffs(self) -> Dict[int, List[Player]]:
+    @instrumented('optimize_plan_flow', 'start_week')
+    def optimize_plan_flow(self, eliminations: Dict[int, List[str]] = None,
+                           start_week: int = 1, locks: Dict[int, List[int]] = None) -> Dict[int, List[Player]]:
         """
-        Simulate the entire playoff schedule and optimize lineups for each week
+        Plan all playoff weeks together from a min-cost flow (see flow_planner.py)
         
-        Returns: dict mapping week number to optimal lineup
+        Same inputs and weekly scores as optimize_plan_exact, in polynomial
+        time for very large pools. The flow drops the position minimums and its
+        plan is then repaired to meet the roster rules; last_solution's upper
+        bound is the flow value, so its gap bounds the distance from optimal.
+        
+        Returns: dict mapping week number to lineup
         """
-        weekly_lineups = {}
-        eliminated_teams = set()
+        return self._plan_all_weeks(solve_plan_flow, eliminations, start_week, locks)
+    
+    def _plan_all_weeks(self, solve, eliminations: Dict[int, List[str]], start_week: int,
+                        locks: Dict[int, List[int]]) -> Dict[int, List[Player]]:
+        """Run a multi-week planner (solve_plan or solve_plan_flow) with locked players"""
+        player_ids, weeks, values, positions = self._plan_values(eliminations, start_week)
         
-        # Week 1: Wild Card Round
-        # Games: #7 @ #2, #6 @ #3, #5 @ #4 (both conferences)
-        print("\n=== WILD CARD ROUND (Week 1) ===")
-        lineup = self.optimize_lineup_greedy(1, eliminated_teams)
-        weekly_lineups[1] = lineup
-        for player in lineup:
-            self.used_players.add(f"{player.team}_{player.name}")
+        # Locked players are worth more than any plan without them in their
+        # week and unusable in every other week
+        locked = [(week, player_id) for week, ids in (locks or {}).items() for player_id in ids]
+        rows = {player_id: row for row, player_id in enumerate(player_ids)} if locked else {}
+        for week, player_id in locked:
+            row = rows.get(player_id, -1)
+            if week not in weeks or row < 0 or not np.isfinite(values[row, weeks.index(week)]):
+                raise ValueError(f"{self.players[player_id].key} cannot be locked into week {week}")
+            value = values[row, weeks.index(week)]
+            values[row] = -np.inf
+            values[row, weeks.index(week)] = value + self.LOCK_VALUE
         
-        # Simulate eliminations (lower seeds more likely to lose)
-        # Eliminated: #7 LAC, #7 GB, #6 SF, #4 CAR
-        eliminated_teams.update(['LAC', 'GB', 'SF', 'CAR'])
+        solution = solve(values, positions, self.roster_rules())
+        if locked:
+            chosen = {(weeks[column], player_id) for column, week_rows in enumerate(solution.weeks)
+                      for player_id in player_ids[week_rows]}
+            if not chosen.issuperset(locked):
+                raise ValueError("Locked players do not fit the lineup requirements")
+            solution.objective -= self.LOCK_VALUE * len(locked)
+            solution.upper_bound -= self.LOCK_VALUE * len(locked)
+        self.last_solution = solution
+        return {
+            weeks[column]: self.players.players(player_ids[rows])
+            for column, rows in enumerate(solution.weeks)
+        }
+    
+    def _plan_values(self, eliminations: Dict[int, List[str]] = None,
+                     start_week: int = 1) -> Tuple[np.ndarray, List[int], np.ndarray, np.ndarray]:
+        """
+        Week scores of every unused player for the exact solvers
         
-        # Week 2: Divisional Round
-        # Remaining: DEN, NE, JAX, PIT, HOU, BUF (AFC), SEA, CHI, PHI, LAR (NFC)
-        print("\n=== DIVISIONAL ROUND (Week 2) ===")
-        lineup = self.optimize_lineup_greedy(2, eliminated_teams)
-        weekly_lineups[2] = lineup
-        for player in lineup:
-            self.used_players.add(f"{player.team}_{player.name}")
+        Returns (player ids, planned weeks, (players, weeks) values with -inf
+        once a team is eliminated, lineup position code per player)
+        """
+        if eliminations is None:
+            eliminations = self.ASSUMED_ELIMINATIONS
+        store = self.players
+        weeks = list(range(start_week, self.PLAYOFF_WEEKS + 1))
         
-        # Simulate eliminations: #5 HOU, #6 BUF, #3 PHI, #5 LAR
-        eliminated_teams.update(['HOU', 'BUF', 'PHI', 'LAR'])
+        player_ids = np.flatnonzero(~store.used)
+        teams = store.team[player_ids]
+        values = self.valuation().values[player_ids, start_week - 1:]
+        eliminated = 0
+        for week in range(1, start_week):
+            eliminated |= store.team_bits(eliminations.get(week, []))
+        for column, week in enumerate(weeks):
+            values[store.team_mask(eliminated)[teams], column] = -np.inf
+            eliminated |= store.team_bits(eliminations.get(week, []))
         
-        # Week 3: Conference Championships
-        # Remaining: DEN, NE, JAX, PIT (AFC), SEA, CHI (NFC)
-        print("\n=== CONFERENCE CHAMPIONSHIPS (Week 3) ===")
-        lineup = self.optimize_lineup_greedy(3, eliminated_teams)
-        weekly_lineups[3] = lineup
-        for player in lineup:
-            self.used_players.add(f"{player.team}_{player.name}")
+        return player_ids, weeks, values, self.lineup_positions()[player_ids]
+    
+    def ranked_plans(self, eliminations: Dict[int, List[str]] = None,
+                     start_week: int = 1) -> Iterator[Dict[int, List[Player]]]:
+        """
+        Full plans from best to worst, generated lazily
+        
+        The first plan is the exact solver's; take as many as needed, e.g.
+        itertools.islice(optimizer.ranked_plans(), 100).
+        """
+        player_ids, weeks, values, positions = self._plan_values(eliminations, start_week)
+        for solution in rank_plans(values, positions, self.roster_rules()):
+            plan = {
+                weeks[column]: self.players.players(player_ids[rows])
+                for column, rows in enumerate(solution.weeks)
+            }
+            if all(self.is_valid_lineup(lineup) for lineup in plan.values()):
+                yield plan
+    
+    def ranked_lineups(self, week: int, eliminated: int = 0) -> Iterator[List[Player]]:
+        """Lineups for a single week from best to worst, generated lazily"""
+        store = self.players
+        player_ids = store.available(eliminated)
+        values = self.valuation().week(week)[player_ids, None]
+        positions = self.lineup_positions()[player_ids]
+        for solution in rank_plans(values, positions, self.roster_rules()):
+            lineup = store.players(player_ids[solution.weeks[0]])
+            if self.is_valid_lineup(lineup):
+                yield lineup
+    
+    def find_alternatives(self, k: int, week: int = None) -> List[Dict[int, List[Player]]]:
+        """
+        The k best plans, or the k best lineups of one week as {week: lineup}
+        
+        A single week is planned with the assumed eliminations of earlier weeks
+        applied and no players used yet.
+        """
+        if week is None:
+            return list(itertools.islice(self.ranked_plans(), k))
+        eliminated = 0
+        for earlier in range(1, week):
+            eliminated |= self.players.team_bits(self.ASSUMED_ELIMINATIONS.get(earlier, []))
+        return [{week: lineup} for lineup in itertools.islice(self.ranked_lineups(week, eliminated), k)]
+    
+    @instrumented('local_search')
+    def improve_plan(self, plan: Dict[int, List[Player]], seconds: float = 2.0, restarts: int = None,
+                     workers: int = None, seed: int = None,
+                     eliminations: Dict[int, List[str]] = None) -> Tuple[Dict[int, List[Player]], LocalSearchResult]:
+        """
+        Improve a full plan by simulated annealing over all weeks (see local_search.py)
+        
+        The plan's players are released and the improved plan's players marked
+        used. Every other used player (earlier weeks, exclusions) stays out of
+        the search. Returns (improved plan, LocalSearchResult).
+        """
+        store = self.players
+        store.release(p.id for lineup in plan.values() for p in lineup)
+        player_ids, weeks, values, positions = self._plan_values(eliminations, min(plan))
+        rows = {player_id: row for row, player_id in enumerate(player_ids)}
+        start = [[rows[p.id] for p in plan[week]] for week in weeks]
+        result = improve_plan(values, positions, self.roster_rules(), start, seconds, restarts, workers, seed)
+        improved = {weeks[column]: store.players(player_ids[week_rows])
+                    for column, week_rows in enumerate(result.weeks)}
+        store.mark_used(p.id for lineup in improved.values() for p in lineup)
+        if result.improvement > 0:
+            self.last_solution = None  # The solver's objective no longer describes the plan
+        self.instruments.count('local_search.moves', result.moves)
+        return improved, result
+    
+    def lineup_value(self, week: int, lineup: List[Player]) -> float:
+        """Objective value of a lineup: adjusted points times the week's conservation bonus"""
+        ids = np.array([p.id for p in lineup], dtype=np.int64)
+        return float(np.sum(self.valuation().week(week)[ids]))
+    
+    def weekly_projection(self, rules: ScoringRules = None) -> WeeklyProjection:
+        """Weekly points distribution of every player from GP and season points (league scoring by default)"""
+        return WeeklyProjection.from_store(self.players, self.score_players(rules), self.lineup_positions(),
+                                           self.roster_rules().positions)
+    
+    def team_outcomes(self) -> TeamOutcomeModel:
+        """Same-team game-state model from the players' league-scored passing and rushing points"""
+        if self._scorer is None or len(self._scorer.untracked) != len(self.players):
+            self.score_players()
+        return TeamOutcomeModel.from_store(self.players, self._scorer.stat_points(self.SCORING_RULES),
+                                           self.lineup_positions(), self.roster_rules().positions)
+    
+    def plan_sampler(self, n_samples: int, seed: int = None, scenarios: BracketResult = None,
+                     correlated: bool = True) -> PlanSampler:
+        """
+        Scores plans over n_samples weekly outcomes, and over sampled brackets if given (one per sample)
+        
+        correlated: draw same-team players from shared game states (team_outcomes.py)
+        """
+        rows = None
+        if scenarios is not None:
+            by_team = np.array([scenarios.team_index.get(team, -1) for team in self.players.teams], dtype=np.int64)
+            rows = by_team[self.players.team]
+        outcomes = self.team_outcomes() if correlated else None
+        return PlanSampler(self.weekly_projection(), n_samples, seed, scenarios, rows, outcomes)
+    
+    @instrumented('simulate_playoffs', 'solver')
+    def simulate_playoffs(self, solver: str = 'greedy', start_week: int = 1,
+                          eliminations: Dict[int, List[str]] = None,
+                          locks: Dict[int, List[int]] = None) -> Dict[int, List[Player]]:
+        """
+        Simulate the entire playoff schedule and optimize lineups for each week
+        
+        solver: 'greedy' optimizes one week at a time, 'exact' plans all weeks together,
+            'flow' plans all weeks together from a min-cost flow (fast on very large pools)
+        start_week: first week to plan; earlier weeks are already played
+        eliminations: teams eliminated at the end of each week (assumed bracket by default)
+        locks: player ids that must be in a week's lineup, by week
+        
+        Returns: dict mapping week number to optimal lineup
+        """
+        if eliminations is None:
+            eliminations = self.ASSUMED_ELIMINATIONS
+        round_names = {
+            1: 'WILD CARD ROUND',
+            2: 'DIVISIONAL ROUND',
+            3: 'CONFERENCE CHAMPIONSHIPS',
+            4: 'SUPER BOWL',
+        }
         
-        # Simulate eliminations: #2 NE, #4 PIT, #2 CHI
-        eliminated_teams.update(['NE', 'PIT', 'CHI'])
+        if solver in ('exact', 'flow'):
+            plan_weeks = self.optimize_plan_exact if solver == 'exact' else self.optimize_plan_flow
+            weekly_lineups = plan_weeks(eliminations, start_week, locks)
+            for week, lineup in weekly_lineups.items():
+                print(f"\n=== {round_names[week]} (Week {week}) ===")
+                self.players.mark_used(p.id for p in lineup)
+            return weekly_lineups
         
-        # Week 4: Super Bowl
-        # Remaining: DEN (AFC), SEA, JAX (NFC) - at least one from each conference
+        weekly_lineups = {}
+        eliminated = 0  # Bitmask over team codes
+        for week in range(1, start_week):
+            eliminated |= self.players.team_bits(eliminations.get(week, []))
+        locks = locks or {}
+        for week, ids in locks.items():
+            if ids and week not in range(start_week, self.PLAYOFF_WEEKS + 1):
+                raise ValueError(f"{self.players[ids[0]].key} cannot be locked into week {week}")
+        # Locked players are only available in their own week
+        for ids in locks.values():
+            self.players.mark_used(ids)
+        
+        # Week 1: Wild Card (#7 @ #2, #6 @ #3, #5 @ #4 in both conferences), then
+        # eliminations from the assumed bracket after every round.
         # Note: This is a simplified simulation. Actual playoff results will vary.
         # The optimizer assumes DEN (AFC #1) vs SEA (NFC #1) in Super Bowl based on seeding.
-        print("\n=== SUPER BOWL (Week 4) ===")
-        lineup = self.optimize_lineup_greedy(4, eliminated_teams)
-        weekly_lineups[4] = lineup
-        for player in lineup:
-            self.used_players.add(f"{player.team}_{player.name}")
+        for week in range(start_week, self.PLAYOFF_WEEKS + 1):
+            print(f"\n=== {round_names[week]} (Week {week}) ===")
+            if locks.get(week):
+                # Start from the locked players and fill the rest greedily
+                locked = np.array(locks[week], dtype=np.int64)
+                if np.any(self.players.team_mask(eliminated)[self.players.team[locked]]):
+                    raise ValueError(f"A player locked into week {week} has been eliminated")
+                lineup = self.fill_lineup_gaps(self.get_available_players(week, eliminated),
+                                               self.players.players(locked), self._count_positions(locked), week)
+                if not self.is_valid_lineup(lineup):
+                    raise ValueError("Locked players do not fit the lineup requirements")
+            else:
+                lineup = self.optimize_lineup_greedy(week, eliminated)
+            weekly_lineups[week] = lineup
+            self.players.mark_used(p.id for p in lineup)
+            eliminated |= self.players.team_bits(eliminations.get(week, []))
         
         return weekly_lineups
     
+    def _lookup_players(self, keys: List[str]) -> List[Player]:
+        """Players for "TEAM_Name" keys, warning about unknown ones"""
+        players = []
+        for key in keys:
+            player_id = self.players.find(key)
+            if player_id < 0:
+                print(f"Warning: Player not loaded: {key}")
+                continue
+            players.append(self.players[player_id])
+        return players
+    
+    def optimize_from_state(self, state: LeagueState, start_week: int,
+                            solver: str = 'greedy') -> Tuple[Dict[int, List[Player]], bool]:
+        """
+        Re-plan the remaining weeks from a persisted league state
+        
+        Weeks before start_week are locked (recorded lineups, else the previous
+        plan) and their players marked used. Actual eliminations replace the
+        assumed ones for played weeks. If the inputs for the remaining weeks are
+        unchanged since the saved plan, that plan is reused without solving.
+        
+        Returns: (dict mapping week number to lineup for every week, reused flag)
+        """
+        state.advance_to(start_week)
+        for key in state.used_players:
+            player_id = self.players.find(key)
+            if player_id >= 0:
+                self.players.mark_used([player_id])
+        
+        eliminations = {week: list(teams) for week, teams in self.ASSUMED_ELIMINATIONS.items()}
+        for week in range(1, start_week):
+            if week in state.eliminations:
+                eliminations[week] = state.eliminations[week]
+            else:
+                print(f"Warning: No actual eliminations recorded for week {week}, using assumed bracket")
+        
+        available = np.flatnonzero(~self.players.used)
+        fingerprint = inputs_hash(
+            solver, start_week, eliminations, sorted(state.used_players),
+            [self.players[i].key for i in available],
+            self.valuation().values[available].tobytes(),
+        )
+        
+        weekly_lineups = {week: self._lookup_players(keys) for week, keys in state.locked_lineups.items()
+                          if week < start_week}
+        remaining_weeks = range(start_week, self.PLAYOFF_WEEKS + 1)
+        reused = state.plan_inputs == fingerprint and all(week in state.plan for week in remaining_weeks)
+        if reused:
+            for week in remaining_weeks:
+                weekly_lineups[week] = self._lookup_players(state.plan[week])
+                self.players.mark_used(p.id for p in weekly_lineups[week])
+        else:
+            weekly_lineups.update(self.simulate_playoffs(solver, start_week, eliminations))
+        
+        state.plan = {week: [p.key for p in lineup] for week, lineup in weekly_lineups.items()}
+        state.plan_inputs = fingerprint
+        return weekly_lineups, reused
+    
     def print_lineup(self, week: int, lineup: List[Player]):
         """Print a formatted lineup"""
         print(f"\nWeek {week} Lineup:")
         print("-" * 70)
         
-        total_points = 0
+        rules = self.roster_rules()
+        weekly = self.weekly_projection().mean
+        season_points = 0
+        projected = 0
         positions = defaultdict(list)
         
         for player in lineup:
-            pos = player.position
-            if pos in ['S', 'CB', 'LB', 'DE', 'DT', 'OLB', 'ILB', 'FS', 'NT', 'DL']:
-                pos = 'DEF'
-            positions[pos].append(player)
-            total_points += player.base_fpts
-        
-        # Print by position
-        for pos in ['QB', 'RB', 'WR', 'TE', 'K', 'DEF']:
-            if pos in positions:
-                for player in positions[pos]:
-                    print(f"  {pos:3s} | {player.name:25s} | {player.team:3s} | {player.base_fpts:6.1f} pts")
+            positions[rules.code(player.position)].append(player)
+            season_points += player.base_fpts
+            projected += weekly[player.id]
+        
+        # Print by position: season points, then the projected points for one week
+        for code, pos in enumerate(rules.positions):
+            for player in positions[code]:
+                print(f"  {pos:3s} | {player.name:25s} | {player.team:3s} | {player.base_fpts:6.1f} season "
+                      f"| {weekly[player.id]:5.1f}/wk")
         
         print("-" * 70)
-        print(f"Total Projected Points: {total_points:.1f}")
+        if not self.is_valid_lineup(lineup):
+            print(f"NOT A VALID LINEUP: needs {rules.describe()}")
+        print(f"Projected Week Points: {projected:.1f} (season points {season_points:.1f})")
         print()
 
 
-def main():
+def print_alternatives(optimizer: PlayoffOptimizer, alternatives: List[Dict[int, List[Player]]],
+                       week: int = None):
+    """Print ranked alternative plans (or single-week lineups) against the best one"""
+    title = f"WEEK {week} LINEUPS" if week else "PLANS"
+    print(f"\nTOP {len(alternatives)} {title} (ranked by planning value)")
+    print("-" * 70)
+    best = alternatives[0]
+    best_pairs = {(w, p.id) for w, lineup in best.items() for p in lineup}
+    for rank, plan in enumerate(alternatives, start=1):
+        value = sum(optimizer.lineup_value(w, lineup) for w, lineup in plan.items())
+        points = sum(p.base_fpts for lineup in plan.values() for p in lineup)
+        pairs = {(w, p.id) for w, lineup in plan.items() for p in lineup}
+        swaps = ', '.join(f"W{w} {optimizer.players[i].name}" for w, i in sorted(pairs - best_pairs))
+        print(f"  #{rank:<3d} value {value:8.1f} | {points:7.1f} pts | {'in: ' + swaps if swaps else 'best'}")
+    print("-" * 70)
+
+
+def choose_plan_for_payout(optimizer: PlayoffOptimizer, plans: List[Dict[int, List[Player]]],
+                           paid_lines: List[float], n_samples: int, seed: int = None, field: int = 0,
+                           field_noise: float = None, payouts: List[float] = None,
+                           correlated: bool = True) -> Tuple:
+    """
+    Plan with the best chance of a paid finish over sampled weekly points and brackets
+    
+    plans[0] is the solver's plan. With field > 0 the paid lines come from that
+    many simulated opponents (field_simulator.py) instead of paid_lines, and the
+    plan with the most expected dollars wins. Returns (chosen plan, (finish
+    distribution, per-plan summaries, chosen index, paid lines), finish against
+    the field or None); the chosen plan's players are marked used. Same-team
+    players share game states unless correlated is False.
+    """
+    scenarios = BracketSimulator(optimizer.PLAYOFF_SEEDS).simulate(n_samples, seed=seed)
+    sampler = optimizer.plan_sampler(n_samples, seed, scenarios, correlated)
+    ids = [{week: [p.id for p in lineup] for week, lineup in plan.items()} for plan in plans]
+    simulator = None
+    if field:
+        simulator = FieldSimulator(optimizer, sampler, field, field_noise, seed, payouts)
+        paid_lines, payouts = simulator.simulate().paid_lines, simulator.payouts
+    best, summaries = best_plan_for_payout(sampler, ids, paid_lines, payouts)
+    optimizer.players.reset_used()
+    optimizer.players.mark_used(itertools.chain.from_iterable(ids[best].values()))
+    if best:
+        optimizer.last_solution = None  # The solver's objective no longer describes the plan
+    distribution = finish_distribution(sampler.totals(ids[best]), paid_lines)
+    field_result = simulator.simulate(ids[best]) if simulator is not None else None
+    return plans[best], (distribution, summaries, best, paid_lines), field_result
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Playoff fantasy football lineup optimizer")
+    parser.add_argument('--solver', choices=['greedy', 'exact', 'flow', 'scenario'], default='greedy',
+                        help="greedy plans week by week; exact plans all weeks together; "
+                             "flow plans all weeks from a min-cost flow (fast for very large pools); "
+                             "scenario maximizes expected points over sampled brackets")
+    parser.add_argument('--min-points', type=float, default=PlayoffOptimizer.MIN_PLAYER_POINTS,
+                        help="minimum season fantasy points for a player to be considered")
+    parser.add_argument('--data-dir', default='.', help="directory containing the team CSV files")
+    parser.add_argument('--roster-format', choices=list(ROSTER_FORMATS), default='playoff',
+                        help="league lineup format (see roster_rules.py)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="parse every CSV instead of using the binary snapshot")
+    parser.add_argument('--bracket-sims', type=int, default=0,
+                        help="simulate this many brackets for advancement probabilities "
+                             "(0 uses the fixed seed tables)")
+    parser.add_argument('--scenarios', type=int, default=10000,
+                        help="sampled brackets for the scenario solver")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for parallel stages (default: all cores)")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for simulations")
+    parser.add_argument('--state', default=None,
+                        help="league state file to load and update (e.g. league_state.json)")
+    parser.add_argument('--from-week', type=int, default=None,
+                        help="re-plan from this week using the state file (default: its current week)")
+    parser.add_argument('--eliminated', action='append', default=[], metavar='WEEK=TEAM,TEAM',
+                        help="record teams actually eliminated at the end of a week")
+    parser.add_argument('--played', action='append', default=[], metavar='WEEK=TEAM_Name,TEAM_Name',
+                        help="record the lineup actually played in a week (default: the planned one)")
+    parser.add_argument('--alternatives', type=int, default=0, metavar='K',
+                        help="also list the K best full plans, ranked by planning value")
+    parser.add_argument('--alternatives-week', type=int, default=None, metavar='WEEK',
+                        help="list the K best lineups for this week instead of full plans")
+    parser.add_argument('--profile', action='store_true',
+                        help="print stage timings and counters at the end")
+    parser.add_argument('--paid-lines', default=None, metavar='1ST,2ND,3RD',
+                        help="plan totals that held each paid place; picks, among the solver's plan and the "
+                             "--candidates best plans by planning value, the one with the best chance of a "
+                             "paid finish over sampled weekly points and brackets (plans outside that list "
+                             "are never scored)")
+    parser.add_argument('--samples', type=int, default=100_000,
+                        help="weekly-points and bracket samples for --paid-lines")
+    parser.add_argument('--candidates', type=int, default=50,
+                        help="plans, best planning value first, re-ranked with the solver's plan by "
+                             "--paid-lines and --field; the payout objective only chooses among these")
+    parser.add_argument('--field', type=int, default=0, metavar='N',
+                        help="simulate N opponent entries and pick the candidate plan (see --candidates) "
+                             "with the most expected dollars against them (paid lines come from the field)")
+    parser.add_argument('--field-noise', type=float, default=FieldSimulator.NOISE,
+                        help="spread of opponents' opinions of players for --field (0 copies the greedy plan)")
+    parser.add_argument('--payouts', default=None, metavar='1ST,2ND,3RD',
+                        help="prize dollars per place; default "
+                             f"{','.join(f'{amount:.0f}' for amount in FieldSimulator.PAYOUTS)} with --field")
+    parser.add_argument('--improve', type=float, default=0.0, metavar='SECONDS',
+                        help="improve the solver's plan by local search (simulated annealing) "
+                             "for this many seconds")
+    parser.add_argument('--restarts', type=int, default=None,
+                        help="independent local-search restarts for --improve (default: one per worker)")
+    parser.add_argument('--independent-players', action='store_true',
+                        help="sample every player independently for --paid-lines and --field "
+                             "(default: same-team players share weekly game states)")
+    parser.add_argument('--save-plan', default=None, metavar='FILE',
+                        help="append the plan to a JSONL results file (the batch_optimizer format, "
+                             "read by strategy_analysis.py)")
+    parser.add_argument('--store', default=None, metavar='DB',
+                        help="add the plan, settings and outcomes to a SQLite results store (results_store.py)")
+    parser.add_argument('--trace', default=None, metavar='FILE',
+                        help="write stage timings and counters as a JSON trace (Chrome trace format)")
+    args = parser.parse_args(argv)
+    if args.alternatives and (args.state or args.solver == 'scenario'):
+        parser.error("--alternatives is supported for the greedy, exact and flow solvers without --state")
+    if (args.paid_lines or args.field) and (args.state or args.solver == 'scenario'):
+        parser.error("--paid-lines and --field are supported for the greedy, exact and flow solvers without --state")
+    if args.improve and (args.state or args.solver == 'scenario'):
+        parser.error("--improve is supported for the greedy, exact and flow solvers without --state")
+    if args.improve < 0 or (args.restarts is not None and args.restarts < 1):
+        parser.error("--improve and --restarts must be positive")
+    if args.paid_lines and args.field:
+        parser.error("--paid-lines and --field are alternatives; the field sets the paid lines")
+    if args.field < 0:
+        parser.error("--field must be positive")
+    try:
+        if args.paid_lines:
+            args.paid_lines = sorted((float(line) for line in args.paid_lines.split(',')), reverse=True)
+        if args.payouts:
+            args.payouts = [float(amount) for amount in args.payouts.split(',')]
+    except ValueError:
+        parser.error("--paid-lines and --payouts expect comma-separated numbers")
+    if args.alternatives_week is not None and not 1 <= args.alternatives_week <= PlayoffOptimizer.PLAYOFF_WEEKS:
+        parser.error(f"--alternatives-week must be between 1 and {PlayoffOptimizer.PLAYOFF_WEEKS}")
+    if (args.from_week or args.eliminated or args.played) and not args.state:
+        parser.error("--from-week, --eliminated and --played need --state")
+    if args.state and args.solver == 'scenario':
+        parser.error("--state is supported for the greedy, exact and flow solvers")
+    try:
+        args.eliminated = [_parse_week_list(value) for value in args.eliminated]
+        args.played = [_parse_week_list(value) for value in args.played]
+    except ValueError:
+        parser.error("expected WEEK=ITEM,ITEM")
+    return args
+
+
+def _parse_week_list(value: str) -> Tuple[int, List[str]]:
+    """Parse "WEEK=A,B,C" into (week, [A, B, C])"""
+    week, items = value.split('=', 1)
+    return int(week), [item.strip() for item in items.split(',') if item.strip()]
+
+
+def main(argv=None):
     """Main function to run the optimizer"""
+    args = parse_args(argv)
+    
     print("=" * 70)
     print("PLAYOFF FANTASY FOOTBALL LINEUP OPTIMIZER")
     print("=" * 70)
     
     optimizer = PlayoffOptimizer()
+    optimizer.use_roster_format(args.roster_format)
+    if args.profile or args.trace:
+        optimizer.instruments = Instrumentation()
+    instruments = optimizer.instruments
     
     # Load all player data
     print("\nLoading player data...")
-    optimizer.load_players()
+    optimizer.load_players(args.data_dir, min_points=args.min_points, use_cache=not args.no_cache)
     
     # Apply scoring adjustments
     print("Applying TE premium (1.5x PPR)...")
     optimizer.apply_te_premium()
     
-    print("Weighting players by team advancement probability...")
-    optimizer.weight_player_value()
+    if args.bracket_sims > 0:
+        print(f"Simulating {args.bracket_sims:,} playoff brackets...")
+        simulator = BracketSimulator(optimizer.PLAYOFF_SEEDS)
+        with instruments.span('bracket_simulation', sims=args.bracket_sims):
+            optimizer.use_bracket_simulation(simulator.simulate(args.bracket_sims, seed=args.seed))
+        print_survival_table(optimizer.bracket)
     
-    # Optimize lineups for all playoff weeks
-    print("\nOptimizing lineups for all playoff weeks...")
-    weekly_lineups = optimizer.simulate_playoffs()
+    scenario_totals = None
+    alternatives = None
+    payout = None
+    field_result = None
+    search = None
+    if args.solver == 'scenario':
+        # Sampled brackets already account for advancement, so skip the weighting
+        print(f"\nOptimizing expected points over {args.scenarios:,} sampled brackets...")
+        with instruments.span('bracket_simulation', sims=args.scenarios):
+            scenarios = BracketSimulator(optimizer.PLAYOFF_SEEDS).simulate(args.scenarios, seed=args.seed)
+        scenario_optimizer = ScenarioOptimizer(optimizer, scenarios, workers=args.workers)
+        with instruments.span('scenario.optimize'):
+            weekly_lineups = scenario_optimizer.optimize()
+        with instruments.span('scenario.evaluate'):
+            scenario_totals = scenario_optimizer.evaluate(weekly_lineups)
+    else:
+        print("Weighting players by team advancement probability...")
+        optimizer.weight_player_value()
+        
+        if args.state:
+            state = LeagueState.load(args.state)
+            for week, teams in args.eliminated:
+                state.record_eliminations(week, teams)
+            for week, keys in args.played:
+                try:
+                    optimizer.check_played_lineup(week, keys)
+                except ValueError as error:
+                    sys.exit(f"--played {week}: {error}")
+                state.lock_week(week, keys)
+            start_week = args.from_week or state.current_week
+            print(f"\nRe-planning weeks {start_week}-{optimizer.PLAYOFF_WEEKS} from {args.state}...")
+            weekly_lineups, reused = optimizer.optimize_from_state(state, start_week, args.solver)
+            if reused:
+                print("Inputs unchanged since the saved plan; keeping it")
+            state.save(args.state)
+        else:
+            if args.alternatives:
+                alternatives = optimizer.find_alternatives(args.alternatives, args.alternatives_week)
+            # Optimize lineups for all playoff weeks
+            print("\nOptimizing lineups for all playoff weeks...")
+            payout_objective = args.paid_lines or args.field
+            candidates = list(itertools.islice(optimizer.ranked_plans(), args.candidates)) if payout_objective else []
+            weekly_lineups = optimizer.simulate_playoffs(solver=args.solver)
+            if args.improve:
+                print(f"Improving the plan by local search for {args.improve:g}s...")
+                weekly_lineups, search = optimizer.improve_plan(weekly_lineups, args.improve, args.restarts,
+                                                                args.workers, args.seed)
+            if payout_objective:
+                against = f"a field of {args.field:,} opponents" if args.field else "the paid lines"
+                print(f"\nComparing {len(candidates) + 1} plans against {against} "
+                      f"over {args.samples:,} samples...")
+                with instruments.span('payout.choose', samples=args.samples, field=args.field):
+                    weekly_lineups, payout, field_result = choose_plan_for_payout(
+                        optimizer, [weekly_lineups] + candidates, args.paid_lines, args.samples, args.seed,
+                        args.field, args.field_noise, args.payouts, not args.independent_players)
     
     # Print results
     print("\n" + "=" * 70)
@@ -585,21 +1049,80 @@ def main():
     print("=" * 70)
     
     total_all_weeks = 0
+    weekly_points = optimizer.weekly_projection().mean
     for week in sorted(weekly_lineups.keys()):
         lineup = weekly_lineups[week]
         optimizer.print_lineup(week, lineup)
-        total_all_weeks += sum(p.base_fpts for p in lineup)
+        total_all_weeks += sum(weekly_points[p.id] for p in lineup)
     
     print("=" * 70)
     print(f"TOTAL PROJECTED POINTS ACROSS ALL WEEKS: {total_all_weeks:.1f}")
+    if optimizer.last_solution is not None:
+        solution = optimizer.last_solution
+        label = "Flow planner" if args.solver == 'flow' else "Exact solver"
+        print(f"{label} objective: {solution.objective:.1f} "
+              f"(upper bound {solution.upper_bound:.1f}, gap {solution.gap:.1f})")
+    if search is not None:
+        print(f"Local search: planning value {search.start_objective:.1f} -> {search.objective:.1f} "
+              f"(+{search.improvement:.1f}) from {search.moves:,} moves over {search.restarts} restart(s)")
+    if scenario_totals is not None:
+        print_distribution(summarize_totals(scenario_totals), len(scenario_totals))
+    if payout is not None:
+        print_payout(*payout)
+    if field_result is not None:
+        print_field_result(field_result)
     print("=" * 70)
     
+    if alternatives is not None:
+        print_alternatives(optimizer, alternatives, args.alternatives_week)
+    
+    if args.save_plan or args.store:
+        from batch_optimizer import lineup_records
+        points = optimizer.weekly_projection().mean
+        result = {
+            'id': args.solver,
+            'solver': args.solver,
+            'valid': all(optimizer.is_valid_lineup(lineup) for lineup in weekly_lineups.values()),
+            'total_points': round(float(sum(points[p.id] for lineup in weekly_lineups.values() for p in lineup)), 2),
+            'weeks': {str(week): lineup_records(lineup, points) for week, lineup in sorted(weekly_lineups.items())},
+        }
+        if args.save_plan:
+            with open(args.save_plan, 'a') as f:
+                print(json.dumps(result), file=f)
+            print(f"\nPlan appended to {args.save_plan}")
+        if args.store:
+            from results_store import ResultsStore
+            outcomes = {'projected_points': total_all_weeks}
+            if optimizer.last_solution is not None:
+                outcomes['objective'] = optimizer.last_solution.objective
+            if search is not None:
+                outcomes['local_search.objective'] = search.objective
+            if scenario_totals is not None:
+                summary = summarize_totals(scenario_totals)
+                outcomes.update({f'scenario.{name}': value for name, value in summary.items()})
+            if payout is not None:
+                _, summaries, best, _ = payout
+                outcomes.update({f'payout.{name}': value for name, value in summaries[best].items()})
+            if field_result is not None:
+                outcomes['field.expected_dollars'] = field_result.expected_dollars()
+                outcomes['field.median_finish'] = field_result.median_finish()
+            with ResultsStore(args.store) as store:
+                store.add_result(result, vars(args), outcomes, source='playoff_optimizer')
+                run_id, = store.flush()
+            print(f"\nPlan stored as run {run_id} in {args.store}")
+    
     print("\nStrategy Notes:")
     print("- Each player is used only once across all weeks")
     print("- TE scoring includes 1.5x PPR premium")
     print("- Elite players from top seeds (DEN #1, SEA #1, NE #2) conserved for later rounds")
     print("- Player values weighted by team advancement probability")
-    print("- Lineup requirements: 1 QB, 2-3 RB, 2-3 WR, 1-2 TE, 0-1 K, 0-1 DEF (9 total)")
+    print(f"- Lineup requirements: {optimizer.roster_rules().describe()}")
+    
+    if args.profile:
+        instruments.print_summary()
+    if args.trace:
+        instruments.write_trace(args.trace)
+        print(f"\nTrace written to {args.trace}")
 
 
 if __name__ == "__main__":
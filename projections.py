@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Weekly Point Distributions and Payout-Aware Plan Scoring
+
+The optimizer treats every player as one deterministic season number. The
+CSVs also have games played (GP) and points per game (FPTS/G), which give a
+weekly points distribution per player:
+
+- mean: league-scored season points / GP (FPTS/G under the league scoring,
+  e.g. with the TE premium)
+- spread: a per-position coefficient of variation (weekly fantasy points swing
+  by about half their mean and more), widened for short samples by the
+  uncertainty of a mean estimated from GP games:
+      var = (cv * mean)^2 * (1 + 1 / GP)
+- shape: lognormal with that mean and variance, so draws are non-negative and
+  right-skewed like real box scores
+
+Plans are scored by sampling. Every (player, week) has its own seeded stream
+of draws, so every candidate plan (and every opponent entry) sees the same
+outcome for the same player in the same week, and comparisons between plans are
+not noise. The streams are counter-based (a PCG64 advanced to the first sample,
+float32 Box-Muller normals), so any block of samples can be drawn on its own and
+streaming through samples in chunks gives exactly the same draws. Columns for
+a plan's players are cached as float32, which makes scoring a plan against 100k
+samples a sum of a few dozen cached columns. With sampled brackets
+(BracketResult) a player scores zero in a week their team is eliminated or on a
+bye.
+
+The payout objective ranks plans by the probability of finishing in the paid
+places instead of by mean points. The scores that held each paid place are
+either fixed lines (e.g. last season's 1st/2nd/3rd totals) or per-sample lines
+from a simulated field; a plan's place in a sample is one more than the number
+of paid lines above its total. The objective re-ranks a given list of candidate
+plans rather than searching all plans: the CLI passes the solver's plan and
+the top --candidates (default 50) plans by planning value from rank_plans, so
+a plan outside that list is never scored, however it would pay.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from bracket_simulator import BracketResult
+from team_outcomes import FACTORS, TeamOutcomeModel
+
+
+# Weekly standard deviation / mean by lineup position
+POSITION_CV = {'QB': 0.45, 'RB': 0.60, 'WR': 0.65, 'TE': 0.70, 'K': 0.45, 'DEF': 0.80}
+DEFAULT_CV = 0.70
+MIN_WEEKLY_MEAN = 0.1  # Floor for players with zero or negative season points
+
+
+class WeeklyProjection:
+    """Lognormal weekly points distribution of every player"""
+
+    def __init__(self, season_points: np.ndarray, games: np.ndarray, cv: np.ndarray):
+        games = np.maximum(np.asarray(games, dtype=float), 1.0)
+        self.games = games
+        self.mean = np.maximum(np.asarray(season_points, dtype=float) / games, MIN_WEEKLY_MEAN)
+        self.std = np.asarray(cv, dtype=float) * self.mean * np.sqrt(1.0 + 1.0 / games)
+        sigma2 = np.log1p((self.std / self.mean) ** 2)
+        self.mu = np.log(self.mean) - sigma2 / 2  # Parameters of the underlying normal
+        self.sigma = np.sqrt(sigma2)
+
+    @classmethod
+    def from_store(cls, store, season_points: np.ndarray, lineup_positions: np.ndarray,
+                   position_names: Sequence[str]) -> 'WeeklyProjection':
+        """
+        Projection from the store's GP column
+
+        lineup_positions: lineup position code per player (-1 if none), naming
+        the position in position_names whose coefficient of variation applies
+        """
+        games = store.stats[:, store.stat_fields.index('GP')] if 'GP' in store.stat_fields else np.ones(len(store))
+        by_code = np.array([POSITION_CV.get(pos, DEFAULT_CV) for pos in position_names] + [DEFAULT_CV])
+        return cls(season_points, games, by_code[lineup_positions])
+
+    def points(self, ids: np.ndarray, normals: np.ndarray) -> np.ndarray:
+        """Weekly points of players from standard normal draws (one column per id)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        return np.exp(self.mu[ids] + self.sigma[ids] * normals)
+
+
+class PlanSampler:
+    """Scores whole plans against shared samples of weekly points (and brackets)"""
+
+    MAX_CACHED_COLUMNS = 512  # (player, week) columns kept, n_samples float32 each
+    MAX_CACHED_STATES = 64  # (team, week, block) game states kept for the team model, float32
+
+    def __init__(self, projection: WeeklyProjection, n_samples: int, seed: int = None,
+                 scenarios: BracketResult = None, bracket_rows: np.ndarray = None,
+                 outcomes: TeamOutcomeModel = None):
+        """
+        scenarios: sampled brackets, one per points sample (n_samples must match)
+        bracket_rows: each player's team column in scenarios (-1 outside the bracket)
+        outcomes: same-team game-state model; players are independent without it
+        """
+        if scenarios is not None and scenarios.n_sims != n_samples:
+            raise ValueError(f"Need one bracket per sample ({scenarios.n_sims:,} brackets, {n_samples:,} samples)")
+        self.projection = projection
+        self.n_samples = n_samples
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % (1 << 63))
+        self.scenarios = scenarios
+        self.bracket_rows = bracket_rows
+        self.outcomes = outcomes
+        # (teams, samples) copy so each team's eliminations are one contiguous row
+        self._elimination = np.ascontiguousarray(scenarios.elimination_week.T) if scenarios is not None else None
+        self._columns: 'OrderedDict[Tuple[int, int], np.ndarray]' = OrderedDict()
+        self._states: 'OrderedDict[Tuple[int, int, int, int], np.ndarray]' = OrderedDict()
+
+    def _draws(self, seed_sequence: np.random.SeedSequence, start: int, stop: int, count: int) -> np.ndarray:
+        """(stop - start, count) float32 standard normals for samples [start, stop) of one stream"""
+        pairs = (count + 1) // 2  # Box-Muller turns two uniforms into a cosine and a sine normal
+        bit_generator = np.random.PCG64(seed_sequence)
+        bit_generator.advance(pairs * start)  # Two float32 uniforms per 64-bit output
+        uniforms = np.random.Generator(bit_generator).random(2 * pairs * (stop - start), dtype=np.float32)
+        uniforms = uniforms.reshape(-1, 2, pairs)
+        radius = np.sqrt(np.float32(-2.0) * np.log1p(-uniforms[:, 0]))
+        angle = np.float32(2.0 * np.pi) * uniforms[:, 1]
+        if count == 1:
+            return radius * np.cos(angle)
+        return np.hstack([radius * np.cos(angle), radius * np.sin(angle)])[:, :count]
+
+    def normals(self, player_id: int, week: int, start: int, stop: int) -> np.ndarray:
+        """A player's own standard normal draws for samples [start, stop) of a week"""
+        return self._draws(np.random.SeedSequence([self.seed, player_id, week]), start, stop, 1)[:, 0]
+
+    def team_states(self, team: int, week: int, start: int, stop: int) -> np.ndarray:
+        """(stop - start, factors) game states of a team in a week (cached per block of samples)"""
+        key = (team, week, start, stop)
+        states = self._states.get(key)
+        if states is None:
+            # spawn_key keeps team streams apart from player streams
+            normals = self._draws(np.random.SeedSequence([self.seed, team, week], spawn_key=(1,)),
+                                  start, stop, len(FACTORS))
+            states = self.outcomes.states(team, normals).astype(np.float32)
+            self._states[key] = states
+            if len(self._states) > self.MAX_CACHED_STATES:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(key)
+        return states
+
+    def player_normals(self, player_id: int, week: int, start: int, stop: int) -> np.ndarray:
+        """The standard normals behind a player's weekly points, conditioned on the team model if any"""
+        normals = self.normals(player_id, week, start, stop)
+        if self.outcomes is None or not self.outcomes.share[player_id]:
+            return normals
+        states = self.team_states(int(self.outcomes.team[player_id]), week, start, stop)
+        return self.outcomes.condition(player_id, states, normals)
+
+    def points(self, pairs: Sequence[Tuple[int, int]], start: int, stop: int) -> np.ndarray:
+        """(stop - start, len(pairs)) float32 points for (player id, week) pairs"""
+        normals = np.empty((stop - start, len(pairs)), dtype=np.float32)
+        for j, (player_id, week) in enumerate(pairs):
+            normals[:, j] = self.player_normals(player_id, week, start, stop)
+        return self.projection.points([player_id for player_id, _ in pairs], normals).astype(np.float32)
+
+    def plays(self, pairs: Sequence[Tuple[int, int]], start: int, stop: int) -> np.ndarray:
+        """(stop - start, len(pairs)) whether each pair's team plays its week (None without brackets)"""
+        if self.scenarios is None:
+            return None
+        plays = np.zeros((stop - start, len(pairs)), dtype=bool)
+        for j, (player_id, week) in enumerate(pairs):
+            row = self.bracket_rows[player_id]
+            if row >= 0 and not (week == 1 and self.scenarios.byes[row]):
+                plays[:, j] = self._elimination[row, start:stop] >= week
+        return plays
+
+    def column(self, player_id: int, week: int) -> np.ndarray:
+        """The player's points in a week in every sample (drawn once, then cached)"""
+        key = (player_id, week)
+        column = self._columns.get(key)
+        if column is None:
+            column = self.points([key], 0, self.n_samples)[:, 0]
+            self._columns[key] = column
+            if len(self._columns) > self.MAX_CACHED_COLUMNS:
+                self._columns.popitem(last=False)
+        else:
+            self._columns.move_to_end(key)
+        return column
+
+    def totals(self, weekly_ids: Dict[int, Sequence[int]]) -> np.ndarray:
+        """A plan's total points in every sample (float32); weekly_ids: week -> player ids"""
+        totals = np.zeros(self.n_samples, dtype=np.float32)
+        for week, ids in weekly_ids.items():
+            for player_id in map(int, ids):
+                if self.scenarios is None:
+                    totals += self.column(player_id, week)
+                    continue
+                row = self.bracket_rows[player_id]
+                if row < 0 or (week == 1 and self.scenarios.byes[row]):
+                    continue  # Not playing this week in any sampled bracket
+                totals += self.column(player_id, week) * (self._elimination[row] >= week)
+        return totals
+
+
+def paid_finish(totals: np.ndarray, paid_lines: np.ndarray) -> np.ndarray:
+    """
+    Place of a plan in each sample against the scores that held the paid places
+
+    paid_lines: (places,) fixed scores or (samples, places) per-sample scores
+    Returns 1..places for a paid finish and places + 1 otherwise; ties go to the plan.
+    """
+    above = np.asarray(paid_lines, dtype=float) > totals[:, None]
+    return 1 + above.sum(axis=1)
+
+
+def finish_distribution(totals: np.ndarray, paid_lines: np.ndarray) -> np.ndarray:
+    """Probability of each paid place, then of finishing out of the money"""
+    places = np.asarray(paid_lines).shape[-1]
+    return np.bincount(paid_finish(totals, paid_lines) - 1, minlength=places + 1) / len(totals)
+
+
+def payout_probability(totals: np.ndarray, paid_lines: np.ndarray) -> float:
+    """Probability of finishing in a paid place"""
+    return float(finish_distribution(totals, paid_lines)[:-1].sum())
+
+
+def best_plan_for_payout(sampler: PlanSampler, plans: List[Dict[int, Sequence[int]]],
+                         paid_lines: np.ndarray, payouts: Sequence[float] = None) -> Tuple[int, List[Dict[str, float]]]:
+    """
+    Candidate plan with the best chance of a paid finish (mean points break ties)
+
+    Only the given plans are scored; nothing outside the list is searched.
+
+    With payouts (dollars for 1st, 2nd, ...) the plan with the most expected
+    dollars wins instead. Returns (index of the best plan, per-plan summary with
+    mean, payout probability and expected dollars).
+    """
+    summaries = []
+    for plan in plans:
+        totals = sampler.totals(plan)
+        distribution = finish_distribution(totals, paid_lines)
+        summary = {'mean': float(totals.mean()), 'payout': float(distribution[:-1].sum())}
+        if payouts is not None:
+            places = min(len(payouts), len(distribution) - 1)
+            summary['dollars'] = float(distribution[:places] @ np.asarray(payouts[:places], dtype=float))
+        summaries.append(summary)
+    objective = 'dollars' if payouts is not None else 'payout'
+    best = max(range(len(plans)), key=lambda i: (summaries[i][objective], summaries[i]['mean'], -i))
+    return best, summaries
+
+
+def print_payout(distribution: np.ndarray, summaries: List[Dict[str, float]], best: int,
+                 paid_lines: Sequence[float]):
+    """Print the chosen plan's finish distribution against the solver's plan (candidate 0)"""
+    if np.ndim(paid_lines) == 1:
+        print(f"\nPayout objective (paid lines {' / '.join(f'{line:.0f}' for line in paid_lines)}):")
+    else:
+        print(f"\nPayout objective (paid lines from the simulated field, "
+              f"mean {' / '.join(f'{line:.0f}' for line in np.mean(paid_lines, axis=0))}):")
+    print("-" * 70)
+    chosen = 'the solver\'s plan' if best == 0 else f"ranked plan #{best}"
+    print(f"  Chosen: {chosen} of {len(summaries)} candidates")
+    places = ' / '.join(f"{p:.3f}" for p in distribution[:-1])
+    print(f"  Finish 1st / 2nd / ...: {places}   out of the money: {distribution[-1]:.3f}")
+    print(f"  Chance of a paid finish: {summaries[best]['payout']:.3f} "
+          f"(solver's plan {summaries[0]['payout']:.3f})")
+    if 'dollars' in summaries[best]:
+        print(f"  Expected dollars: ${summaries[best]['dollars']:.2f} "
+              f"(solver's plan ${summaries[0]['dollars']:.2f})")
+    print(f"  Expected points: {summaries[best]['mean']:.1f} (solver's plan {summaries[0]['mean']:.1f})")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Indexed Results Store
+
+Keeps plans, weekly lineups, run parameters and simulation outcomes in a local
+SQLite database (the standard library's sqlite3, no server), so questions
+about many runs are indexed queries instead of re-runs:
+
+- runs: one row per plan or evaluated configuration, with its label, source,
+  solver, validity, total points and parameters (JSON)
+- lineups: one row per (run, week, player) with team, position and points
+- outcomes: named numbers per run (planning value, expected dollars, sweep
+  quantiles, ...)
+
+Lineups are indexed on run id, (player, week), (team, week) and week, so "how
+often is player X used in week 3" reads one index range. Writes are buffered
+and flushed BATCH_ROWS rows at a time with executemany in one transaction, on
+a write-ahead-log journal, so storing a run costs a few list appends and the
+store keeps up with the simulations feeding it. SQLite assigns run ids as each
+batch is written, so several processes can write to the same database.
+
+playoff_optimizer.py --store, batch_optimizer.py --store and
+parameter_sweep.py --store write here; JSONL results files can be imported.
+
+    python3 results_store.py results.db --import runs.jsonl
+    python3 results_store.py results.db --player "SEA_Jaxon Smith-Njigba" --week 3
+    python3 results_store.py results.db --top 10 --week 4
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from typing import Dict, List, Tuple
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    label TEXT,
+    source TEXT,
+    solver TEXT,
+    valid INTEGER,
+    total_points REAL,
+    params TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS lineups (
+    run_id INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    name TEXT,
+    team TEXT NOT NULL,
+    position TEXT,
+    points REAL
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    run_id INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS lineups_run ON lineups (run_id);
+CREATE INDEX IF NOT EXISTS lineups_player_week ON lineups (player, week);
+CREATE INDEX IF NOT EXISTS lineups_team_week ON lineups (team, week);
+CREATE INDEX IF NOT EXISTS lineups_week ON lineups (week);
+CREATE INDEX IF NOT EXISTS outcomes_run ON outcomes (run_id, metric);
+'''
+
+
+class ResultsStore:
+    """Batched writer and indexed queries over a results database"""
+
+    BATCH_ROWS = 50000  # Buffered lineup and outcome rows that trigger a flush
+    CACHE_KIB = 256 * 1024  # Page cache; keeps the lineup indexes' hot pages in memory during appends
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(f'PRAGMA cache_size=-{self.CACHE_KIB}')
+        self.connection.executescript(SCHEMA)
+        self._runs: List[Tuple] = []  # Buffered rows refer to runs by their index in _runs
+        self._lineups: List[Tuple] = []
+        self._outcomes: List[Tuple] = []
+
+    def add_result(self, result: Dict, params: Dict = None, outcomes: Dict[str, float] = None,
+                   source: str = None):
+        """
+        Buffer one run in the batch-results format
+
+        result: 'id', 'solver', 'valid', 'total_points', 'error' and 'weeks'
+        (week -> rows with key, name, team, position and points), all optional.
+        The run gets its id when it is written: use the ids flush() returns.
+        """
+        run = len(self._runs)  # Index in the buffer, not a run id
+        valid = result.get('valid')
+        self._runs.append((result.get('id'), source, result.get('solver'),
+                           None if valid is None else int(valid), result.get('total_points'),
+                           json.dumps(params, sort_keys=True, default=str) if params is not None else None,
+                           result.get('error')))
+        for week, rows in (result.get('weeks') or {}).items():
+            self._lineups.extend((run, int(week), row['key'], row.get('name'), row['team'],
+                                  row.get('position'), row.get('points')) for row in rows)
+        if outcomes:
+            self._outcomes.extend((run, metric, float(value)) for metric, value in outcomes.items())
+        if len(self._lineups) + len(self._outcomes) >= self.BATCH_ROWS:
+            self.flush()
+
+    def flush(self) -> List[int]:
+        """Write buffered rows in one transaction; returns the run ids SQLite assigned, in order added"""
+        if not self._runs:
+            return []
+        with self.connection:
+            insert = ('INSERT INTO runs (label, source, solver, valid, total_points, params, error) '
+                      'VALUES (?, ?, ?, ?, ?, ?, ?)')
+            run_ids = [self.connection.execute(insert, row).lastrowid for row in self._runs]
+            self.connection.executemany('INSERT INTO lineups VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                        ((run_ids[run], *row) for run, *row in self._lineups))
+            self.connection.executemany('INSERT INTO outcomes VALUES (?, ?, ?)',
+                                        ((run_ids[run], *row) for run, *row in self._outcomes))
+        self._runs, self._lineups, self._outcomes = [], [], []
+        return run_ids
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def import_jsonl(self, path: str) -> int:
+        """Store every line of a JSONL results file (batch_optimizer output or --save-plan); returns runs added"""
+        added = 0
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    self.add_result(json.loads(line), source=path)
+                    added += 1
+        return added
+
+    def run_count(self) -> int:
+        """Stored runs that have a plan"""
+        self.flush()
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM runs WHERE error IS NULL AND run_id IN (SELECT run_id FROM lineups)').fetchone()[0]
+
+    def player_usage(self, player: str, week: int = None) -> int:
+        """Runs whose plan uses the player ("TEAM_Name" key), in one week or any week"""
+        self.flush()
+        if week is None:
+            query, args = 'SELECT COUNT(DISTINCT run_id) FROM lineups WHERE player = ?', (player,)
+        else:
+            query, args = 'SELECT COUNT(*) FROM lineups WHERE player = ? AND week = ?', (player, week)
+        return self.connection.execute(query, args).fetchone()[0]
+
+    def top_players(self, week: int = None, limit: int = 20) -> List[Tuple[str, int]]:
+        """Most used players as (key, runs), in one week or any week"""
+        self.flush()
+        if week is None:
+            query, args = ('SELECT player, COUNT(DISTINCT run_id) AS n FROM lineups GROUP BY player '
+                           'ORDER BY n DESC, player LIMIT ?', (limit,))
+        else:
+            query, args = ('SELECT player, COUNT(*) AS n FROM lineups WHERE week = ? GROUP BY player '
+                           'ORDER BY n DESC, player LIMIT ?', (week, limit))
+        return self.connection.execute(query, args).fetchall()
+
+    def team_usage(self, week: int) -> List[Tuple[str, int]]:
+        """Players started from each team in a week, over all runs, most first"""
+        self.flush()
+        return self.connection.execute('SELECT team, COUNT(*) AS n FROM lineups WHERE week = ? GROUP BY team '
+                                       'ORDER BY n DESC, team', (week,)).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store and query optimizer results in SQLite")
+    parser.add_argument('database', help="SQLite results database (created if missing)")
+    parser.add_argument('--import', dest='imports', action='append', default=[], metavar='JSONL',
+                        help="add the runs of a JSONL results file")
+    parser.add_argument('--player', default=None, metavar='TEAM_Name', help="count runs that use this player")
+    parser.add_argument('--week', type=int, default=None, help="restrict queries to one week")
+    parser.add_argument('--top', type=int, default=0, metavar='N', help="list the N most used players")
+    parser.add_argument('--teams', action='store_true', help="players started per team (needs --week)")
+    args = parser.parse_args(argv)
+    if args.teams and args.week is None:
+        parser.error("--teams needs --week")
+
+    with ResultsStore(args.database) as store:
+        for path in args.imports:
+            print(f"Imported {store.import_jsonl(path):,} runs from {path}", file=sys.stderr)
+        runs = store.run_count()
+        where = f"week {args.week}" if args.week is not None else "any week"
+        if args.player:
+            used = store.player_usage(args.player, args.week)
+            share = used / runs if runs else 0.0
+            print(f"{args.player}: used in {where} by {used:,} of {runs:,} runs ({share:.1%})")
+        if args.top:
+            print(f"\nMost used players in {where} ({runs:,} runs):")
+            for player, used in store.top_players(args.week, args.top):
+                print(f"  {player:<36} {used:>8,} {used / runs if runs else 0.0:>7.1%}")
+        if args.teams:
+            print(f"\nPlayers started per team in week {args.week}:")
+            for team, count in store.team_usage(args.week):
+                print(f"  {team:<6} {count:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Roster Rule Engine
+
+Lineup rules are declared once as data: per-position (min, max) slots, flex
+slots that any of several positions can fill, the lineup size, and which player
+positions count as which lineup position. They compile into count-vector
+bounds:
+
+- every lineup position is one axis of a count vector, capped at the most
+  players the rules ever allow there
+- every flex slot and the lineup size become group bounds: the players of a
+  set of positions must number between a minimum and a maximum
+
+Compilation enumerates every count vector under the caps once and tabulates
+which ones are valid lineups and which can still be completed into one. A
+partial lineup is then a single integer (its mixed-radix count vector), so
+"can this lineup take another RB?" is one table lookup. The validator, the
+greedy path, gap filling and the exact solvers all read the same tables.
+
+Flex slots must be nested or disjoint (e.g. FLEX inside SUPERFLEX); for such
+rules the group bounds are exact.
+"""
+
+import functools
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+# Positions the data lists for individual defensive players, counted as DEF
+DEFENSIVE_POSITIONS = ['S', 'CB', 'LB', 'DE', 'DT', 'OLB', 'ILB', 'FS', 'NT', 'DL']
+
+# Other leagues' formats: lineup size, per-position (min, max) and flex slots
+# as (eligible positions, count)
+ROSTER_FORMATS = {
+    'playoff': {
+        'size': 9,
+        'slots': {'QB': (1, 1), 'RB': (2, 3), 'WR': (2, 3), 'TE': (1, 2), 'K': (0, 1), 'DEF': (0, 1)},
+        'flex': [],
+    },
+    'standard': {
+        'size': 9,
+        'slots': {'QB': (1, 1), 'RB': (2, 2), 'WR': (2, 2), 'TE': (1, 1), 'K': (1, 1), 'DEF': (1, 1)},
+        'flex': [(('RB', 'WR', 'TE'), 1)],
+    },
+    'superflex': {
+        'size': 10,
+        'slots': {'QB': (1, 1), 'RB': (2, 2), 'WR': (2, 2), 'TE': (1, 1), 'K': (1, 1), 'DEF': (1, 1)},
+        'flex': [(('RB', 'WR', 'TE'), 1), (('QB', 'RB', 'WR', 'TE'), 1)],
+    },
+}
+MAX_STATES = 2_000_000  # Largest count-vector table compiled
+
+
+class RosterRules:
+    """Compiled lineup rules with O(1) incremental checks"""
+
+    EMPTY = 0  # State of an empty lineup
+
+    def __init__(self, slots: Dict[str, Tuple[int, int]], size: int,
+                 flex: Sequence[Tuple[Sequence[str], int]] = (),
+                 aliases: Dict[str, Sequence[str]] = None):
+        self.slots = {pos: (int(low), int(high)) for pos, (low, high) in slots.items()}
+        self.size = int(size)
+        self.flex = [(tuple(eligible), int(count)) for eligible, count in flex]
+        self.positions: List[str] = list(self.slots)
+        self._codes = {pos: code for code, pos in enumerate(self.positions)}
+        for alias_of, names in (aliases or {}).items():
+            if alias_of in self._codes:
+                self._codes.update({name: self._codes[alias_of] for name in names})
+
+        for pos, (low, high) in self.slots.items():
+            if not 0 <= low <= high:
+                raise ValueError(f"Invalid limits ({low}, {high}) for position {pos}")
+        flex_sets = []
+        for eligible, count in self.flex:
+            unknown = [pos for pos in eligible if pos not in self.slots]
+            if unknown or count < 0:
+                raise ValueError(f"Invalid flex slot {'/'.join(eligible)} x{count}")
+            flex_sets.append(frozenset(eligible))
+        for a in flex_sets:
+            for b in flex_sets:
+                if a & b and not (a <= b or b <= a):
+                    raise ValueError("Flex slots must be nested or disjoint")
+
+        n = len(self.positions)
+        self.minimums = np.array([self._bounds({pos}, flex_sets)[0] for pos in self.positions], dtype=np.int64)
+        self.caps = np.array([min(self._bounds({pos}, flex_sets)[1], self.size) for pos in self.positions],
+                             dtype=np.int64)
+        # Group bounds beyond the per-position caps: each flex slot's positions, then the whole lineup
+        self.groups: List[Tuple[Tuple[int, ...], int, int]] = []
+        for members in dict.fromkeys(flex_sets):
+            low, high = self._bounds(members, flex_sets)
+            self.groups.append((tuple(sorted(self._codes[pos] for pos in members)), low, high))
+        self.groups.append((tuple(range(n)), self.size, self.size))
+        self._compile()
+
+    def _bounds(self, members, flex_sets) -> Tuple[int, int]:
+        """(min, max) players from a set of positions: their slots, plus flex slots they must or may fill"""
+        low = sum(self.slots[pos][0] for pos in members)
+        high = sum(self.slots[pos][1] for pos in members)
+        for eligible, (_, count) in zip(flex_sets, self.flex):
+            if eligible <= members:
+                low += count
+            if eligible & members:
+                high += count
+        return low, high
+
+    def _compile(self):
+        """Tabulate valid, completable and addable states over every capped count vector"""
+        radix = self.caps + 1
+        n_states = int(np.prod(radix))
+        if n_states > MAX_STATES:
+            raise ValueError(f"Roster rules need {n_states:,} count vectors (limit {MAX_STATES:,})")
+        self.strides = np.append(np.cumprod(radix[::-1])[::-1][1:], 1).astype(np.int64)
+        counts = np.indices(tuple(radix)).reshape(len(radix), -1)  # (positions, states)
+
+        valid = np.all(counts >= self.minimums[:, None], axis=0)
+        for members, low, high in self.groups:
+            total = counts[list(members)].sum(axis=0)
+            valid &= (total >= low) & (total <= high)
+        if not valid.any():
+            raise ValueError("Roster rules allow no lineup")
+
+        # A state is completable if some valid state has at least its counts
+        completable = valid.reshape(tuple(radix))
+        for axis in range(len(radix)):
+            flipped = np.flip(completable, axis)
+            completable = np.flip(np.logical_or.accumulate(flipped, axis=axis), axis)
+        completable = completable.ravel()
+
+        addable = np.zeros((n_states, len(radix)), dtype=bool)
+        for code, stride in enumerate(self.strides):
+            room = np.flatnonzero(counts[code] < self.caps[code])
+            addable[room, code] = completable[room + stride]
+
+        self.valid_counts = counts[:, valid].T.copy()  # (valid lineups, positions)
+        self._valid = valid.tolist()
+        self._completable = completable.tolist()
+        self._addable = addable.tolist()
+        self._strides = self.strides.tolist()
+
+    def code(self, position: str) -> int:
+        """Lineup position code of a player position (-1 if it cannot be played)"""
+        return self._codes.get(position, -1)
+
+    def position_codes(self, positions: Sequence[str]) -> np.ndarray:
+        """Lineup position code of each player position"""
+        return np.array([self.code(pos) for pos in positions], dtype=np.int64)
+
+    def encode(self, counts: Sequence[int]) -> int:
+        """State of a count vector (-1 if it exceeds a cap)"""
+        if any(count > cap for count, cap in zip(counts, self.caps)):
+            return -1
+        return int(np.dot(counts, self.strides))
+
+    def state_of(self, codes: Sequence[int]) -> int:
+        """State of a lineup from its players' position codes (-1 past a cap or for unplayable positions)"""
+        codes = np.asarray(codes, dtype=np.int64)
+        if np.any(codes < 0):
+            return -1
+        return self.encode(np.bincount(codes, minlength=len(self.positions)))
+
+    def can_add(self, state: int, code: int) -> bool:
+        """Whether a player of this position fits and the lineup can still be completed"""
+        return state >= 0 and code >= 0 and self._addable[state][code]
+
+    def add(self, state: int, code: int) -> int:
+        """State after adding a player of this position (check can_add first)"""
+        return state + self._strides[code]
+
+    def remove(self, state: int, code: int) -> int:
+        """State after dropping a player of this position from the lineup"""
+        return state - self._strides[code]
+
+    def is_valid_state(self, state: int) -> bool:
+        return state >= 0 and self._valid[state]
+
+    def is_completable(self, state: int) -> bool:
+        return state >= 0 and self._completable[state]
+
+    def is_valid(self, codes: Sequence[int]) -> bool:
+        """Whether players with these position codes form a valid lineup"""
+        return self.is_valid_state(self.state_of(codes))
+
+    def shortfall(self, counts: Sequence[int]) -> np.ndarray:
+        """Players each position still needs to reach its minimum"""
+        return np.maximum(self.minimums - np.asarray(counts, dtype=np.int64), 0)
+
+    def describe(self) -> str:
+        """Human-readable requirements, e.g. "1 QB, 2-3 RB, ... (9 total)" """
+        parts = [f"{low} {pos}" if low == high else f"{low}-{high} {pos}"
+                 for pos, (low, high) in self.slots.items()]
+        parts += [f"{count} FLEX ({'/'.join(eligible)})" for eligible, count in self.flex if count]
+        return f"{', '.join(parts)} ({self.size} total)"
+
+    def __repr__(self):
+        return f"RosterRules({self.describe()})"
+
+
+@functools.lru_cache(maxsize=64)
+def compile_rules(size: int, slots: Tuple[Tuple[str, Tuple[int, int]], ...],
+                  flex: Tuple[Tuple[Tuple[str, ...], int], ...] = (),
+                  aliases: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()) -> RosterRules:
+    """RosterRules from a hashable declaration, compiled once per process"""
+    return RosterRules(dict(slots), size, flex, dict(aliases))
+
+
+def roster_format(name: str, aliases: Dict[str, Sequence[str]] = None) -> RosterRules:
+    """Compiled rules of a named format from ROSTER_FORMATS"""
+    if name not in ROSTER_FORMATS:
+        raise ValueError(f"Unknown roster format {name!r}; expected one of {', '.join(ROSTER_FORMATS)}")
+    spec = ROSTER_FORMATS[name]
+    return RosterRules(spec['slots'], spec['size'], spec['flex'], aliases)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Scenario-Based Stochastic Playoff Optimization
+
+Optimizes one four-week plan against many sampled bracket outcomes instead of a
+single assumed bracket. A fixed plan's total in a scenario is the sum of its
+players' expected weekly points (the WeeklyProjection means of projections.py)
+over the weeks their teams actually play, so the expected total across
+scenarios is linear in the plan: each (player, week) pair is worth the
+player's weekly points times the fraction of scenarios in which the team plays
+that week. The exact solver maximizes that sample average directly, so the chosen
+plan is optimal for the sampled scenarios.
+
+Scoring every scenario (the distribution of totals) is spread over a process pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from bracket_simulator import BracketResult
+from lineup_solver import solve_plan
+
+
+# Plan columns shared with pool workers by the initializer
+_worker_plan = {}
+
+
+def _init_worker(team_index: np.ndarray, weeks: np.ndarray, points: np.ndarray, byes: np.ndarray):
+    """Store the plan being scored in each pool worker"""
+    _worker_plan['team_index'] = team_index
+    _worker_plan['weeks'] = weeks
+    _worker_plan['points'] = points
+    _worker_plan['byes'] = byes
+
+
+def _score_chunk(elimination_week: np.ndarray) -> np.ndarray:
+    """Total points of the worker's plan in each scenario of a chunk"""
+    return score_plan(elimination_week, _worker_plan['team_index'], _worker_plan['weeks'],
+                      _worker_plan['points'], _worker_plan['byes'])
+
+
+def score_plan(elimination_week: np.ndarray, team_index: np.ndarray, weeks: np.ndarray,
+               points: np.ndarray, byes: np.ndarray) -> np.ndarray:
+    """
+    Score a plan in every scenario
+
+    elimination_week: (scenarios, teams) week each team lost in
+    team_index, weeks, points: one entry per planned player; team_index is -1
+        for players whose team is not in the bracket
+    byes: team -> has a Week 1 bye
+
+    Returns the plan's total in each scenario.
+    """
+    in_bracket = team_index >= 0
+    safe_index = np.where(in_bracket, team_index, 0)
+    plays = elimination_week[:, safe_index] >= weeks
+    plays &= in_bracket & ~((weeks == 1) & byes[safe_index])
+    return plays @ points
+
+
+def summarize_totals(totals: np.ndarray) -> Dict[str, float]:
+    """Mean, spread and percentiles of a distribution of plan totals"""
+    percentiles = np.percentile(totals, [5, 25, 50, 75, 95])
+    return {
+        'mean': float(totals.mean()),
+        'std': float(totals.std()),
+        'min': float(totals.min()),
+        'p5': float(percentiles[0]),
+        'p25': float(percentiles[1]),
+        'median': float(percentiles[2]),
+        'p75': float(percentiles[3]),
+        'p95': float(percentiles[4]),
+        'max': float(totals.max()),
+    }
+
+
+class ScenarioOptimizer:
+    """Picks the plan with the highest expected total over sampled brackets"""
+
+    CHUNK_SIZE = 2000  # Scenarios per pool task
+
+    def __init__(self, optimizer, scenarios: BracketResult, workers: int = None):
+        self.optimizer = optimizer
+        self.scenarios = scenarios
+        self.workers = workers or os.cpu_count() or 1
+
+    def _team_index(self, team: str) -> int:
+        return self.scenarios.team_index.get(team, -1)
+
+    def _weekly_points(self) -> np.ndarray:
+        """Expected points of every player in one game"""
+        return self.optimizer.weekly_projection().mean
+
+    def optimize(self) -> Dict[int, List]:
+        """
+        Exact plan maximizing expected points across all scenarios
+
+        Skips players already marked used and marks the chosen ones as used.
+
+        Returns: dict mapping week number to lineup
+        """
+        optimizer = self.optimizer
+        store = optimizer.players
+        weeks = optimizer.PLAYOFF_WEEKS
+        player_ids = np.flatnonzero(~store.used)
+
+        # Fraction of scenarios in which each player's team plays each week
+        playing = np.vstack([self.scenarios.playing, np.zeros((1, weeks))])
+        bracket_rows = np.array([self._team_index(team) for team in store.teams], dtype=np.int64)
+        rows = bracket_rows[store.team[player_ids]]
+        values = self._weekly_points()[player_ids, None] * playing[rows]
+
+        positions = optimizer.lineup_positions()[player_ids]
+        solution = solve_plan(values, positions, optimizer.roster_rules())
+        optimizer.last_solution = solution
+        weekly_lineups = {
+            week + 1: store.players(player_ids[lineup_rows])
+            for week, lineup_rows in enumerate(solution.weeks)
+        }
+        for lineup in weekly_lineups.values():
+            if not optimizer.is_valid_lineup(lineup):
+                raise ValueError("Scenario plan violates lineup requirements")
+            store.mark_used(p.id for p in lineup)
+        return weekly_lineups
+
+    def evaluate(self, weekly_lineups: Dict[int, List]) -> np.ndarray:
+        """Total weekly points of a plan in every scenario, scored on the process pool"""
+        planned = [(week, player) for week, lineup in weekly_lineups.items() for player in lineup]
+        team_index = np.array([self._team_index(p.team) for _, p in planned])
+        weeks = np.array([week for week, _ in planned])
+        points = self._weekly_points()[[p.id for _, p in planned]]
+        byes = self.scenarios.byes
+
+        elimination = self.scenarios.elimination_week
+        chunks = [elimination[i:i + self.CHUNK_SIZE]
+                  for i in range(0, len(elimination), self.CHUNK_SIZE)]
+        if self.workers == 1 or len(chunks) == 1:
+            return score_plan(elimination, team_index, weeks, points, byes)
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(team_index, weeks, points, byes)) as pool:
+            return np.concatenate(list(pool.map(_score_chunk, chunks)))
+
+
+def print_distribution(summary: Dict[str, float], n_scenarios: int):
+    """Print the distribution of plan totals (expected weekly points over the weeks played)"""
+    print(f"\nPlan totals across {n_scenarios:,} sampled brackets (weekly points, weeks played):")
+    print("-" * 70)
+    print(f"  Expected total: {summary['mean']:.1f} (std {summary['std']:.1f})")
+    print(f"  Min / 5th / 25th / median / 75th / 95th / max: "
+          f"{summary['min']:.0f} / {summary['p5']:.0f} / {summary['p25']:.0f} / "
+          f"{summary['median']:.0f} / {summary['p75']:.0f} / {summary['p95']:.0f} / {summary['max']:.0f}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Vectorized Fantasy Scoring
+
+Scoring rules are points per category-qualified stat (see data_loader.qualify_fields)
+with optional per-position overrides. The CSV FPTS column was computed with
+standard full-PPR scoring, and it also contains components the stat columns
+don't carry (fumbles lost, two-point conversions, kicking, tackles). Rescoring
+therefore keeps those untracked components and swaps only the tracked ones:
+
+    points = FPTS - reference_rules(stats) + new_rules(stats)
+
+which makes the TE premium exact (TE points = FPTS + 0.5 * REC under the league
+rules) instead of a flat 15% approximation. The whole pool is rescored with one
+gathered matrix product, so trying a new rule set needs no reload.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+
+class ScoringRules:
+    """Points per qualified stat, with per-position overrides"""
+
+    def __init__(self, points: Dict[str, float], position_overrides: Dict[str, Dict[str, float]] = None):
+        self.points = dict(points)
+        self.position_overrides = {pos: dict(rules) for pos, rules in (position_overrides or {}).items()}
+
+    def weights(self, position: str) -> Dict[str, float]:
+        """Points per stat for one position"""
+        weights = dict(self.points)
+        weights.update(self.position_overrides.get(position, {}))
+        return weights
+
+    def matrix(self, stat_fields: List[str], position_names: List[str]) -> np.ndarray:
+        """(positions, stat_fields) matrix of points per stat"""
+        matrix = np.zeros((len(position_names), len(stat_fields)))
+        columns = {field: j for j, field in enumerate(stat_fields)}
+        for i, position in enumerate(position_names):
+            for stat, value in self.weights(position).items():
+                if stat in columns:
+                    matrix[i, columns[stat]] = value
+        return matrix
+
+    def override(self, position: str, **points: float) -> 'ScoringRules':
+        """Copy of these rules with extra per-position values"""
+        overrides = {pos: dict(rules) for pos, rules in self.position_overrides.items()}
+        overrides.setdefault(position, {}).update(points)
+        return ScoringRules(self.points, overrides)
+
+    def __repr__(self):
+        return f"ScoringRules({self.points}, {self.position_overrides})"
+
+
+# Scoring the CSV FPTS column was computed with
+STANDARD_PPR = ScoringRules({
+    'PASS_YDS': 0.04,
+    'PASS_TD': 4.0,
+    'PASS_INT': -2.0,
+    'RUSH_YDS': 0.1,
+    'RUSH_TD': 6.0,
+    'REC': 1.0,
+    'REC_YDS': 0.1,
+    'REC_TD': 6.0,
+})
+
+# League scoring: standard PPR with 1.5 points per reception for tight ends
+LEAGUE_SCORING = STANDARD_PPR.override('TE', REC=1.5)
+
+
+class PlayerScorer:
+    """Rescores every player in a store under any rule set"""
+
+    def __init__(self, store, reference: ScoringRules = STANDARD_PPR):
+        self.store = store
+        self.stats = np.nan_to_num(store.stats)
+        self.positions = store.position.astype(np.int64)
+        # Points the stat columns don't explain under the reference rules
+        self.untracked = store.base_fpts - self._tracked(reference)
+
+    def _tracked(self, rules: ScoringRules) -> np.ndarray:
+        matrix = rules.matrix(self.store.stat_fields, self.store.position_names)
+        return np.einsum('ij,ij->i', self.stats, matrix[self.positions])
+
+    def score(self, rules: ScoringRules) -> np.ndarray:
+        """Season points of every player under the given rules"""
+        return self.untracked + self._tracked(rules)
+
+    def stat_points(self, rules: ScoringRules) -> np.ndarray:
+        """(players, stat_fields) points each stat column earns every player under the given rules"""
+        matrix = rules.matrix(self.store.stat_fields, self.store.position_names)
+        return self.stats * matrix[self.positions]
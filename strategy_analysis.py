@@ -1,106 +1,551 @@
 #!/usr/bin/env python3
 """
-Strategy Analysis - Visualizes how the elite conservation strategy works
+Strategy Analysis
+
+Reports how plans actually use the player pool, computed from real optimizer
+output instead of hand-copied numbers. The input can be one run saved with
+playoff_optimizer.py --save-plan, the entries of a batch_optimizer.py run, or
+thousands of plans simulated here over sampled brackets. For each week it
+reports:
+
+- lineup points: expected weekly points of the lineup's players, mean and
+  approximate quantiles across runs
+- top-seed usage: players per lineup from each #1 and #2 seed
+- position mix: players per lineup by position, and the most common mixes
+- team exposure: players per lineup from each team, and the share of runs
+  that use the team at all
+
+Input is read incrementally. It is either JSONL plan results (one run per
+line, the batch_optimizer results format) or a plan-record file:
+fixed-size binary records (run, week, team, position, points) after a 4 KiB
+JSON header, written by PlanRecordWriter. A run's records are contiguous and
+grouped by week. Records are read in chunks that end on a run boundary, and
+every aggregate is a running count, sum or fixed-width histogram. Memory
+therefore does not grow with the number of runs, and a million runs (36M
+records) take seconds. Quantiles come from the histograms and are accurate to
+half a bin width.
+
+    python3 playoff_optimizer.py --solver exact --save-plan runs.jsonl
+    python3 strategy_analysis.py runs.jsonl
+    python3 strategy_analysis.py --simulate 2000 --output runs.plans --checkpoint runs.ckpt
+    python3 strategy_analysis.py runs.plans --json
 """
 
-print("="*70)
-print("ELITE PLAYER CONSERVATION STRATEGY ANALYSIS")
-print("="*70)
-
-# Define top seed usage by week
-top_seeds_usage = {
-    'Week 1 (Wild Card)': {
-        'DEN': 0,
-        'NE': 0, 
-        'SEA': 1,
-        'total': 1,
-        'note': 'Minimal use - top seeds have bye week'
-    },
-    'Week 2 (Divisional)': {
-        'DEN': 1,
-        'NE': 2,
-        'SEA': 1,
-        'total': 4,
-        'note': 'Moderate use - starting to tap into elite players'
-    },
-    'Week 3 (Conference)': {
-        'DEN': 2,
-        'NE': 2,
-        'SEA': 2,
-        'total': 6,
-        'note': 'Heavy use - conference championships'
-    },
-    'Week 4 (Super Bowl)': {
-        'DEN': 4,
-        'NE': 0,
-        'SEA': 4,
-        'total': 8,
-        'note': 'Maximum use - Super Bowl matchup (DEN vs SEA)'
-    }
-}
-
-print("\nTop Seed Player Usage Progression:")
-print("-" * 70)
-print(f"{'Week':<20} {'DEN #1':<8} {'NE #2':<8} {'SEA #1':<8} {'Total':<8} {'Strategy'}")
-print("-" * 70)
-
-for week, data in top_seeds_usage.items():
-    print(f"{week:<20} {data['DEN']:<8} {data['NE']:<8} {data['SEA']:<8} {data['total']:<8} {data['note']}")
-
-print("\n" + "="*70)
-print("WEEKLY POINT DISTRIBUTION")
-print("="*70)
-
-weekly_points = {
-    'Week 1': 2628.9,
-    'Week 2': 2051.9,
-    'Week 3': 1752.6,
-    'Week 4': 1399.6,
-}
-
-print("\nProjected Points by Week:")
-print("-" * 70)
-max_points = max(weekly_points.values())
-for week, points in weekly_points.items():
-    bar_length = int((points / max_points) * 40)
-    bar = "█" * bar_length
-    print(f"{week:<10} {points:>7.1f} pts {bar}")
-
-print(f"\n{'TOTAL':<10} {sum(weekly_points.values()):>7.1f} pts")
-
-print("\n" + "="*70)
-print("STRATEGY EFFECTIVENESS")
-print("="*70)
-
-print("""
-✓ Conservation Strategy Working as Designed:
-  - Week 1 focuses on teams playing in Wild Card (SF, JAX, BUF, LAR, PHI, HOU)
-  - Week 2 begins using elite players from DEN, NE, CHI
-  - Week 3 heavily uses Conference Championship teams
-  - Week 4 maximizes DEN and SEA players in Super Bowl matchup
-
-✓ Point Optimization:
-  - Higher points in early weeks when player pool is largest
-  - Points decrease as player pool shrinks (expected behavior)
-  - Total of 7,833 projected points maximizes across all weeks
-
-✓ PPR Scoring with TE Premium:
-  - Tight ends receive 1.5x PPR vs 1.0x for other positions
-  - Multiple TEs used when advantageous (Weeks 1-2)
-  - TE premium properly weighted in player selection
-
-✓ Team Advancement Probability Weighting:
-  - Player values adjusted based on team's expected playoff longevity
-  - Top seeds valued higher due to higher advancement probability
-  - Lower seeds used early to capture value before elimination
-
-✓ All Constraints Met:
-  - Each player used exactly once across all weeks
-  - All lineups meet 9-player requirement
-  - Position requirements satisfied (1 QB, 2-3 RB, 2-3 WR, 1-2 TE, 0-1 K, 0-1 DEF)
-  - Team eliminations properly simulated
-""")
-
-print("="*70)
-print("CONCLUSION: Strategy successfully implemented and optimized!")
-print("="*70)
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from roster_rules import DEFENSIVE_POSITIONS
+
+
+RECORD_DTYPE = np.dtype([('run', '<u4'), ('week', 'u1'), ('team', 'u1'), ('position', 'u1'), ('points', '<f4')])
+HEADER_SIZE = 4096  # Bytes reserved for the JSON header of a plan-record file
+MAX_CODES = 256  # Weeks, teams and positions are one byte each
+CATEGORIES = ('QB', 'RB', 'WR', 'TE', 'K', 'DEF', 'OTHER')  # Position mix columns
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class PlanRecordWriter:
+    """Appends plans to a plan-record file; the header is written on close"""
+
+    FLUSH_ROWS = 1 << 16
+
+    def __init__(self, path: str, resume: Dict = None):
+        """resume: a state() of an unfinished file to continue from; later records are dropped"""
+        self.path = path
+        self.teams: Dict[str, int] = {}
+        self.positions: Dict[str, int] = {}
+        self.runs = 0
+        self.rows = 0  # Records written, including buffered ones
+        self._rows: List[Tuple[int, int, int, int, float]] = []
+        if resume is None:
+            self._file = open(path, 'wb')
+            self._file.write(b'\0' * HEADER_SIZE)
+        else:
+            self.teams = {name: code for code, name in enumerate(resume['teams'])}
+            self.positions = {name: code for code, name in enumerate(resume['positions'])}
+            self.runs, self.rows = resume['runs'], resume['rows']
+            self._file = open(path, 'r+b')
+            self._file.truncate(HEADER_SIZE + self.rows * RECORD_DTYPE.itemsize)
+            self._file.seek(0, io.SEEK_END)
+
+    def _code(self, vocabulary: Dict[str, int], name: str) -> int:
+        if name not in vocabulary:
+            if len(vocabulary) == MAX_CODES:
+                raise ValueError(f"More than {MAX_CODES} distinct teams or positions")
+            vocabulary[name] = len(vocabulary)
+        return vocabulary[name]
+
+    def write(self, weeks: Dict[str, List[Dict]]):
+        """Append one run: week -> player rows with team, position and points (the results format)"""
+        for week in sorted(weeks, key=int):
+            for row in weeks[week]:
+                self._rows.append((self.runs, int(week), self._code(self.teams, row['team']),
+                                   self._code(self.positions, row['position']), row['points']))
+                self.rows += 1
+        self.runs += 1
+        if len(self._rows) >= self.FLUSH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        np.array(self._rows, dtype=RECORD_DTYPE).tofile(self._file)
+        self._rows = []
+
+    def state(self) -> Dict:
+        """What a resumed writer needs (JSON-serializable)"""
+        return {'runs': self.runs, 'rows': self.rows, 'teams': list(self.teams), 'positions': list(self.positions)}
+
+    def sync(self):
+        """Write buffered records to disk so the file holds everything state() describes"""
+        self._flush()
+        self._file.flush()
+
+    def close(self):
+        self._flush()
+        header = json.dumps({'format': 'plan-records', 'version': 1, 'runs': self.runs,
+                             'teams': list(self.teams), 'positions': list(self.positions)}).encode()
+        if len(header) > HEADER_SIZE:
+            raise ValueError("Plan-record header does not fit")
+        self._file.seek(0)
+        self._file.write(header.ljust(HEADER_SIZE, b'\0'))
+        self._file.close()
+
+    def __enter__(self) -> 'PlanRecordWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_header(path: str) -> Dict:
+    """JSON header of a plan-record file (raises ValueError for other files)"""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE).rstrip(b'\0')
+    try:
+        header = json.loads(header)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"{path} is not a plan-record file")
+    if not isinstance(header, dict) or header.get('format') != 'plan-records':
+        raise ValueError(f"{path} is not a plan-record file")
+    return header
+
+
+def _whole_runs(chunks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+    """Re-cut record chunks so none splits a run"""
+    carry = np.empty(0, dtype=RECORD_DTYPE)
+    for chunk in chunks:
+        if len(carry):
+            chunk = np.concatenate([carry, chunk])
+        cut = int(np.searchsorted(chunk['run'], chunk['run'][-1]))  # Runs ascend, so the last run's start
+        carry = chunk[cut:]
+        if cut:
+            yield chunk[:cut]
+    if len(carry):
+        yield carry
+
+
+def record_chunks(path: str, chunk_rows: int = 1 << 20) -> Tuple[Dict, Iterator[np.ndarray]]:
+    """(header, chunks of records) from a plan-record file"""
+    header = read_header(path)
+
+    def chunks():
+        with open(path, 'rb') as f:
+            f.seek(HEADER_SIZE)
+            while True:
+                chunk = np.fromfile(f, dtype=RECORD_DTYPE, count=chunk_rows)
+                if not len(chunk):
+                    return
+                yield chunk
+
+    return header, _whole_runs(chunks())
+
+
+def jsonl_chunks(path: str, chunk_runs: int = 10_000) -> Tuple[Dict, Iterator[np.ndarray]]:
+    """
+    (vocabulary, chunks of records) from JSONL plan results
+
+    The vocabulary's team and position lists grow as chunks are read. Runs with
+    an "error" or without weeks are skipped.
+    """
+    vocabulary = {'teams': [], 'positions': []}
+    codes = {'teams': {}, 'positions': {}}
+
+    def code(kind: str, name: str) -> int:
+        table = codes[kind]
+        if name not in table:
+            if len(table) == MAX_CODES:
+                raise ValueError(f"More than {MAX_CODES} distinct {kind}")
+            table[name] = len(table)
+            vocabulary[kind].append(name)
+        return table[name]
+
+    def chunks():
+        rows, runs = [], 0
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                if 'error' in result or not result.get('weeks'):
+                    continue
+                for week in sorted(result['weeks'], key=int):
+                    for row in result['weeks'][week]:
+                        rows.append((runs, int(week), code('teams', row['team']),
+                                     code('positions', row['position']), row['points']))
+                runs += 1
+                if runs % chunk_runs == 0:
+                    yield np.array(rows, dtype=RECORD_DTYPE)
+                    rows = []
+        if rows:
+            yield np.array(rows, dtype=RECORD_DTYPE)
+
+    return vocabulary, chunks()
+
+
+class StreamingHistogram:
+    """Fixed-width histogram over a growing range: exact count, mean, min and max; quantiles to half a bin"""
+
+    def __init__(self, bin_width: float = 0.5):
+        self.bin_width = bin_width
+        self.origin = 0  # Bin index of counts[0]
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        bins = np.floor(values / self.bin_width).astype(np.int64)
+        low, high = int(bins.min()), int(bins.max())
+        if not len(self.counts):
+            self.origin = low
+        if low < self.origin:
+            self.counts = np.concatenate([np.zeros(self.origin - low, dtype=np.int64), self.counts])
+            self.origin = low
+        size = max(len(self.counts), high - self.origin + 1)
+        self.counts = np.pad(self.counts, (0, size - len(self.counts)))
+        self.counts += np.bincount(bins - self.origin, minlength=size)
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile: the middle of the bin holding it, clamped to the exact range"""
+        if not self.count:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q * self.count))
+        middle = (self.origin + min(index, len(self.counts) - 1) + 0.5) * self.bin_width
+        return float(min(max(middle, self.min), self.max))
+
+    def summary(self) -> Dict[str, float]:
+        summary = {'mean': round(self.mean, 2), 'min': self.min, 'max': self.max}
+        summary.update({f"p{round(q * 100)}": round(self.quantile(q), 2) for q in QUANTILES})
+        return summary
+
+
+class StrategyReport:
+    """Streaming aggregates of many plans"""
+
+    def __init__(self, bin_width: float = 0.5):
+        self.bin_width = bin_width
+        self.runs = 0
+        self.week_points: Dict[int, StreamingHistogram] = {}
+        self.total_points = StreamingHistogram(bin_width)
+        self.lineups = np.zeros(MAX_CODES, dtype=np.int64)  # Lineups seen per week
+        self.team_players = np.zeros((MAX_CODES, MAX_CODES), dtype=np.int64)  # (week, team)
+        self.position_players = np.zeros((MAX_CODES, MAX_CODES), dtype=np.int64)  # (week, position)
+        self.team_runs = np.zeros(MAX_CODES, dtype=np.int64)  # Runs using each team
+        self.mixes: Dict[int, Counter] = {}  # week -> encoded position mix -> lineups
+        self.teams: List[str] = []
+        self.positions: List[str] = []
+
+    def _categories(self) -> np.ndarray:
+        """Position mix column of every position code"""
+        column = {pos: c for c, pos in enumerate(CATEGORIES)}
+        other = column['OTHER']
+        by_code = [column.get('DEF' if pos in DEFENSIVE_POSITIONS else pos, other) for pos in self.positions]
+        return np.array(by_code + [other] * (MAX_CODES - len(by_code)), dtype=np.int64)
+
+    def add(self, records: np.ndarray, teams: List[str], positions: List[str]):
+        """Aggregate a chunk of whole runs; teams and positions name the chunk's codes"""
+        if not len(records):
+            return
+        self.teams, self.positions = list(teams), list(positions)
+        run = records['run'].astype(np.int64)
+        week = records['week'].astype(np.int64)
+        team = records['team'].astype(np.int64)
+        points = records['points'].astype(float)
+
+        # Lineups: runs of equal (run, week); records arrive grouped
+        new_run = np.r_[True, run[1:] != run[:-1]]
+        new_lineup = new_run | np.r_[True, week[1:] != week[:-1]]
+        starts = np.flatnonzero(new_lineup)
+        lineup_points = np.add.reduceat(points, starts)
+        lineup_week = week[starts]
+        run_starts = np.flatnonzero(new_run)
+        n_runs = len(run_starts)
+        self.runs += n_runs
+        self.total_points.add(np.add.reduceat(lineup_points, np.flatnonzero(new_run[starts])))
+        for w in np.unique(lineup_week).tolist():
+            self.week_points.setdefault(w, StreamingHistogram(self.bin_width)).add(lineup_points[lineup_week == w])
+        self.lineups += np.bincount(lineup_week, minlength=MAX_CODES)
+
+        self.team_players += np.bincount(week * MAX_CODES + team, minlength=MAX_CODES ** 2).reshape(MAX_CODES, -1)
+        self.position_players += np.bincount(week * MAX_CODES + records['position'],
+                                             minlength=MAX_CODES ** 2).reshape(MAX_CODES, -1)
+        used = np.zeros((n_runs, MAX_CODES), dtype=bool)
+        used[np.repeat(np.arange(n_runs), np.diff(np.r_[run_starts, len(run)])), team] = True
+        self.team_runs += used.sum(axis=0)
+
+        # Position mix per lineup, encoded as one integer (4 bits per category, under 16 players each)
+        digit = 16 ** self._categories()
+        encoded = np.add.reduceat(digit[records['position']], starts)
+        for w in np.unique(lineup_week).tolist():
+            mixes, n = np.unique(encoded[lineup_week == w], return_counts=True)
+            self.mixes.setdefault(w, Counter()).update(dict(zip(mixes.tolist(), n.tolist())))
+
+    @staticmethod
+    def describe_mix(encoded: int) -> str:
+        counts = [(encoded >> (4 * c)) & 15 for c in range(len(CATEGORIES))]
+        return ' '.join(f"{n}{pos}" for n, pos in zip(counts, CATEGORIES) if n)
+
+    def to_dict(self, seeds: Dict[str, Tuple[str, int]], top_mixes: int = 3) -> Dict:
+        """JSON-ready report; seeds: team -> (conference, seed) for the top-seed table"""
+        weeks = sorted(self.week_points)
+        report = {'runs': self.runs, 'total_points': self.total_points.summary(), 'weeks': {}}
+        team_order = [t for t in np.argsort(-self.team_players.sum(axis=0)) if self.team_players[:, t].sum()]
+        for w in weeks:
+            lineups = max(1, self.lineups[w])
+            mixes = self.mixes.get(w, Counter())
+            report['weeks'][str(w)] = {
+                'points': self.week_points[w].summary(),
+                'positions': {pos: round(float(self.position_players[w, c]) / lineups, 3)
+                              for c, pos in enumerate(self.positions) if self.position_players[w, c]},
+                'teams': {self.teams[t]: round(float(self.team_players[w, t]) / lineups, 3) for t in team_order
+                          if self.team_players[w, t]},
+                'mixes': [{'mix': self.describe_mix(mix), 'share': round(n / lineups, 4)}
+                          for mix, n in sorted(mixes.items(), key=lambda item: (-item[1], item[0]))[:top_mixes]],
+            }
+        report['top_seeds'] = {
+            team: {'conference': seeds[team][0], 'seed': seeds[team][1],
+                   'players': {str(w): round(float(self.team_players[w, self.teams.index(team)]) / max(1, self.lineups[w]), 3)
+                               if team in self.teams else 0.0 for w in weeks}}
+            for team in sorted((t for t in seeds if seeds[t][1] <= 2), key=lambda t: (seeds[t][1], seeds[t][0]))
+        }
+        report['team_exposure'] = {self.teams[t]: round(float(self.team_runs[t]) / max(1, self.runs), 4)
+                                   for t in team_order}
+        return report
+
+
+def print_report(report: Dict, source: str):
+    """Print the report as text tables"""
+    weeks = list(report['weeks'])
+    print("=" * 70)
+    print(f"STRATEGY ANALYSIS: {report['runs']:,} run(s) from {source}")
+    print("=" * 70)
+
+    print("\nLineup points by week (expected weekly points of the lineup's players):")
+    print("-" * 70)
+    print(f"{'Week':<8}{'Mean':>9}{'P5':>9}{'Median':>9}{'P95':>9}")
+    peak = max((report['weeks'][w]['points']['mean'] for w in weeks), default=0) or 1
+    for w in weeks:
+        points = report['weeks'][w]['points']
+        bar = "█" * int(points['mean'] / peak * 24)
+        print(f"{'Week ' + w:<8}{points['mean']:>9.1f}{points['p5']:>9.1f}{points['p50']:>9.1f}{points['p95']:>9.1f}  {bar}")
+    total = report['total_points']
+    print(f"{'Total':<8}{total['mean']:>9.1f}{total['p5']:>9.1f}{total['p50']:>9.1f}{total['p95']:>9.1f}")
+
+    print("\nTop-seed usage (players per lineup):")
+    print("-" * 70)
+    seeds = report['top_seeds']
+    labels = [f"{team} #{info['seed']}" for team, info in seeds.items()]
+    print(f"{'Week':<8}" + "".join(f"{label:>9}" for label in labels) + f"{'Total':>9}")
+    for w in weeks:
+        cells = [info['players'][w] for info in seeds.values()]
+        print(f"{'Week ' + w:<8}" + "".join(f"{cell:>9.2f}" for cell in cells) + f"{sum(cells):>9.2f}")
+
+    print("\nPosition mix (players per lineup) and most common lineups:")
+    print("-" * 70)
+    for w in weeks:
+        week = report['weeks'][w]
+        totals = Counter()
+        for pos, n in week['positions'].items():
+            totals['DEF' if pos in DEFENSIVE_POSITIONS else pos] += n
+        mix = ' '.join(f"{pos} {totals[pos]:.2f}" for pos in CATEGORIES if totals.get(pos))
+        print(f"Week {w}: {mix}")
+        for common in week['mixes']:
+            print(f"    {common['share']:>6.1%}  {common['mix']}")
+
+    print("\nTeam exposure (players per lineup by week; share of runs using the team):")
+    print("-" * 70)
+    print(f"{'Team':<6}" + "".join(f"{'Week ' + w:>9}" for w in weeks) + f"{'Runs':>9}")
+    for team, share in report['team_exposure'].items():
+        cells = "".join(f"{report['weeks'][w]['teams'].get(team, 0.0):>9.2f}" for w in weeks)
+        print(f"{team:<6}{cells}{share:>9.1%}")
+    print("=" * 70)
+
+
+def analyze(path: str, bin_width: float = 0.5) -> StrategyReport:
+    """Stream a JSONL results file or plan-record file into a report"""
+    report = StrategyReport(bin_width)
+    try:
+        header, chunks = record_chunks(path)
+        vocabulary = header
+    except ValueError:
+        vocabulary, chunks = jsonl_chunks(path)
+    for chunk in chunks:
+        report.add(chunk, vocabulary['teams'], vocabulary['positions'])
+    return report
+
+
+RUNS_PER_CHUNK = 100  # Simulated runs per job chunk (and per checkpoint step)
+
+# Optimizer, weekly league points and solver shared with pool workers (forked, or set by the initializer)
+_worker_state = {}
+
+
+def _init_worker(optimizer, points: np.ndarray, solver: str, n_runs: int):
+    _worker_state['optimizer'] = optimizer
+    _worker_state['points'] = points
+    _worker_state['solver'] = solver
+    _worker_state['n_runs'] = n_runs
+
+
+def _simulate_chunk(chunk: int, seed_sequence) -> List[Dict[str, List[Dict]]]:
+    """Plans of one chunk of runs, each under a bracket drawn from the chunk's own stream"""
+    from batch_optimizer import lineup_records
+    from bracket_simulator import BracketSimulator
+
+    optimizer, points = _worker_state['optimizer'], _worker_state['points']
+    count = min(RUNS_PER_CHUNK, _worker_state['n_runs'] - chunk * RUNS_PER_CHUNK)
+    brackets = BracketSimulator(optimizer.PLAYOFF_SEEDS).simulate(count, seed=seed_sequence)
+    plans = []
+    for sim in range(count):
+        optimizer.players.reset_used()
+        with contextlib.redirect_stdout(io.StringIO()):
+            plan = optimizer.simulate_playoffs(_worker_state['solver'], eliminations=brackets.bracket_path(sim))
+        plans.append({str(week): lineup_records(lineup, points) for week, lineup in plan.items()})
+    return plans
+
+
+def simulate_runs(path: str, n_runs: int, solver: str = 'greedy', seed: int = 0,
+                  data_dir: str = '.', min_points: float = None, workers: int = None,
+                  checkpoint: str = None, checkpoint_every: float = 60.0) -> int:
+    """
+    Plan under n_runs sampled brackets and write the plans to a plan-record file
+
+    Each run assumes one simulated bracket's eliminations, the way a manager
+    planning with perfect foresight of that bracket would. Runs are planned in
+    chunks on a process pool (job_runner.run_job); with a checkpoint file, an
+    interrupted simulation resumes after its last checkpoint and writes the
+    same file as an uninterrupted one. Returns runs written.
+    """
+    from job_runner import load_checkpoint, run_job
+    from playoff_optimizer import PlayoffOptimizer
+
+    optimizer = PlayoffOptimizer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.load_players(data_dir, min_points=min_points)
+        optimizer.apply_te_premium()
+        optimizer.weight_player_value()
+    points = optimizer.weekly_projection().mean
+
+    n_chunks = -(-n_runs // RUNS_PER_CHUNK)
+    inputs = {'job': 'strategy_analysis.simulate', 'runs': n_runs, 'solver': solver,
+              'data_dir': os.path.abspath(data_dir), 'min_points': min_points, 'points': 'weekly'}
+    saved = load_checkpoint(checkpoint, seed, n_chunks, inputs)  # Before the writer truncates anything
+    with PlanRecordWriter(path, resume=saved['aggregate'] if saved else None) as writer:
+        def merge(state: Dict, plans: List[Dict[str, List[Dict]]]) -> Dict:
+            for plan in plans:
+                writer.write(plan)
+            return writer.state()
+
+        run_job(_simulate_chunk, n_chunks, seed, merge, writer.state(), inputs,
+                workers=workers, checkpoint=checkpoint, checkpoint_every=checkpoint_every,
+                initializer=_init_worker, initargs=(optimizer, points, solver, n_runs),
+                on_checkpoint=lambda state: writer.sync())
+        return writer.runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming analysis of optimizer plans")
+    parser.add_argument('results', nargs='?', help="JSONL plan results or plan-record file")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--bin-width', type=float, default=0.5,
+                        help="points histogram bin width (quantiles are within half a bin)")
+    parser.add_argument('--convert', default=None, metavar='FILE',
+                        help="also write the JSONL results as a plan-record file")
+    parser.add_argument('--simulate', type=int, default=0, metavar='N',
+                        help="plan under N sampled brackets, write them to --output and analyze them")
+    parser.add_argument('--output', default='runs.plans', help="plan-record file for --simulate")
+    parser.add_argument('--solver', choices=['greedy', 'exact', 'flow'], default='greedy',
+                        help="solver for --simulate")
+    parser.add_argument('--seed', type=int, default=None, help="bracket seed for --simulate")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes for --simulate")
+    parser.add_argument('--checkpoint', default=None, metavar='FILE',
+                        help="save --simulate progress to this file and resume from it when it exists")
+    parser.add_argument('--checkpoint-every', type=float, default=60.0, metavar='SECONDS',
+                        help="seconds between checkpoints")
+    parser.add_argument('--data-dir', default='.', help="directory containing the team CSV files")
+    args = parser.parse_args(argv)
+    if bool(args.results) == bool(args.simulate):
+        parser.error("give a results file or --simulate N")
+
+    from job_runner import resolve_seed
+    from playoff_optimizer import PlayoffOptimizer
+
+    path = args.results
+    if args.simulate:
+        start = time.perf_counter()
+        seed = resolve_seed(args.seed, args.checkpoint)
+        try:
+            runs = simulate_runs(args.output, args.simulate, args.solver, seed, args.data_dir,
+                                 workers=args.workers, checkpoint=args.checkpoint,
+                                 checkpoint_every=args.checkpoint_every)
+        except ValueError as error:
+            sys.exit(str(error))
+        except KeyboardInterrupt:
+            if args.checkpoint:
+                sys.exit(f"Interrupted; rerun with --checkpoint {args.checkpoint} to resume")
+            raise
+        print(f"Planned {runs:,} sampled brackets in {time.perf_counter() - start:.1f}s -> {args.output}",
+              file=sys.stderr)
+        path = args.output
+    elif args.convert:
+        with PlanRecordWriter(args.convert) as writer, open(args.results) as f:
+            for line in f:
+                result = json.loads(line) if line.strip() else {}
+                if result.get('weeks') and 'error' not in result:
+                    writer.write(result['weeks'])
+
+    start = time.perf_counter()
+    report = analyze(path, args.bin_width)
+    seeds = {team: (conf, seed) for conf, teams in PlayoffOptimizer.PLAYOFF_SEEDS.items()
+             for team, seed in teams.items()}
+    result = report.to_dict(seeds)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result, path)
+    print(f"Analyzed {report.runs:,} runs in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Correlated Same-Team Outcomes
+
+Players on one team do not score independently: a QB and his receivers boom
+or bust with the passing game, and every offensive player gains from a
+high-scoring game. TeamOutcomeModel draws a game state for each team and week,
+and then each player's weekly draw conditioned on it. A player's draw is the
+standard normal behind their lognormal weekly points (projections.py), so each
+player's own distribution is unchanged; only the joint behaviour within a team
+changes.
+
+- Game state: four standard normal factors per team and week. These are
+  passing volume, rushing volume, scoring and defensive plays. Passing and
+  rushing are anticorrelated (game script). Scoring is driven by both in
+  proportion to the team's passing and rushing share of its offensive fantasy
+  points in the CSVs, plus its own noise. Defense is independent of the
+  offense.
+- Loadings: an offensive player points along their own passing / rushing
+  split (passing and receiving points vs rushing points under the league
+  scoring), plus scoring. Kickers follow scoring and defenders follow defense.
+  The loading length is set so the game state explains TEAM_SHARE of the
+  player's variance, and independent noise explains the rest.
+
+The per-team covariance of the factors is Cholesky-factored once for all teams
+(one batched np.linalg.cholesky), and a team's game states for a chunk of
+samples are one matrix product. The players' implied covariance within a team is
+B Sigma B^T + diag(residual^2), and players on different teams are
+uncorrelated. The season CSVs hold one total per player and no weekly box
+scores, so the stat mix sets the structure and TEAM_SHARE sets its strength.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+
+FACTORS = ('pass', 'rush', 'scoring', 'defense')
+# Stat columns that feed each volume factor (by stat prefix)
+FACTOR_STATS = {'pass': ('PASS_', 'REC'), 'rush': ('RUSH_',)}
+# Share of a player's weekly variance explained by their team's game state, by lineup position
+TEAM_SHARE = {'QB': 0.55, 'RB': 0.35, 'WR': 0.40, 'TE': 0.35, 'K': 0.30, 'DEF': 0.25}
+PASS_RUSH_CORRELATION = -0.25  # Teams that throw a lot run less, and the other way round
+SCORING_EXPLAINED = 0.60  # Share of the scoring factor explained by passing and rushing volume
+
+
+class TeamOutcomeModel:
+    """Per-team game-state covariance and every player's loading on it"""
+
+    def __init__(self, team: np.ndarray, volume_points: np.ndarray, lineup_positions: np.ndarray,
+                 position_names: Sequence[str], n_teams: int):
+        """
+        team: team code per player
+        volume_points: (players, 2) season passing (incl. receiving) and rushing points
+        lineup_positions: lineup position code per player (-1 if none) naming a position in position_names
+        """
+        self.team = np.asarray(team, dtype=np.int64)
+        volume = np.maximum(np.asarray(volume_points, dtype=float), 0.0)
+        self.covariance = self._team_covariance(self.team, volume, n_teams)
+        self.cholesky = np.linalg.cholesky(self.covariance)  # (teams, factors, factors), batched
+
+        # Direction of each player in game-state space
+        names = list(position_names) + [None]
+        position = np.array([names[code] for code in lineup_positions], dtype=object)
+        offense = volume.sum(axis=1)
+        direction = np.zeros((len(self.team), len(FACTORS)))
+        scored = offense > 0
+        direction[scored, :2] = volume[scored] / offense[scored, None]
+        direction[np.isin(position, ['QB', 'RB', 'WR', 'TE']), 2] = 1.0
+        direction[position == 'K', 2] = 1.0
+        direction[position == 'DEF', 3] = 1.0
+
+        share = np.array([TEAM_SHARE.get(pos, 0.0) for pos in position])
+        spread = np.einsum('pi,pij,pj->p', direction, self.covariance[self.team], direction)
+        scale = np.sqrt(np.divide(share, spread, out=np.zeros_like(share), where=spread > 0))
+        self.loadings = direction * scale[:, None]  # (players, factors)
+        self.share = np.where(spread > 0, share, 0.0)
+        self.residual = np.sqrt(1.0 - self.share)
+
+    @classmethod
+    def from_store(cls, store, stat_points: np.ndarray, lineup_positions: np.ndarray,
+                   position_names: Sequence[str]) -> 'TeamOutcomeModel':
+        """Model from the store's stat columns; stat_points: (players, stat_fields) league-scored points"""
+        volume = np.zeros((len(store), 2))
+        for f, factor in enumerate(('pass', 'rush')):
+            columns = [j for j, field in enumerate(store.stat_fields) if field.startswith(FACTOR_STATS[factor])]
+            volume[:, f] = stat_points[:, columns].sum(axis=1)
+        return cls(store.team, volume, lineup_positions, position_names, len(store.teams))
+
+    @staticmethod
+    def _team_covariance(team: np.ndarray, volume: np.ndarray, n_teams: int) -> np.ndarray:
+        """(teams, factors, factors) covariance of each team's game state"""
+        totals = np.zeros((n_teams, 2))
+        np.add.at(totals, team, volume)
+        weights = totals / np.maximum(totals.sum(axis=1, keepdims=True), 1e-9)
+        weights[totals.sum(axis=1) == 0] = 0.5
+
+        r = PASS_RUSH_CORRELATION
+        pass_weight, rush_weight = weights[:, 0], weights[:, 1]
+        # scoring = k * (pass_weight * pass + rush_weight * rush) + noise, with unit variance
+        k = np.sqrt(SCORING_EXPLAINED / (pass_weight ** 2 + rush_weight ** 2 + 2 * r * pass_weight * rush_weight))
+        covariance = np.tile(np.eye(len(FACTORS)), (n_teams, 1, 1))
+        covariance[:, 0, 1] = covariance[:, 1, 0] = r
+        covariance[:, 0, 2] = covariance[:, 2, 0] = k * (pass_weight + r * rush_weight)
+        covariance[:, 1, 2] = covariance[:, 2, 1] = k * (r * pass_weight + rush_weight)
+        return covariance
+
+    def states(self, team: int, normals: np.ndarray) -> np.ndarray:
+        """(samples, factors) game states of a team from (samples, factors) independent standard normals"""
+        return normals @ self.cholesky[team].T
+
+    def condition(self, player_id: int, states: np.ndarray, normals: np.ndarray) -> np.ndarray:
+        """A player's standard normal draws given their team's game states and their own noise"""
+        return states @ self.loadings[player_id] + self.residual[player_id] * normals
+
+    def correlation(self, ids: Sequence[int]) -> np.ndarray:
+        """Implied correlation of the players' weekly normal draws in the same week"""
+        ids = np.asarray(ids, dtype=np.int64)
+        loadings = self.loadings[ids]
+        shared = np.einsum('ik,ikl,jl->ij', loadings, self.covariance[self.team[ids]], loadings)
+        shared *= self.team[ids][:, None] == self.team[ids][None, :]
+        np.fill_diagonal(shared, 1.0)
+        return shared
@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+
+from playoff_optimizer import PlayoffOptimizer
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def brute_top(optimizer, pos, k, bonus):
+    """Best k unused players of a position by week score, ties to the lower id"""
+    points = optimizer.valuation().points
+    ids = np.flatnonzero((optimizer.lineup_positions() == pos) & ~optimizer.players.used)
+    scores = points[ids] * bonus[optimizer.players.team[ids]]
+    return [(float(scores[i]), int(ids[i])) for i in np.lexsort((ids, -scores))[:k]]
+
+
+def test_released_players_come_back_without_a_new_valuation():
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(REPO, use_cache=False)
+    optimizer.apply_te_premium()
+    optimizer.weight_player_value()
+    store = optimizer.players
+    valuation, index = optimizer.valuation(), optimizer.availability_index()
+    bonus = optimizer.week_bonus(1)
+    best = index.top(0, 3, bonus)
+    store.mark_used(player_id for _, player_id in best)
+    assert index.top(0, 3, bonus) == brute_top(optimizer, 0, 3, bonus)
+
+    store.release([best[0][1]])
+    assert index.top(0, 3, bonus) == brute_top(optimizer, 0, 3, bonus)
+    store.reset_used()
+    assert index.top(0, 3, bonus) == best
+    # Making players available again changes no values, so nothing is rebuilt
+    assert optimizer.valuation() is valuation and optimizer.availability_index() is index
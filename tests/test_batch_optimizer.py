@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from batch_optimizer import EntrySolver, EntrySpec
+from playoff_optimizer import PlayoffOptimizer
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def optimizer():
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(REPO, use_cache=False)
+    return optimizer
+
+
+def test_totals_are_weekly_points(optimizer):
+    spec = EntrySpec.from_dict({'id': 'te', 'solver': 'exact', 'scoring': {'positions': {'TE': {'REC': 2.0}}}})
+    result = EntrySolver(optimizer).solve(spec)
+    weekly = optimizer.weekly_projection(spec.scoring).mean
+    rows = [row for lineup in result['weeks'].values() for row in lineup]
+    for row in rows:
+        assert row['points'] == round(float(weekly[optimizer.players.find(row['key'])]), 2)
+    assert result['total_points'] == pytest.approx(sum(row['points'] for row in rows), abs=0.05)
+    assert result['total_points'] < 4 * 150  # Four weeks of points, not season totals
+
+
+def test_scoring_variants_leave_the_league_scoring_in_place(optimizer):
+    league_rules = optimizer.SCORING_RULES
+    league_points = optimizer.score_players().copy()
+    EntrySolver(optimizer).solve(EntrySpec.from_dict({'id': 'pass', 'scoring': {'points': {'PASS_TD': 6}}}))
+    assert optimizer.SCORING_RULES is league_rules
+    assert (optimizer.score_players() == league_points).all()
+
+
+def test_plans_breaking_the_rules_are_entry_errors(optimizer, monkeypatch):
+    solver = EntrySolver(optimizer)
+    plan = solver.solve(EntrySpec.from_dict({'id': 'ok'}))
+    short = {int(week): optimizer._lookup_players([row['key'] for row in rows][:-1 if week == '4' else None])
+             for week, rows in plan['weeks'].items()}
+    monkeypatch.setattr(optimizer, 'simulate_playoffs', lambda *args, **kwargs: short)
+    result = solver.solve(EntrySpec.from_dict({'id': 'short'}))
+    assert 'weeks' not in result
+    assert 'week(s) 4' in result['error']
+
+
+@pytest.mark.parametrize('solver', ['greedy', 'exact'])
+def test_locks_outside_the_playoffs_are_entry_errors(optimizer, solver):
+    with pytest.raises(ValueError, match='cannot be locked into week 5'):
+        EntrySpec.from_dict({'id': 'c', 'solver': solver, 'locks': {'5': ['JAX_Trevor Lawrence']}})
+    spec = EntrySpec('c', solver, locks={5: ['JAX_Trevor Lawrence']})
+    result = EntrySolver(optimizer).solve(spec)
+    assert 'weeks' not in result
+    assert result['error'] == 'JAX_Trevor Lawrence cannot be locked into week 5'
+
+
+def test_same_scoring_entries_reuse_the_valuation(optimizer):
+    solver = EntrySolver(optimizer)
+    solver.solve(EntrySpec.from_dict({'id': 'first'}))
+    version, valuation = optimizer.players.version, optimizer.valuation()
+    for entry_id in ('second', 'third'):
+        solver.solve(EntrySpec.from_dict({'id': entry_id}))
+    assert optimizer.players.version == version
+    assert optimizer.valuation() is valuation
+    solver.solve(EntrySpec.from_dict({'id': 'te', 'scoring': {'positions': {'TE': {'REC': 2.0}}}}))
+    assert optimizer.players.version > version
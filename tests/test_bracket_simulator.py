@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from bracket_simulator import BracketSimulator
+
+
+SEEDS = {
+    'AFC': {'A1': 1, 'A2': 2, 'A3': 3, 'A4': 4, 'A5': 5, 'A6': 6, 'A7': 7},
+    'NFC': {'N1': 1, 'N2': 2, 'N3': 3, 'N4': 4, 'N5': 5, 'N6': 6, 'N7': 7},
+}
+
+
+def test_every_bracket_is_a_legal_tournament():
+    simulator = BracketSimulator(SEEDS)
+    result = simulator.simulate(5000, seed=0)
+    elimination = result.elimination_week
+    # Losers per week: 6 Wild Card, 4 Divisional, 2 Conference, 1 Super Bowl, and one champion
+    for week, losers in {1: 6, 2: 4, 3: 2, 4: 1, 5: 1}.items():
+        assert np.all((elimination == week).sum(axis=1) == losers)
+    for conference in ('AFC', 'NFC'):
+        top = result.team_index[conference[0] + '1']
+        assert np.all(elimination[:, top] >= 2)  # The bye: the #1 seed cannot lose in Week 1
+        columns = [result.team_index[team] for team in SEEDS[conference]]
+        assert np.all((elimination[:, columns] == 1).sum(axis=1) == 3)
+        assert np.all((elimination[:, columns] >= 4).sum(axis=1) == 1)  # One conference champion
+    assert sum(result.champion_counts().values()) == result.n_sims
+    assert np.all(np.diff(result.survival, axis=1) <= 0)
+
+
+def test_lowest_remaining_seed_visits_the_top_seed():
+    # Strength falls steeply with seed except for #7, so every game is decided in advance
+    ratings = {team: 10000.0 * (7 - seed) for conf in SEEDS.values() for team, seed in conf.items()}
+    ratings.update({'A7': 1e5, 'N7': 1e5})
+    result = BracketSimulator(SEEDS, ratings).simulate(100, seed=1)
+    week = dict(zip(result.teams, result.elimination_week[0]))
+    # Wild Card: 7 beats 2, 3 and 4 win at home. Reseeding sends 7 to 1 (not 4 or 5), and 4 to 3.
+    for conf in 'AN':
+        assert [week[f'{conf}{seed}'] for seed in range(1, 7)] == [2, 1, 3, 2, 1, 1]
+    decided = [result.team_index[team] for team in result.teams if not team.endswith('7')]
+    assert np.all(result.elimination_week[:, decided] == result.elimination_week[0, decided])
+    assert set(result.elimination_week[:, result.team_index['A7']]) <= {4, 5}  # Only the Super Bowl is open
+
+
+def test_round_games_schedule_the_simulated_games():
+    simulator = BracketSimulator(SEEDS)
+    result = simulator.simulate(500, seed=3)
+    for row in result.elimination_week:
+        alive = set(range(len(simulator.teams)))
+        for week in range(1, result.weeks + 1):
+            games = simulator.round_games(week, alive)
+            losers = set(np.flatnonzero(row == week).tolist())
+            # Each game has exactly one loser, and only teams in a game can lose
+            assert all(len({home, away} & losers) == 1 for home, away, _ in games)
+            assert losers <= {team for game in games for team in game[:2]}
+            alive -= losers
+    with pytest.raises(ValueError):
+        simulator.round_games(2, set(range(len(simulator.teams))))
+
+
+def test_same_seed_same_brackets():
+    simulator = BracketSimulator(SEEDS)
+    first = simulator.simulate(1000, seed=7).elimination_week
+    assert np.array_equal(first, simulator.simulate(1000, seed=7).elimination_week)
+    assert not np.array_equal(first, simulator.simulate(1000, seed=8).elimination_week)
+
+
+def test_rejects_incomplete_seeding():
+    with pytest.raises(ValueError):
+        BracketSimulator({'AFC': {'A1': 1}, 'NFC': SEEDS['NFC']})
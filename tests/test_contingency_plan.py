@@ -0,0 +1,37 @@
+import pytest
+
+from bracket_simulator import BracketSimulator
+from contingency_plan import PlanNode, PlanTree, check_eliminations, main
+from playoff_optimizer import PlayoffOptimizer
+
+
+SIMULATOR = BracketSimulator(PlayoffOptimizer.PLAYOFF_SEEDS)
+WILD_CARD = ['BUF', 'GB', 'HOU', 'LAC', 'LAR', 'SF']  # Every road team loses
+
+
+def test_legal_path_is_accepted():
+    check_eliminations(SIMULATOR, {1: WILD_CARD, 2: ['CAR', 'JAX', 'PHI', 'PIT']})
+    check_eliminations(SIMULATOR, {2: ['CAR', 'JAX', 'PHI', 'PIT']}, start_week=2, eliminated=WILD_CARD)
+
+
+@pytest.mark.parametrize('eliminations', [
+    PlayoffOptimizer.ASSUMED_ELIMINATIONS,  # Only one AFC Wild Card loser
+    {1: ['BUF', 'GB', 'HOU', 'LAC', 'LAR', 'CAR']},  # CAR and LAR played each other
+    {1: WILD_CARD, 2: ['DEN', 'SEA', 'JAX', 'CHI', 'PIT']},
+    {1: ['XXX']},
+])
+def test_illegal_paths_are_rejected(eliminations):
+    with pytest.raises(ValueError):
+        check_eliminations(SIMULATOR, eliminations)
+
+
+def test_lookup_of_an_illegal_path_is_a_usage_error(tmp_path, capsys):
+    root = PlanNode(1, [0], 1.0, True)
+    root.next = {PlanTree.branch_label(WILD_CARD): (1, 0.5)}
+    path = str(tmp_path / 'tree.json')
+    PlanTree(['SEA_A'], [root, PlanNode(2, [], 0.0, False)], 'greedy', 1).save(path)
+    with pytest.raises(SystemExit):
+        main(['--lookup', path, '--eliminated', '1=LAC,GB,SF,CAR'])
+    assert 'one team from each game' in capsys.readouterr().err
+    main(['--lookup', path, '--eliminated', '1=' + ','.join(WILD_CARD)])
+    assert 'branch probability 0.500' in capsys.readouterr().out
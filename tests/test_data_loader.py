@@ -0,0 +1,74 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from data_loader import TeamDataCache, parse_team_file
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILES = {'BUF': 'BuffaloBillsStats - Sheet1.csv', 'CHI': 'ChicagoBearsStats - Sheet1.csv'}
+
+
+@pytest.fixture
+def team_files(tmp_path):
+    paths = {}
+    for team, filename in FILES.items():
+        paths[team] = str(tmp_path / filename)
+        shutil.copy(os.path.join(REPO, filename), paths[team])
+    return paths
+
+
+def load(cache_dir, team_files):
+    cache = TeamDataCache(str(cache_dir))
+    return cache, cache.load(team_files)
+
+
+def touch(path):
+    """Move the file's mtime forward without changing its content"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_unchanged_and_touched_files_reuse_the_snapshot(tmp_path, team_files):
+    cache, first = load(tmp_path / 'cache', team_files)
+    assert cache.parsed == ['BUF', 'CHI'] and cache.reused == []
+    touch(team_files['BUF'])
+    cache, second = load(tmp_path / 'cache', team_files)
+    assert cache.parsed == [] and cache.reused == ['BUF', 'CHI']
+    for team in FILES:
+        assert second[team].names == first[team].names
+        assert np.array_equal(second[team].stats, first[team].stats)
+    # The touch was recorded, so the next load skips the hash
+    cache, _ = load(tmp_path / 'cache', team_files)
+    assert cache.reused == ['BUF', 'CHI']
+
+
+def test_changed_content_is_reparsed(tmp_path, team_files):
+    load(tmp_path / 'cache', team_files)
+    path = team_files['BUF']
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data.replace(b'Josh Allen,BUF,QB,17,3668', b'Josh Allen,BUF,QB,17,3669'))  # Same size
+    touch(path)
+    cache, tables = load(tmp_path / 'cache', team_files)
+    assert cache.parsed == ['BUF'] and cache.reused == ['CHI']
+    assert np.array_equal(tables['BUF'].stats, parse_team_file(path).stats)
+    assert 3669 in tables['BUF'].stats[tables['BUF'].names.index('Josh Allen')]
+
+
+@pytest.mark.parametrize('damage', ['delete', 'corrupt'])
+def test_missing_or_corrupt_snapshots_are_rebuilt(tmp_path, team_files, damage):
+    _, first = load(tmp_path / 'cache', team_files)
+    snapshot = tmp_path / 'cache' / 'CHI.npy'
+    if damage == 'delete':
+        snapshot.unlink()
+    else:
+        snapshot.write_bytes(b'not a numpy file')
+    cache, tables = load(tmp_path / 'cache', team_files)
+    assert cache.parsed == ['CHI'] and cache.reused == ['BUF']
+    assert np.array_equal(tables['CHI'].stats, first['CHI'].stats)
+    cache, _ = load(tmp_path / 'cache', team_files)
+    assert cache.reused == ['BUF', 'CHI']
@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pytest
+
+from field_simulator import FieldSimulator
+from playoff_optimizer import PlayoffOptimizer
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(REPO, use_cache=False)
+    optimizer.apply_te_premium()
+    optimizer.weight_player_value()
+    return FieldSimulator(optimizer, optimizer.plan_sampler(2000, seed=3), 12, seed=3)
+
+
+def test_field_only_results_count_the_field(simulator):
+    result = simulator.simulate()
+    assert result.n_entries == result.n_opponents == 12
+    assert result.paid_lines.shape == (2000, 3)
+    assert np.all(np.diff(result.paid_lines, axis=1) <= 0)
+    with pytest.raises(ValueError):
+        result.expected_dollars()
+
+
+def test_plan_finish_is_a_distribution_over_the_entries(simulator):
+    result = simulator.simulate(simulator.entries[0])  # A plan the field also holds
+    assert result.n_entries == 13
+    assert len(result.finish) == 13 and result.finish.sum() == pytest.approx(1.0)
+    assert 1 <= result.median_finish() <= 13
+    assert 0 <= result.expected_dollars() <= max(simulator.payouts)
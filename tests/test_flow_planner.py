@@ -0,0 +1,98 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from flow_planner import FlowNetwork, flow_relaxation, repair_plan, solve_plan_flow
+from roster_rules import RosterRules, roster_format
+
+
+def best_plan_value(values, positions, rules):
+    """Optimum by trying each player in each week or none"""
+    n_players, n_weeks = values.shape
+    best = -np.inf
+    for assignment in itertools.product(range(-1, n_weeks), repeat=n_players):
+        weeks = [[p for p in range(n_players) if assignment[p] == w] for w in range(n_weeks)]
+        if all(np.all(np.isfinite(values[rows, w])) and rules.is_valid(positions[rows])
+               for w, rows in enumerate(weeks)):
+            best = max(best, float(sum(values[rows, w].sum() for w, rows in enumerate(weeks))))
+    return best
+
+
+def test_min_cost_flow_matches_assignment_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        cost = rng.integers(-20, 0, (3, 4)).astype(float)
+        network = FlowNetwork(2 + 3 + 4)
+        for i in range(3):
+            network.add_edge(0, 1 + i, 1)
+            for j in range(4):
+                network.add_edge(1 + i, 4 + j, 1, cost[i, j])
+        for j in range(4):
+            network.add_edge(4 + j, 8, 1)
+        flow, total = network.min_cost_flow(0, 8, 3)
+        assert flow == 3
+        assert total == min(sum(cost[i, p[i]] for i in range(3)) for p in itertools.permutations(range(4), 3))
+
+
+def test_plan_is_valid_and_bounded_on_small_instances():
+    rules = RosterRules({'A': (1, 1), 'B': (1, 2), 'C': (0, 1)}, 3)
+    rng = np.random.default_rng(3)
+    checked = 0
+    for _ in range(40):
+        positions = rng.integers(0, 3, 8)
+        values = rng.integers(1, 20, (8, 2)).astype(float)
+        best = best_plan_value(values, positions, rules)
+        if not np.isfinite(best):
+            continue
+        solution = solve_plan_flow(values, positions, rules)
+        assert all(rules.is_valid(positions[rows]) for rows in solution.weeks)
+        assert len({p for rows in solution.weeks for p in rows}) == sum(map(len, solution.weeks))
+        assert solution.objective <= best + 1e-9 <= solution.upper_bound + 2e-9
+        checked += 1
+    assert checked > 20
+
+
+@pytest.mark.parametrize('rules', [
+    RosterRules({'A': (1, 1), 'B': (1, 2), 'C': (0, 1)}, 3),
+    RosterRules({'A': (1, 1), 'B': (1, 1), 'C': (0, 1)}, 3, [(('B', 'C'), 1)]),
+])
+def test_feasible_pools_always_get_a_plan(rules):
+    rng = np.random.default_rng(5)
+    checked = 0
+    for _ in range(150):
+        positions = rng.integers(0, 3, 7)
+        values = rng.integers(1, 20, (7, 2)).astype(float)
+        values[rng.random(values.shape) < 0.25] = -np.inf
+        best = best_plan_value(values, positions, rules)
+        if not np.isfinite(best):
+            continue
+        solution = solve_plan_flow(values, positions, rules)
+        assert all(rules.is_valid(positions[rows]) for rows in solution.weeks)
+        assert all(np.isfinite(values[rows, week]).all() for week, rows in enumerate(solution.weeks))
+        assert solution.objective <= best + 1e-9 <= solution.upper_bound + 2e-9
+        checked += 1
+    assert checked > 30
+
+
+def test_repair_leaves_later_weeks_their_players():
+    # The flow gives week 2 the only A player available in week 1
+    rules = RosterRules({'A': (1, 1), 'B': (1, 2), 'C': (0, 1)}, 3)
+    positions = np.array([1, 0, 0, 1, 2, 1, 1])
+    values = np.array([[6, -np.inf], [6, 7], [-np.inf, 2], [1, 11], [8, -np.inf], [15, 14], [18, 11]])
+    weeks, _ = flow_relaxation(values, positions, rules)
+    repaired = repair_plan(values, positions, rules, weeks)
+    assert all(rules.is_valid(positions[rows]) for rows in repaired)
+    assert sum(values[rows, week].sum() for week, rows in enumerate(repaired)) == 59
+
+
+def test_short_pool_with_tied_values_terminates():
+    # Products of one-decimal values tie up to rounding, which once left
+    # zero-cost cycles in the residual graph for Dijkstra to relax forever
+    rules = roster_format('standard')
+    rng = np.random.default_rng(9)
+    base = np.round(rng.integers(50, 60, 45) * 0.1, 1)
+    values = base[:, None] * rng.choice([0.7, 1.1, 1.3, 0.3], (45, 4))
+    positions = rng.permutation(np.arange(45) % len(rules.positions))
+    with pytest.raises(ValueError):
+        flow_relaxation(values, positions, rules)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from job_runner import chunk_seed, resolve_seed, run_job
+
+
+INTERRUPT = {}  # Chunk at which _task raises KeyboardInterrupt, once
+
+
+def _task(chunk, seed_sequence):
+    if INTERRUPT.get('at') == chunk:
+        del INTERRUPT['at']
+        raise KeyboardInterrupt
+    return np.random.default_rng(seed_sequence).random(5).tolist()
+
+
+def _merge(aggregate, draws):
+    aggregate['total'] += sum(draws)
+    aggregate['draws'].extend(draws)
+    return aggregate
+
+
+def run(checkpoint=None, workers=1, seed=11, inputs='job'):
+    return run_job(_task, 20, seed, _merge, {'total': 0.0, 'draws': []}, inputs, workers=workers,
+                   checkpoint=checkpoint, checkpoint_every=0.0)
+
+
+def test_resumed_run_is_bit_identical(tmp_path):
+    reference = tmp_path / 'reference.json'
+    expected = run(str(reference))
+    resumed = tmp_path / 'resumed.json'
+    for at in (3, 12):
+        INTERRUPT['at'] = at
+        with pytest.raises(KeyboardInterrupt):
+            run(str(resumed))
+    assert run(str(resumed)) == expected
+    assert resumed.read_bytes() == reference.read_bytes()
+
+
+def test_worker_count_does_not_change_results():
+    assert run(workers=3) == run(workers=1)
+
+
+def test_chunks_draw_independent_streams():
+    draws = run()['draws']
+    assert draws[:5] == np.random.default_rng(chunk_seed(11, 0)).random(5).tolist()
+    assert draws[5:10] != draws[:5]
+    assert run(seed=12)['draws'] != draws
+
+
+def test_checkpoint_of_another_job_is_rejected(tmp_path):
+    checkpoint = str(tmp_path / 'job.json')
+    run(checkpoint)
+    with pytest.raises(ValueError):
+        run(checkpoint, inputs='other job')
+    with pytest.raises(ValueError):
+        run(checkpoint, seed=12)
+    assert resolve_seed(None, checkpoint) == 11
+    assert resolve_seed(5, checkpoint) == 5
@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+from league_state import LeagueState
+from playoff_optimizer import PlayoffOptimizer
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_relocking_a_week_frees_its_old_players(tmp_path):
+    state = LeagueState()
+    state.excluded_players = ['SEA_X']
+    state.plan = {1: ['BUF_A', 'BUF_B'], 2: ['DEN_C']}
+    state.advance_to(3)
+    assert state.used_players == ['BUF_A', 'BUF_B', 'DEN_C', 'SEA_X']
+    state.lock_week(1, ['BUF_A', 'NE_D'])
+    assert state.used_players == ['BUF_A', 'DEN_C', 'NE_D', 'SEA_X']
+
+    path = str(tmp_path / 'state.json')
+    state.save(path)
+    loaded = LeagueState.load(path)
+    loaded.lock_week(2, ['DEN_E'])
+    assert loaded.used_players == ['BUF_A', 'DEN_E', 'NE_D', 'SEA_X']
+
+
+def test_hand_added_used_players_become_exclusions(tmp_path):
+    path = tmp_path / 'state.json'
+    path.write_text(json.dumps({'current_week': 2, 'locked_lineups': {'1': ['BUF_A']},
+                                'used_players': ['BUF_A', 'SEA_X']}))
+    state = LeagueState.load(str(path))
+    assert state.excluded_players == ['SEA_X']
+    state.lock_week(1, ['NE_D'])
+    assert state.used_players == ['NE_D', 'SEA_X']
+
+
+def test_played_lineups_are_checked_against_the_roster_rules():
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(REPO, use_cache=False)
+    optimizer.weight_player_value()
+    keys = [player.key for player in optimizer.simulate_playoffs()[1]]
+    optimizer.players.reset_used()
+    optimizer.check_played_lineup(1, keys)
+    for bad_week, bad_keys in [(1, keys[:2]), (1, keys[:-1] + keys[:1]), (1, keys[:-1] + ['XXX_Nobody']),
+                               (optimizer.PLAYOFF_WEEKS + 1, keys)]:
+        with pytest.raises(ValueError):
+            optimizer.check_played_lineup(bad_week, bad_keys)
@@ -0,0 +1,75 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from lineup_solver import rank_plans, solve_assignment, solve_plan
+from roster_rules import RosterRules
+
+
+SMALL_RULES = [
+    RosterRules({'A': (1, 1), 'B': (1, 2), 'C': (0, 1)}, 3),
+    RosterRules({'A': (1, 1), 'B': (1, 1), 'C': (0, 1)}, 3, [(('B', 'C'), 1)]),
+]
+
+
+def all_plans(values, positions, rules):
+    """Every valid plan as (value, weeks), by trying each player in each week or none"""
+    n_players, n_weeks = values.shape
+    plans = []
+    for assignment in itertools.product(range(-1, n_weeks), repeat=n_players):
+        weeks = [[p for p in range(n_players) if assignment[p] == w] for w in range(n_weeks)]
+        if all(np.all(np.isfinite(values[rows, w])) and rules.is_valid(positions[rows])
+               for w, rows in enumerate(weeks)):
+            plans.append((float(sum(values[rows, w].sum() for w, rows in enumerate(weeks))), weeks))
+    return plans
+
+
+def random_instance(rng, rules, n_players=7, n_weeks=2):
+    positions = rng.integers(0, len(rules.positions), n_players)
+    values = rng.integers(1, 20, (n_players, n_weeks)).astype(float)
+    values[rng.random(values.shape) < 0.2] = -np.inf
+    return values, positions
+
+
+def test_solve_assignment_matches_permutations():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n_rows = int(rng.integers(1, 5))
+        cost = rng.integers(0, 30, (n_rows, int(rng.integers(n_rows, 6)))).astype(float)
+        columns = solve_assignment(cost)
+        assert len(set(columns.tolist())) == n_rows
+        best = min(sum(cost[r, c] for r, c in enumerate(perm))
+                   for perm in itertools.permutations(range(cost.shape[1]), n_rows))
+        assert cost[np.arange(n_rows), columns].sum() == best
+
+
+@pytest.mark.parametrize('rules', SMALL_RULES)
+def test_solve_plan_matches_brute_force(rules):
+    rng = np.random.default_rng(1)
+    for _ in range(40):
+        values, positions = random_instance(rng, rules)
+        plans = all_plans(values, positions, rules)
+        if not plans:
+            with pytest.raises(ValueError):
+                solve_plan(values, positions, rules)
+            continue
+        solution = solve_plan(values, positions, rules)
+        assert solution.objective == pytest.approx(max(value for value, _ in plans))
+        assert solution.gap == pytest.approx(0.0)
+        assert all(rules.is_valid(positions[rows]) for rows in solution.weeks)
+        assert len({p for rows in solution.weeks for p in rows}) == sum(map(len, solution.weeks))
+
+
+@pytest.mark.parametrize('rules', SMALL_RULES)
+def test_rank_plans_enumerates_every_plan_in_order(rules):
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        values, positions = random_instance(rng, rules, n_players=6)
+        plans = all_plans(values, positions, rules)
+        if not plans:
+            continue
+        ranked = list(rank_plans(values, positions, rules))
+        assert [s.objective for s in ranked] == pytest.approx(sorted((v for v, _ in plans), reverse=True))
+        keys = {frozenset((p, w) for w, rows in enumerate(s.weeks) for p in rows) for s in ranked}
+        assert len(keys) == len(ranked)
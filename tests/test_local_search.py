@@ -0,0 +1,115 @@
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+from lineup_solver import solve_plan
+from local_search import anneal, improve_plan
+from playoff_optimizer import PlayoffOptimizer
+from roster_rules import RosterRules
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RULES = RosterRules({'A': (1, 1), 'B': (1, 2), 'C': (0, 1)}, 3)
+
+def best_plan_value(values, positions, rules):
+    """Optimum by trying each player in each week or none"""
+    n_players, n_weeks = values.shape
+    best = -np.inf
+    for assignment in itertools.product(range(-1, n_weeks), repeat=n_players):
+        weeks = [[p for p in range(n_players) if assignment[p] == w] for w in range(n_weeks)]
+        if all(np.all(np.isfinite(values[rows, w])) and rules.is_valid(positions[rows])
+               for w, rows in enumerate(weeks)):
+            best = max(best, float(sum(values[rows, w].sum() for w, rows in enumerate(weeks))))
+    return best
+
+
+def first_valid_plan(values, positions, rules):
+    """Some valid plan, filled greedily in player order"""
+    used, weeks = set(), []
+    for week in range(values.shape[1]):
+        state, rows = rules.EMPTY, []
+        for player in range(len(values)):
+            if player not in used and np.isfinite(values[player, week]) and rules.can_add(state, positions[player]):
+                state = rules.add(state, positions[player])
+                rows.append(player)
+        if not rules.is_valid_state(state):
+            return None
+        used.update(rows)
+        weeks.append(rows)
+    return weeks
+
+
+def test_annealing_reaches_the_brute_force_optimum():
+    rng = np.random.default_rng(0)
+    checked = 0
+    for _ in range(40):
+        positions = rng.integers(0, 3, 8)
+        values = rng.integers(1, 20, (8, 2)).astype(float)
+        values[rng.random(values.shape) < 0.15] = -np.inf
+        start = first_valid_plan(values, positions, RULES)
+        if start is None:
+            continue
+        result = improve_plan(values, positions, RULES, start, restarts=2, workers=1, seed=1, max_moves=20000)
+        assert result.objective == pytest.approx(best_plan_value(values, positions, RULES))
+        assert result.objective >= result.start_objective
+        assert all(RULES.is_valid(positions[rows]) for rows in result.weeks)
+        players = [p for rows in result.weeks for p in rows]
+        assert len(set(players)) == len(players)
+        assert all(np.isfinite(values[rows, w]).all() for w, rows in enumerate(result.weeks))
+        checked += 1
+    assert checked > 10
+
+
+def test_fixed_moves_are_reproducible():
+    rng = np.random.default_rng(1)
+    positions = rng.integers(0, 3, 30)
+    values = rng.normal(10, 3, (30, 3))
+    start = first_valid_plan(values, positions, RULES)
+    runs = [anneal(values, positions, RULES, start, 0.0, seed=5, max_moves=5000) for _ in range(2)]
+    assert runs[0] == runs[1]
+
+
+def test_short_starting_lineups_are_filled():
+    positions = np.array([0, 0, 1, 1, 1, 2])
+    values = np.full((6, 2), 5.0)
+    result = improve_plan(values, positions, RULES, [[0, 2, 3], [1]], workers=1, seed=0, max_moves=5000)
+    assert all(RULES.is_valid(positions[rows]) for rows in result.weeks)
+
+
+def test_invalid_starting_plan_is_rejected():
+    positions = np.array([0, 0, 1])
+    with pytest.raises(ValueError):
+        anneal(np.ones((3, 1)), positions, RULES, [[0, 1, 2]], 0.0, seed=0, max_moves=10)
+
+
+def test_improving_a_plan_keeps_excluded_players_out():
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(REPO, use_cache=False)
+    optimizer.apply_te_premium()
+    optimizer.weight_player_value()
+    # Exclude the best player at each position, as a state file's used players would
+    codes = optimizer.lineup_positions()
+    values = optimizer.players.adjusted_fpts
+    excluded = [int(np.flatnonzero(codes == code)[np.argmax(values[codes == code])])
+                for code in range(codes.max() + 1)]
+    optimizer.players.mark_used(excluded)
+    plan = optimizer.simulate_playoffs('greedy')
+    improved, _ = optimizer.improve_plan(plan, restarts=1, workers=1, seed=0, seconds=0.2)
+    assert not set(excluded) & {p.id for lineup in improved.values() for p in lineup}
+    assert optimizer.players.used[excluded].all()
+
+
+def test_weeks_without_candidates_are_left_alone():
+    rng = np.random.default_rng(2)
+    positions = np.array([0, 0, 1, 1, 1, 1, 2, 2, 0, 1])
+    values = rng.integers(1, 20, (10, 4)).astype(float)
+    values[:, 3] = -np.inf  # Nobody can play the last week
+    start = [list(rows) for rows in solve_plan(values[:, :3], positions, RULES).weeks] + [[]]
+    result = improve_plan(values, positions, RULES, start, workers=1, seed=0, max_moves=5000)
+    assert result.weeks[3] == []
+    assert all(RULES.is_valid(positions[rows]) for rows in result.weeks[:3])
+    assert result.objective == pytest.approx(result.start_objective)  # Already optimal
+    none = improve_plan(np.full((10, 1), -np.inf), positions, RULES, [[]], workers=1, seed=0, max_moves=5000)
+    assert none.weeks == [[]] and none.moves == 0
@@ -0,0 +1,48 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from optimizer_service import OptimizerService, RequestError, _init_worker, normalize_request, warm_optimizer
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def service():
+    _init_worker(warm_optimizer(REPO, None))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield OptimizerService(executor, cache_size=2)
+
+
+def test_only_successful_solves_are_cached(service):
+    async def queries():
+        first = await service.query('week', {'week': 2})
+        again = await service.query('week', {'week': 2, 'used': []})
+        failed = await service.query('week', {'week': 2, 'used': ['XXX_Nobody']})
+        retried = await service.query('week', {'week': 2, 'used': ['XXX_Nobody']})
+        return first, again, failed, retried
+
+    first, again, failed, retried = asyncio.run(queries())
+    assert first[0] and again == first
+    assert not failed[0] and 'XXX_Nobody' in failed[1]['error'] and retried == failed
+    assert service.stats['cache_hits'] == 1 and service.stats['solves'] == 3
+    assert service.health()['cached'] == 1
+
+
+def test_totals_are_weekly_points(service):
+    ok, result = asyncio.run(service.query('plan', {'start_week': 3}))
+    assert ok and sorted(result['weeks']) == ['3', '4']
+    rows = [row for lineup in result['weeks'].values() for row in lineup]
+    assert result['total_points'] == pytest.approx(sum(row['points'] for row in rows), abs=0.05)
+    assert result['total_points'] < 2 * 150  # Two weeks of points, not season totals
+
+
+@pytest.mark.parametrize('week', [1, 2, 5])
+def test_locks_outside_the_planned_weeks_are_rejected(week):
+    with pytest.raises(RequestError):
+        normalize_request('plan', {'start_week': 3, 'locks': {str(week): ['JAX_Trevor Lawrence']}})
+    assert normalize_request('plan', {'start_week': 3, 'locks': {'4': ['JAX_Trevor Lawrence']}})['locks'] == {
+        4: ['JAX_Trevor Lawrence']}
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pytest
+
+from playoff_optimizer import PlayoffOptimizer
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def optimizer():
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(REPO, use_cache=False)
+    return optimizer
+
+
+def top_player(optimizer, team, position):
+    store = optimizer.players
+    ids = [i for i in range(len(store)) if store[i].team == team and store[i].position == position]
+    return max(ids, key=lambda i: store.base_fpts[i])
+
+
+@pytest.mark.parametrize('correlated', [False, True])
+def test_chunked_draws_equal_one_pass(optimizer, correlated):
+    pairs = [(top_player(optimizer, 'DEN', 'QB'), 1), (top_player(optimizer, 'DEN', 'WR'), 1),
+             (top_player(optimizer, 'SEA', 'RB'), 3)]
+    sampler = optimizer.plan_sampler(1000, seed=7, correlated=correlated)
+    whole = sampler.points(pairs, 0, 1000)
+    chunked = np.vstack([sampler.points(pairs, start, stop)
+                         for start, stop in [(0, 1), (1, 333), (333, 334), (334, 1000)]])
+    # Own draws are counter-based and bit-identical; game states go through a matrix product
+    same = np.testing.assert_allclose if correlated else np.testing.assert_array_equal
+    same(chunked, whole)
+    # A fresh sampler with the same seed draws the same samples; another seed does not
+    again = optimizer.plan_sampler(1000, seed=7, correlated=correlated).points(pairs, 250, 750)
+    same(again, whole[250:750])
+    assert not np.allclose(optimizer.plan_sampler(1000, seed=8, correlated=correlated).points(pairs, 0, 1000),
+                           whole)
+
+
+def test_same_team_draws_are_correlated(optimizer):
+    qb, wr = top_player(optimizer, 'DEN', 'QB'), top_player(optimizer, 'DEN', 'WR')
+    other = top_player(optimizer, 'SEA', 'WR')
+    n = 20_000
+    sampler = optimizer.plan_sampler(n, seed=3)
+    draws = np.array([sampler.player_normals(p, 2, 0, n) for p in (qb, wr, other)])
+    empirical = np.corrcoef(draws)
+    implied = sampler.outcomes.correlation([qb, wr, other])
+    assert implied[0, 1] > 0.1 and implied[0, 2] == 0.0
+    np.testing.assert_allclose(empirical, implied, atol=0.03)
+    # Each player's own distribution is unchanged
+    np.testing.assert_allclose(draws.std(axis=1), 1.0, atol=0.03)
+    independent = optimizer.plan_sampler(n, seed=3, correlated=False)
+    draws = np.array([independent.player_normals(p, 2, 0, n) for p in (qb, wr)])
+    assert abs(np.corrcoef(draws)[0, 1]) < 0.03
@@ -0,0 +1,62 @@
+from results_store import ResultsStore
+
+
+def plan(*weeks):
+    """A result in the batch-results format; weeks: lists of (team, name) per week"""
+    return {'id': 'entry', 'solver': 'exact', 'valid': True, 'total_points': 10.0,
+            'weeks': {str(week): [{'key': f"{team}_{name}", 'name': name, 'team': team, 'position': 'WR',
+                                   'points': 5.0} for team, name in rows]
+                      for week, rows in enumerate(weeks, start=1)}}
+
+
+def test_usage_queries(tmp_path):
+    with ResultsStore(str(tmp_path / 'results.db')) as store:
+        store.add_result(plan([('SEA', 'A'), ('DEN', 'B')], [('SEA', 'C')], [('NE', 'D')]))
+        store.add_result(plan([('SEA', 'C')], [('DEN', 'B')], [('SEA', 'A')]), outcomes={'mean': 3.5})
+        store.add_result({'id': 'broken', 'error': 'infeasible'})
+        assert store.run_count() == 2
+        assert store.player_usage('SEA_A') == 2
+        assert store.player_usage('SEA_A', 1) == 1
+        assert store.player_usage('SEA_C', 3) == 0
+        assert store.top_players(week=2) == [('DEN_B', 1), ('SEA_C', 1)]
+        assert store.team_usage(1) == [('SEA', 2), ('DEN', 1)]
+        assert store.connection.execute('SELECT value FROM outcomes').fetchall() == [(3.5,)]
+
+
+def test_writes_are_batched_and_reopening_appends(tmp_path):
+    path = str(tmp_path / 'results.db')
+    store = ResultsStore(path)
+    store.BATCH_ROWS = 4
+    store.add_result(plan([('SEA', 'A')], [('SEA', 'B')]))
+    assert store.connection.execute('SELECT COUNT(*) FROM lineups').fetchone()[0] == 0  # Still buffered
+    store.add_result(plan([('SEA', 'C')], [('SEA', 'D')]))
+    assert store.connection.execute('SELECT COUNT(*) FROM lineups').fetchone()[0] == 4
+    store.close()
+    with ResultsStore(path) as store:
+        assert store.add_result(plan([('NE', 'E')])) is None  # Ids come from flush
+        assert store.flush() == [3]
+        assert store.run_count() == 3
+
+
+def test_two_writers_get_distinct_run_ids(tmp_path):
+    path = str(tmp_path / 'results.db')
+    first, second = ResultsStore(path), ResultsStore(path)
+    for n in range(3):
+        first.add_result(dict(plan([('SEA', f'A{n}')]), id='first'))
+        second.add_result(dict(plan([('NE', f'B{n}')]), id='second'))
+    first.flush()
+    second.add_result({'id': 'second', 'error': 'infeasible'})
+    second.close()
+    first.add_result(dict(plan([('SEA', 'A3')]), id='first'))
+    first.close()
+    with ResultsStore(path) as store:
+        assert store.run_count() == 7
+        rows = store.connection.execute('SELECT label, team FROM runs JOIN lineups USING (run_id)').fetchall()
+        assert sorted(rows) == [('first', 'SEA')] * 4 + [('second', 'NE')] * 3
+
+
+def test_player_week_query_uses_an_index(tmp_path):
+    with ResultsStore(str(tmp_path / 'results.db')) as store:
+        detail = store.connection.execute('EXPLAIN QUERY PLAN SELECT COUNT(*) FROM lineups '
+                                          'WHERE player = ? AND week = ?', ('SEA_A', 3)).fetchall()
+        assert any('lineups_player_week' in row[-1] for row in detail)
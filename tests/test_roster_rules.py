@@ -0,0 +1,108 @@
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+from lineup_solver import solve_plan
+from playoff_optimizer import PlayoffOptimizer
+from roster_rules import ROSTER_FORMATS, RosterRules, roster_format
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def fills_slots(counts, spec):
+    """Whether a count vector fits the declared slots: own slots within (min, max), every flex slot full"""
+    positions = list(spec['slots'])
+    if sum(counts) != spec['size']:
+        return False
+    flex = spec['flex']
+    # Try every way of handing players to the flex slots
+    options = [[split for split in itertools.product(range(count + 1), repeat=len(eligible))
+                if sum(split) == count] for eligible, count in flex]
+    for splits in itertools.product(*options):
+        own = dict(zip(positions, counts))
+        for (eligible, _), split in zip(flex, splits):
+            for pos, taken in zip(eligible, split):
+                own[pos] -= taken
+        if all(spec['slots'][pos][0] <= own[pos] <= spec['slots'][pos][1] for pos in positions):
+            return True
+    return False
+
+
+SPECS = dict(ROSTER_FORMATS, nested={
+    'size': 6,
+    'slots': {'QB': (1, 1), 'RB': (1, 2), 'WR': (1, 2), 'K': (0, 1)},
+    'flex': [(('RB', 'WR'), 1), (('QB', 'RB', 'WR'), 1)],
+})
+
+
+@pytest.mark.parametrize('name', list(SPECS))
+def test_compiled_tables_match_the_declared_slots(name):
+    spec = SPECS[name]
+    rules = RosterRules(spec['slots'], spec['size'], spec['flex'])
+    n = len(rules.positions)
+    valid = {counts for counts in itertools.product(range(spec['size'] + 1), repeat=n) if fills_slots(counts, spec)}
+    assert valid
+    for counts in itertools.product(*(range(int(cap) + 1) for cap in rules.caps)):
+        state = rules.encode(counts)
+        assert rules.is_valid_state(state) == (counts in valid)
+        completable = any(all(a <= b for a, b in zip(counts, other)) for other in valid)
+        assert rules.is_completable(state) == completable
+        for code in range(n):
+            grown = tuple(c + (i == code) for i, c in enumerate(counts))
+            expected = grown[code] <= rules.caps[code] and any(
+                all(a <= b for a, b in zip(grown, other)) for other in valid)
+            assert rules.can_add(state, code) == expected
+            if expected:
+                assert rules.add(state, code) == rules.encode(grown)
+                assert rules.remove(rules.add(state, code), code) == state
+
+
+def test_greedy_filling_with_can_add_always_completes():
+    rules = roster_format('superflex')
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        state, placed = rules.EMPTY, 0
+        while not rules.is_valid_state(state):
+            code = int(rng.integers(0, len(rules.positions)))
+            if rules.can_add(state, code):
+                state = rules.add(state, code)
+                placed += 1
+        assert placed == rules.size
+
+
+def test_aliases_and_unknown_positions():
+    rules = roster_format('playoff', aliases={'DEF': ['CB', 'LB']})
+    assert rules.code('CB') == rules.code('DEF') == rules.code('LB')
+    assert rules.code('P') == -1
+    assert rules.state_of([rules.code('QB'), -1]) == -1
+
+
+def test_rejects_overlapping_flex_slots():
+    with pytest.raises(ValueError):
+        RosterRules({'A': (0, 1), 'B': (0, 1), 'C': (0, 1)}, 2, [(('A', 'B'), 1), (('B', 'C'), 1)])
+
+
+def test_greedy_lineups_are_complete_or_flagged(capsys):
+    optimizer = PlayoffOptimizer()
+    optimizer.use_roster_format('superflex')
+    optimizer.load_players(REPO, use_cache=False)
+    optimizer.apply_te_premium()
+    optimizer.weight_player_value()
+    capsys.readouterr()
+    plan = optimizer.simulate_playoffs('greedy')
+    warnings = capsys.readouterr().out
+    store, codes, rules = optimizer.players, optimizer.lineup_positions(), optimizer.roster_rules()
+    used, eliminated = np.zeros(len(store), dtype=bool), 0
+    for week, lineup in sorted(plan.items()):
+        if not optimizer.is_valid_lineup(lineup):
+            # Only when the players left really cannot make a lineup, and never silently
+            assert f"No valid week {week} lineup" in warnings
+            pool = np.flatnonzero(~used & ~store.team_mask(eliminated)[store.team])
+            with pytest.raises(ValueError):
+                solve_plan(np.ones((len(pool), 1)), codes[pool], rules)
+        used[[p.id for p in lineup]] = True
+        eliminated |= store.team_bits(optimizer.ASSUMED_ELIMINATIONS.get(week, []))
+    assert "No valid week 4 lineup" in warnings  # Greedy spends the last QBs by week 3
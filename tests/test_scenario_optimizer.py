@@ -0,0 +1,26 @@
+import os
+
+import numpy as np
+import pytest
+
+from bracket_simulator import BracketSimulator
+from playoff_optimizer import PlayoffOptimizer
+from scenario_optimizer import ScenarioOptimizer
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_totals_are_weekly_points_over_the_weeks_played():
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(REPO, use_cache=False)
+    optimizer.apply_te_premium()
+    scenarios = BracketSimulator(optimizer.PLAYOFF_SEEDS).simulate(2000, seed=4)
+    scenario_optimizer = ScenarioOptimizer(optimizer, scenarios, workers=1)
+    plan = scenario_optimizer.optimize()
+    totals = scenario_optimizer.evaluate(plan)
+    assert totals.mean() == pytest.approx(optimizer.last_solution.objective)
+    # No scenario scores more than every planned player playing their week
+    weekly = optimizer.weekly_projection().mean
+    assert totals.max() <= sum(weekly[p.id] for lineup in plan.values() for p in lineup) + 1e-9
+    assert np.all(totals > 0)
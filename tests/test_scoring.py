@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pytest
+
+from playoff_optimizer import PlayoffOptimizer
+from scoring import LEAGUE_SCORING, STANDARD_PPR, PlayerScorer, ScoringRules
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def store():
+    optimizer = PlayoffOptimizer()
+    optimizer.load_players(REPO, use_cache=False)
+    return optimizer.players
+
+
+def column(store, field):
+    return np.nan_to_num(store.stats[:, store.stat_fields.index(field)])
+
+
+def test_reference_rules_reproduce_the_csv_points(store):
+    assert PlayerScorer(store).score(STANDARD_PPR) == pytest.approx(store.base_fpts, abs=1e-9)
+
+
+def test_league_rules_add_half_a_point_per_te_reception(store):
+    points = PlayerScorer(store).score(LEAGUE_SCORING)
+    te = store.position == store.position_names.index('TE')
+    assert te.any()
+    assert points[te] == pytest.approx(store.base_fpts[te] + 0.5 * column(store, 'REC')[te], abs=1e-9)
+    assert points[~te] == pytest.approx(store.base_fpts[~te], abs=1e-9)
+
+
+def test_untracked_points_are_carried_through(store):
+    scorer = PlayerScorer(store)
+    # Kickers and defenders earn points no rule tracks; only passing TDs move
+    points = scorer.score(ScoringRules(dict(STANDARD_PPR.points, PASS_TD=6.0)))
+    assert points == pytest.approx(store.base_fpts + 2.0 * column(store, 'PASS_TD'), abs=1e-9)
+    kicker = store.position == store.position_names.index('K')
+    assert kicker.any() and (store.base_fpts[kicker] > 0).all()
+    assert scorer.score(ScoringRules({}))[kicker] == pytest.approx(store.base_fpts[kicker])
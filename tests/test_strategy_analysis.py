@@ -0,0 +1,132 @@
+import json
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from strategy_analysis import (CATEGORIES, PlanRecordWriter, StrategyReport, StreamingHistogram, analyze,
+                               record_chunks)
+
+
+TEAMS = ['DEN', 'SEA', 'NE', 'BUF']
+SEEDS = {'DEN': ('AFC', 1), 'SEA': ('NFC', 1), 'NE': ('AFC', 2), 'BUF': ('AFC', 6)}
+POSITIONS = ['QB', 'RB', 'WR', 'TE', 'K', 'LB']
+
+
+def random_plans(n_runs, seed=0):
+    """Plans in the results format; points are quarter points, exact in float32"""
+    rng = np.random.default_rng(seed)
+    plans = []
+    for _ in range(n_runs):
+        plans.append({str(week): [{'key': f'P{i}', 'team': TEAMS[rng.integers(len(TEAMS))],
+                                   'position': POSITIONS[rng.integers(len(POSITIONS))],
+                                   'points': float(rng.integers(0, 120)) / 4}
+                                  for i in range(rng.integers(2, 6))]
+                      for week in range(1, 5)})
+    return plans
+
+
+def write_records(path, plans):
+    with PlanRecordWriter(str(path)) as writer:
+        for plan in plans:
+            writer.write(plan)
+
+
+def write_jsonl(path, plans):
+    with open(path, 'w') as f:
+        for i, plan in enumerate(plans):
+            f.write(json.dumps({'id': str(i), 'weeks': plan}) + '\n')
+            if i == 2:
+                f.write(json.dumps({'id': 'broken', 'error': 'infeasible'}) + '\n')
+
+
+def test_report_matches_brute_force(tmp_path):
+    plans = random_plans(60)
+    write_records(tmp_path / 'runs.plans', plans)
+    report = analyze(str(tmp_path / 'runs.plans')).to_dict(SEEDS)
+
+    assert report['runs'] == len(plans)
+    totals = [sum(row['points'] for rows in plan.values() for row in rows) for plan in plans]
+    assert report['total_points']['mean'] == pytest.approx(np.mean(totals), abs=0.005)
+    assert report['team_exposure'] == {
+        team: pytest.approx(sum(any(row['team'] == team for rows in plan.values() for row in rows)
+                                for plan in plans) / len(plans), abs=5e-5)
+        for team in TEAMS}
+    for week in map(str, range(1, 5)):
+        lineups = [plan[week] for plan in plans]
+        summary = report['weeks'][week]
+        points = [sum(row['points'] for row in rows) for rows in lineups]
+        assert summary['points']['mean'] == pytest.approx(np.mean(points), abs=0.005)
+        assert summary['points']['min'] == min(points) and summary['points']['max'] == max(points)
+        for pos in POSITIONS:
+            per_lineup = sum(row['position'] == pos for rows in lineups for row in rows) / len(lineups)
+            assert summary['positions'].get(pos, 0.0) == pytest.approx(per_lineup, abs=5e-4)
+        for team in TEAMS:
+            per_lineup = sum(row['team'] == team for rows in lineups for row in rows) / len(lineups)
+            assert summary['teams'].get(team, 0.0) == pytest.approx(per_lineup, abs=5e-4)
+            if SEEDS[team][1] <= 2:
+                assert report['top_seeds'][team]['players'][week] == pytest.approx(per_lineup, abs=5e-4)
+        mixes = Counter(' '.join(f"{n}{pos}" for pos in CATEGORIES
+                                 if (n := sum(('DEF' if row['position'] == 'LB' else row['position']) == pos
+                                              for row in rows)))
+                        for rows in lineups)
+        top = mixes.most_common(1)[0][1]
+        assert summary['mixes'][0]['share'] == pytest.approx(top / len(lineups), abs=5e-5)
+        assert mixes[summary['mixes'][0]['mix']] == top
+
+
+def test_jsonl_and_plan_records_give_the_same_report(tmp_path):
+    plans = random_plans(25, seed=1)
+    write_records(tmp_path / 'runs.plans', plans)
+    write_jsonl(tmp_path / 'runs.jsonl', plans)
+    records = analyze(str(tmp_path / 'runs.plans')).to_dict(SEEDS)
+    assert analyze(str(tmp_path / 'runs.jsonl')).to_dict(SEEDS) == records
+    assert records['runs'] == 25  # The error line is skipped
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 7, 50])
+def test_chunks_that_split_runs_are_recut(tmp_path, chunk_rows):
+    plans = random_plans(30, seed=2)
+    path = str(tmp_path / 'runs.plans')
+    write_records(path, plans)
+    header, chunks = record_chunks(path, chunk_rows)
+    report, seen = StrategyReport(), []
+    for chunk in chunks:
+        runs = np.unique(chunk['run']).tolist()
+        assert not set(runs) & set(seen)  # No run spans two chunks
+        seen.extend(runs)
+        report.add(chunk, header['teams'], header['positions'])
+    assert seen == list(range(30))
+    assert report.to_dict(SEEDS) == analyze(path).to_dict(SEEDS)
+
+
+def test_resumed_writer_drops_records_after_its_state(tmp_path):
+    plans = random_plans(12, seed=3)
+    write_records(tmp_path / 'whole.plans', plans)
+    path = tmp_path / 'resumed.plans'
+    writer = PlanRecordWriter(str(path))
+    for plan in plans[:5]:
+        writer.write(plan)
+    writer.sync()
+    state = json.loads(json.dumps(writer.state()))  # As a checkpoint stores it
+    for plan in plans[5:8]:
+        writer.write(plan)  # Written after the checkpoint, then interrupted
+    writer.sync()
+    writer._file.close()
+    with PlanRecordWriter(str(path), resume=state) as writer:
+        for plan in plans[5:]:
+            writer.write(plan)
+    assert path.read_bytes() == (tmp_path / 'whole.plans').read_bytes()
+
+
+def test_histogram_quantiles_are_within_half_a_bin():
+    rng = np.random.default_rng(4)
+    values = np.concatenate([rng.normal(100, 15, 20_000), rng.exponential(8, 5_000) - 20])
+    histogram = StreamingHistogram(bin_width=0.5)
+    for part in np.array_split(values, 9):
+        histogram.add(part)
+    assert histogram.count == len(values)
+    assert histogram.mean == pytest.approx(values.mean())
+    assert (histogram.min, histogram.max) == (values.min(), values.max())
+    for q in (0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0):
+        assert abs(histogram.quantile(q) - np.quantile(values, q, method='inverted_cdf')) <= 0.25 + 1e-9
@@ -0,0 +1,46 @@
+import numpy as np
+
+from team_outcomes import FACTORS, TEAM_SHARE, TeamOutcomeModel
+
+
+POSITIONS = ['QB', 'RB', 'WR', 'TE', 'K', 'DEF']
+# Team 0: QB, WR, RB, K, DEF; team 1: QB, WR
+TEAM = np.array([0, 0, 0, 0, 0, 1, 1])
+VOLUME = np.array([[300, 40], [200, 0], [30, 180], [0, 0], [0, 0], [250, 20], [150, 5]], dtype=float)
+CODES = np.array([0, 2, 1, 4, 5, 0, 2])
+
+
+def model():
+    return TeamOutcomeModel(TEAM, VOLUME, CODES, POSITIONS, 2)
+
+
+def test_each_player_keeps_unit_variance_and_their_team_share():
+    outcomes = model()
+    shared = np.einsum('pi,pij,pj->p', outcomes.loadings, outcomes.covariance[TEAM], outcomes.loadings)
+    np.testing.assert_allclose(shared, [TEAM_SHARE[POSITIONS[code]] for code in CODES])
+    np.testing.assert_allclose(shared + outcomes.residual ** 2, 1.0)
+    assert np.all(np.linalg.eigvalsh(outcomes.covariance) > 0)
+
+
+def test_correlation_signs():
+    correlation = model().correlation(range(len(TEAM)))
+    assert correlation[0, 1] > 0.3  # QB and receiver share the passing game and scoring
+    assert correlation[0, 1] > correlation[0, 2] > 0  # A rusher shares only scoring, against game script
+    assert correlation[0, 3] > 0 and correlation[3, 4] == 0  # Kickers follow scoring; defense is apart
+    assert correlation[5, 6] > 0.3
+    assert np.all(correlation[:5, 5:] == 0)  # Different teams are independent
+    np.testing.assert_allclose(correlation, correlation.T)
+
+
+def test_sampled_draws_reproduce_the_implied_correlation():
+    outcomes = model()
+    rng = np.random.default_rng(0)
+    n = 40_000
+    states = [outcomes.states(team, rng.standard_normal((n, len(FACTORS)))) for team in range(2)]
+    draws = np.array([outcomes.condition(p, states[TEAM[p]], rng.standard_normal(n)) for p in range(len(TEAM))])
+    np.testing.assert_allclose(np.corrcoef(draws), outcomes.correlation(range(len(TEAM))), atol=0.02)
+    np.testing.assert_allclose(draws.std(axis=1), 1.0, atol=0.02)
+    # Game states are row by row, so any split of the samples gives the same states
+    normals = rng.standard_normal((1000, len(FACTORS)))
+    np.testing.assert_allclose(np.vstack([outcomes.states(0, normals[:300]), outcomes.states(0, normals[300:])]),
+                               outcomes.states(0, normals))
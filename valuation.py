@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Player-by-Week Valuation Matrix
+
+Every optimizer path scores a player in a week the same way:
+
+    value[player, week] = points[player] * bonus[team, week]
+
+where points are the player's rescored, advancement-weighted season points and
+bonus is the team's conservation multiplier for that week. ValuationMatrix
+builds that whole (players, weeks) matrix in one vectorized pass and freezes
+it, so greedy, gap filling, the exact solvers and the state fingerprint all read
+the same numbers instead of re-deriving multipliers per call.
+
+Per-team tables come from a team -> (conference, seed) index built once from
+the playoff seeds, so no lookup scans the seed lists.
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+
+def team_seed_index(playoff_seeds: Dict[str, Dict[str, int]]) -> Dict[str, Tuple[str, int]]:
+    """team -> (conference, seed)"""
+    return {team: (conference, seed)
+            for conference, teams in playoff_seeds.items() for team, seed in teams.items()}
+
+
+def seed_table(teams: Sequence[str], seed_index: Dict[str, Tuple[str, int]],
+               values_by_seed: Dict[int, Sequence[float]], weeks: int, default: float) -> np.ndarray:
+    """
+    (teams, weeks) table of per-seed values
+
+    values_by_seed maps a seed to its value in weeks 1, 2, ...; weeks it does not
+    list, seeds it does not list and teams outside the bracket get `default`.
+    """
+    seeds = np.array([seed_index.get(team, (None, 0))[1] for team in teams], dtype=np.int64)
+    by_seed = np.full((max(values_by_seed, default=0) + 1, weeks), float(default))
+    for seed, values in values_by_seed.items():
+        count = min(len(values), weeks)
+        by_seed[seed, :count] = values[:count]
+    table = np.full((len(teams), weeks), float(default))
+    listed = seeds < len(by_seed)
+    table[listed] = by_seed[seeds[listed]]
+    return table
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array = np.array(array, dtype=float)
+    array.flags.writeable = False
+    return array
+
+
+class ValuationMatrix:
+    """Read-only (players, weeks) values with the inputs they were built from"""
+
+    def __init__(self, points: np.ndarray, teams: np.ndarray, bonus: np.ndarray, key=None):
+        self.points = _frozen(points)  # Weighted season points per player
+        self.bonus = _frozen(bonus)  # (teams, weeks) conservation multipliers
+        self.values = _frozen(self.points[:, None] * self.bonus[teams])
+        self.key = key  # Inputs the matrix was built from, to tell when it is stale
+
+    @property
+    def weeks(self) -> int:
+        return self.values.shape[1]
+
+    def week(self, week: int) -> np.ndarray:
+        """Every player's value in a week (1-based)"""
+        return self.values[:, week - 1]
+
+    def team_bonus(self, week: int) -> np.ndarray:
+        """Every team's multiplier in a week (1-based)"""
+        return self.bonus[:, week - 1]